@@ -0,0 +1,46 @@
+"""
+Aggregation throughput of the columnar analytics engine.
+
+    PYTHONPATH=src python benchmarks/bench_analytics.py [goals] [months]
+"""
+import random
+import sys
+import time
+from datetime import datetime
+
+from horizonte.core import analytics_engine
+from horizonte.core.analytics_engine import ColumnarHistory
+from horizonte.core.models import HistoryEntry, CheckInType, GoalCategory
+
+def build_history(n_goals: int, n_months: int):
+    cats = [c.value for c in GoalCategory]
+    goal_cats = {f"g{i}": random.choice(cats) for i in range(n_goals)}
+    entries = []
+    for m in range(n_months):
+        date = datetime(2020 + m // 12, m % 12 + 1, 28)
+        goals = {gid: (min(100, m + random.randint(0, 10)), "active", cat) for gid, cat in goal_cats.items()}
+        entries.append(HistoryEntry.model_construct(
+            id=str(m), date=date, type=CheckInType.MONTHLY, file_path="", goals=goals
+        ))
+    return entries
+
+def main():
+    n_goals = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    n_months = int(sys.argv[2]) if len(sys.argv) > 2 else 60
+    entries = build_history(n_goals, n_months)
+    backend = "numpy" if analytics_engine.np is not None else "python"
+    print(f"{n_goals} goals x {n_months} months ({n_goals * n_months} rows), backend={backend}")
+
+    t0 = time.perf_counter()
+    engine = ColumnarHistory.from_entries(entries)
+    t1 = time.perf_counter()
+    engine.period_stats()
+    engine.monthly_averages()
+    engine.percentiles()
+    t2 = time.perf_counter()
+
+    print(f"  build columns: {(t1 - t0) * 1000:8.1f} ms")
+    print(f"  aggregates:    {(t2 - t1) * 1000:8.1f} ms")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+"""
+Load/save throughput of the goals and check-in snapshot storage, compared with the
+previous format (indented json.dumps, json.load + Goal(**g) per record). The
+repository saves also include their backup-store / history-index updates.
+
+    PYTHONPATH=src python benchmarks/bench_serialization.py [goals] [months] [goals_per_snapshot]
+
+Set HORIZONTE_SERIALIZER=json to measure without orjson.
+"""
+import json
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+from horizonte.core import backups, serialization
+from horizonte.core.models import CheckIn, CheckInType, Goal, Horizon, Milestone, SmartCriteria
+from horizonte.core.storage import CheckinRepository, GoalsRepository
+
+def build_goals(n: int):
+    return [
+        Goal(
+            title=f"Objetivo {i}",
+            description="Descrição do objetivo " * 5,
+            horizon=random.choice(list(Horizon)),
+            smart_criteria=SmartCriteria(specific="s" * 80, measurable="m" * 40, achievable="a" * 40,
+                                         relevant="r" * 40, time_bound="t" * 20),
+            milestones=[Milestone(title=f"Marco {j}") for j in range(3)],
+            progress_percentage=random.randint(0, 100),
+        )
+        for i in range(n)
+    ]
+
+def timed(label: str, count: int, unit: str, fn):
+    t0 = time.perf_counter()
+    result = fn()
+    elapsed = time.perf_counter() - t0
+    print(f"  {label:<28} {elapsed * 1000:9.1f} ms  {count / elapsed:12,.0f} {unit}/s")
+    return result
+
+def bench_goals(goals, root: Path):
+    n = len(goals)
+    legacy_file = root / "legacy_goals.json"
+    print(f"{n} goals")
+
+    def legacy_save():
+        legacy_file.write_text(json.dumps([g.model_dump(mode='json') for g in goals], indent=2, ensure_ascii=False))
+
+    def legacy_load():
+        with open(legacy_file, 'r') as f:
+            return [Goal(**g) for g in json.load(f)]
+
+    timed("legacy save", n, "goals", legacy_save)
+    timed("legacy load", n, "goals", legacy_load)
+
+    repo = GoalsRepository(file_path=root / "goals.json")
+    timed("save (+ backup)", n, "goals", lambda: repo.save(goals))
+    loaded = timed("load", n, "goals", lambda: GoalsRepository(file_path=root / "goals.json").load())
+    assert len(loaded) == n
+    views = timed("load views (read-only)", n, "goals", lambda: GoalsRepository(file_path=root / "goals.json").load_views())
+    assert len(views) == n
+    print(f"  size: legacy {legacy_file.stat().st_size / 1e6:.1f} MB, "
+          f"now {(root / 'goals.json').stat().st_size / 1e6:.1f} MB")
+
+def bench_snapshots(goals, months: int, root: Path):
+    states = []
+    for m in range(months):
+        for g in goals:
+            g.progress_percentage = min(100, g.progress_percentage + random.choice((0, 0, 1, 5)))
+        states.append((datetime(2020 + m // 12, m % 12 + 1, 28), [g.model_dump(mode='json') for g in goals]))
+    rows = months * len(goals)
+    print(f"{months} monthly check-ins x {len(goals)} goals ({rows} snapshot rows)")
+
+    legacy_dir = root / "legacy_checkins"
+    legacy_dir.mkdir()
+
+    def legacy_save():
+        for date, snapshot in states:
+            checkin = CheckIn(date=date, type=CheckInType.MONTHLY, goals_covered=[], file_path="", snapshot=snapshot)
+            (legacy_dir / f"{date:%Y-%m-%d}.json").write_text(
+                json.dumps(checkin.model_dump(mode='json'), indent=2, ensure_ascii=False))
+
+    def legacy_load():
+        checkins = []
+        for path in legacy_dir.glob("*.json"):
+            with open(path, 'r') as f:
+                checkins.append(CheckIn(**json.load(f)))
+        return checkins
+
+    timed("legacy save", rows, "rows", legacy_save)
+    timed("legacy load", rows, "rows", legacy_load)
+
+    repo = CheckinRepository(dir_path=root / "checkins")
+
+    def save():
+        for date, snapshot in states:
+            checkin = CheckIn(date=date, type=CheckInType.MONTHLY, goals_covered=[], file_path="", snapshot=snapshot)
+            repo.save(checkin, "# Check-in")
+
+    timed("save (delta, + history)", rows, "rows", save)
+    loaded = timed("load (resolved)", rows, "rows", lambda: CheckinRepository(dir_path=root / "checkins").load_all_snapshots())
+    assert len(loaded) == months
+
+def main():
+    n_goals = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    months = int(sys.argv[2]) if len(sys.argv) > 2 else 60
+    per_snapshot = int(sys.argv[3]) if len(sys.argv) > 3 else 200
+    random.seed(35)
+    print(f"serializer backend: {serialization.backend()}")
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        # Keep the benchmark's versions out of the real backup store
+        backups._store = backups.BackupStore(root / "backups")
+        goals = build_goals(n_goals)
+        bench_goals(goals, root)
+        bench_snapshots(goals[:per_snapshot], months, root)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""
+Startup cost per subcommand, measured with `python -X importtime`.
+
+    PYTHONPATH=src python benchmarks/bench_startup.py [--check | --update-baseline]
+
+Each subcommand runs in a fresh interpreter against an empty HOME. The accepted heavy
+modules and import time of each command are kept in startup_baseline.json (written by
+--update-baseline). With --check the script exits non-zero if a command loads a module
+of HEAVY_MODULES its baseline does not list, or if its import time grows by more than
+TIME_TOLERANCE (plus TIME_SLACK_MS, to absorb noise).
+"""
+import json
+import os
+import re
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+COMMANDS = [
+    ["--help"],
+    ["list"],
+    ["history"],
+    ["progress"],
+    ["show", "--help"],
+    ["checkin", "--help"],
+]
+
+HEAVY_MODULES = ("openai", "httpx", "markdown_it", "numpy")
+
+BASELINE_FILE = Path(__file__).with_name("startup_baseline.json")
+TIME_TOLERANCE = 0.5
+TIME_SLACK_MS = 50.0
+# Import time is the best of this many runs
+RUNS = 3
+
+IMPORT_LINE = re.compile(r"import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+def measure(args, home):
+    env = dict(os.environ, HOME=home)
+    cmd = [sys.executable, "-X", "importtime", "-m", "horizonte.main", *args]
+    start = time.perf_counter()
+    proc = subprocess.run(cmd, env=env, capture_output=True, text=True, stdin=subprocess.DEVNULL)
+    wall = time.perf_counter() - start
+
+    total_us = 0
+    loaded = set()
+    for line in proc.stderr.splitlines():
+        m = IMPORT_LINE.match(line)
+        if not m:
+            continue
+        cumulative, indent, module = int(m.group(2)), m.group(3), m.group(4)
+        if len(indent) == 1:
+            # Top-level imports: their cumulative times add up to the total
+            total_us += cumulative
+        loaded.add(module.split(".")[0])
+    return wall, total_us, sorted(loaded.intersection(HEAVY_MODULES))
+
+def regressions(label: str, import_ms: float, heavy: list, baseline: dict) -> list:
+    expected = baseline.get(label)
+    if expected is None:
+        return [f"{label}: no baseline (run with --update-baseline)"]
+    found = []
+    extra = sorted(set(heavy) - set(expected["heavy"]))
+    if extra:
+        found.append(f"{label}: imports {', '.join(extra)}")
+    limit = expected["import_ms"] * (1 + TIME_TOLERANCE) + TIME_SLACK_MS
+    if import_ms > limit:
+        found.append(f"{label}: import time {import_ms:.1f} ms (baseline {expected['import_ms']:.1f} ms)")
+    return found
+
+def main():
+    check = "--check" in sys.argv
+    update = "--update-baseline" in sys.argv
+    baseline = json.loads(BASELINE_FILE.read_text()) if BASELINE_FILE.exists() else {}
+    results = {}
+    failures = []
+    with tempfile.TemporaryDirectory() as home:
+        print(f"{'command':<20} {'wall ms':>9} {'import ms':>10}  heavy modules")
+        for args in COMMANDS:
+            runs = [measure(args, home) for _ in range(RUNS)]
+            wall = min(r[0] for r in runs)
+            import_ms = min(r[1] for r in runs) / 1000
+            heavy = sorted(set().union(*(r[2] for r in runs)))
+            label = " ".join(args)
+            print(f"{label:<20} {wall * 1000:9.1f} {import_ms:10.1f}  {', '.join(heavy) or '-'}")
+            results[label] = {"import_ms": round(import_ms, 1), "heavy": heavy}
+            failures += regressions(label, import_ms, heavy, baseline)
+
+    if update:
+        BASELINE_FILE.write_text(json.dumps(results, indent=2) + "\n")
+        print(f"\nBaseline written to {BASELINE_FILE.name}")
+    elif check and failures:
+        print("\nRegression:\n  " + "\n  ".join(failures))
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
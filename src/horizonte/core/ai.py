@@ -1,85 +1,79 @@
 import os
 import json
-import re
-from typing import Optional, Dict, List
-from dotenv import load_dotenv
-from openai import OpenAI
+from typing import Optional, Dict, List, Type, TYPE_CHECKING
+from pydantic import BaseModel
 from rich.console import Console
-from rich.panel import Panel
 
+from horizonte.core import structured
 from horizonte.core.models import SmartCriteria
+from horizonte.core.targets import quantities
 
-load_dotenv()
+if TYPE_CHECKING:
+    from openai import OpenAI
 
 console = Console()
 
-def _extract_value_from_text(text: str) -> Optional[float]:
+def get_ai_client() -> Optional["OpenAI"]:
     """
-    Extracts a financial/numeric value from text using Python regex.
-    Handles 'k', 'm', 'mi', 'bi' suffixes and pt-BR formatting.
+    Shared, connection-pooled client (see horizonte.core.ai_client). None while the
+    circuit breaker is open, so every caller goes straight to its offline fallback.
     """
-    if not text:
-        return None
-        
-    clean_text = text.lower().replace("r$", "").replace("us$", "").strip()
-    
-    # Regex to capture number + optional suffix
-    # Matches: 227k, 227.5k, 1.5m, 1000, 1,000.00
-    match = re.search(r'([\d\.,]+)\s*(k|m|mi|bi|t)?', clean_text)
-    if not match:
-        return None
-        
-    num_str = match.group(1)
-    suffix = match.group(2)
-    
-    # Normalize number string (handling pt-BR dots/commas)
-    if '.' in num_str and ',' in num_str:
-        num_str = num_str.replace('.', '').replace(',', '.')
-    elif ',' in num_str:
-        # If only comma, assume decimal
-        num_str = num_str.replace(',', '.')
-    
-    try:
-        val = float(num_str)
-    except ValueError:
+    from horizonte.core.ai_client import get_client
+    from horizonte.core.ai_executor import get_executor
+
+    if not get_executor().available():
         return None
-        
-    if suffix:
-        if suffix == 'k':
-            val *= 1000
-        elif suffix in ['m', 'mi']:
-            val *= 1_000_000
-        elif suffix == 'bi':
-            val *= 1_000_000_000
-            
-    return val
+    return get_client()
 
+DEFAULT_MODEL = "google/gemini-2.0-flash-exp:free"
 
-def get_ai_client() -> Optional[OpenAI]:
-    api_key = os.getenv("OPENROUTER_API_KEY")
-    if not api_key:
-        return None
-    
-    return OpenAI(
-        base_url="https://openrouter.ai/api/v1",
-        api_key=api_key,
-    )
+def get_model() -> str:
+    return os.getenv("OPENROUTER_MODEL", DEFAULT_MODEL)
 
-def suggest_smart_criteria(title: str, description: str, category: str, horizon: str) -> Optional[SmartCriteria]:
-    client = get_ai_client()
-    if not client:
-        # Fallback quiet or notify once? Assuming already checked.
-        return None
-    
-    model = os.getenv("OPENROUTER_MODEL", "google/gemini-2.0-flash-exp:free")
-    
+def _complete(client, messages: List[dict], temperature: float, schema: Optional[Type[BaseModel]] = None,
+              refresh: bool = False) -> str:
+    """
+    Runs one chat completion and returns the stripped text (served from the response cache when possible,
+    unless refresh=True, used when the user explicitly asks for a new answer).
+    With a schema the answer is requested in JSON mode; models that reject it are asked again without it.
+    """
+    from horizonte.core import ai_cache
+    from horizonte.core.ai_executor import get_executor
+
+    model = get_model()
+    key, cached = ai_cache.lookup(model, messages, temperature, refresh=refresh)
+    if cached is not None:
+        return cached
+
+    def create(**extra):
+        # Retries, rate limits and the circuit breaker live in the executor
+        return get_executor().call(model, lambda: client.chat.completions.create(
+            model=model,
+            messages=messages,
+            temperature=temperature,
+            **extra,
+        ))
+
+    response = structured.create_with_fallback(create, schema, model)
+    content = response.choices[0].message.content.strip()
+    ai_cache.store(key, model, content)
+    return content
+
+# ---------------------------------------------------------------------------
+# Request builders / response parsers
+# Shared by the sync API below and the asyncio API in horizonte.core.ai_async.
+# Each builder returns (messages, temperature[, response schema]).
+# ---------------------------------------------------------------------------
+
+def build_smart_criteria_request(title: str, description: str, category: Optional[str], horizon: str):
+    category_line = f"Categoria: {category}" if category else ""
     prompt = f"""
     Atue como um especialista em produtividade e objetivos (Life Coach).
     O usuário tem o seguinte objetivo:
     
     Título: {title}
     Descrição: {description}
-    Categoria: {category}
+    {category_line}
     Horizonte: {horizon}
     
     Sua tarefa é expandir este objetivo em critérios SMART (Específico, Mensurável, Atingível, Relevante, Temporal).
@@ -94,50 +88,16 @@ def suggest_smart_criteria(title: str, description: str, category: str, horizon:
         "time_bound": "..."
     }}
     """
-    
-    try:
-        with console.status("[bold green]Consultando a IA para refinar seu objetivo...[/bold green]"):
-            response = client.chat.completions.create(
-                model=model,
-                messages=[
-                    {"role": "system", "content": "You are a helpful assistant that outputs JSON."},
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=0.7,
-            )
-            
-            content = response.choices[0].message.content.strip()
-            
-            # Remove markdown logic if present
-            if content.startswith("```json"):
-                content = content.replace("```json", "").replace("```", "")
-            elif content.startswith("```"):
-                content = content.replace("```", "")
-                
-            data = json.loads(content)
-            
-            return SmartCriteria(
-                specific=data.get("specific", ""),
-                measurable=data.get("measurable", ""),
-                achievable=data.get("achievable", ""),
-                relevant=data.get("relevant", ""),
-                time_bound=data.get("time_bound", "")
-            )
-            
-    except Exception as e:
-        console.print(f"[red]Erro ao consultar IA: {str(e)}[/red]")
-        return None
+    messages = [
+        {"role": "system", "content": "You are a helpful assistant that outputs JSON."},
+        {"role": "user", "content": prompt}
+    ]
+    return messages, 0.7, SmartCriteria
 
-def refine_smart_field(field_name: str, current_value: str, context_goal: Dict[str, str], user_instruction: str = None) -> Optional[str]:
-    """
-    Refine a specific SMART field using AI suggestion, optionally guided by user instruction.
-    """
-    client = get_ai_client()
-    if not client:
-        return None
-    
-    model = os.getenv("OPENROUTER_MODEL", "google/gemini-2.0-flash-exp:free")
-    
+def parse_smart_criteria(content: str) -> SmartCriteria:
+    return structured.parse_smart_criteria(content)
+
+def build_refine_request(field_name: str, current_value: str, context_goal: Dict[str, str], user_instruction: str = None):
     base_instruction = """
     Sua tarefa: Melhore e refine este texto para torná-lo mais forte, claro e acionável, mantendo o sentido original.
     Se o texto original for muito breve ou vago, expanda-o.
@@ -165,33 +125,13 @@ def refine_smart_field(field_name: str, current_value: str, context_goal: Dict[s
     Responda APENAS com o texto melhorado/reescrito, sem aspas e sem explicações adicionais.
     Responda em Português (Brasil).
     """
-    
-    try:
-        with console.status(f"[bold green]Refinando '{field_name}'...[/bold green]"):
-            response = client.chat.completions.create(
-                model=model,
-                messages=[
-                    {"role": "system", "content": "You are a helpful assistant."},
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=0.7,
-            )
-            return response.choices[0].message.content.strip()
-            
-    except Exception as e:
-        console.print(f"[red]Erro ao refinar: {str(e)}[/red]")
-        return None
+    messages = [
+        {"role": "system", "content": "You are a helpful assistant."},
+        {"role": "user", "content": prompt}
+    ]
+    return messages, 0.7
 
-def suggest_category(title: str, description: str, avail_categories: list) -> Optional[str]:
-    """
-    Suggests a category for the goal based on title and description.
-    """
-    client = get_ai_client()
-    if not client:
-        return None
-        
-    model = os.getenv("OPENROUTER_MODEL", "google/gemini-2.0-flash-exp:free")
-    
+def build_category_request(title: str, description: str, avail_categories: list):
     prompt = f"""
     Com base no Título e Descrição do objetivo abaixo, classifique-o EM UMA das seguintes categorias:
     {', '.join(avail_categories)}
@@ -202,31 +142,12 @@ def suggest_category(title: str, description: str, avail_categories: list) -> Op
     Retorne APENAS a palavra da categoria escolhida, em minúsculas, sem pontuação.
     Se nenhuma se encaixar perfeitamente, retorne 'outros'.
     """
-    
-    try:
-        with console.status("[bold green]Sugerindo categoria...[/bold green]"):
-            response = client.chat.completions.create(
-                model=model,
-                messages=[
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=0.3,
-            )
-            return response.choices[0].message.content.strip().lower()
-    except Exception as e:
-        console.print(f"[red]Erro ao sugerir categoria: {str(e)}[/red]")
-        return None
+    return [{"role": "user", "content": prompt}], 0.3
 
-def generate_checkin_interaction(goals: list, period: str) -> str:
-    """
-    Generates a fun, interactive intro for the check-in session using AI.
-    """
-    client = get_ai_client()
-    if not client:
-        return f"Bem-vindo ao seu check-in de {period}! Vamos ver como você está indo."
-    
-    model = os.getenv("OPENROUTER_MODEL", "google/gemini-2.0-flash-exp:free")
-    
+def checkin_intro_fallback(period: str) -> str:
+    return f"Bem-vindo ao seu check-in de {period}! Vamos ver como você está indo."
+
+def build_checkin_intro_request(goals: list, period: str):
     goals_summary = "\n".join([f"- {g.title} ({g.category.value})" for g in goals])
     
     prompt = f"""
@@ -241,34 +162,12 @@ def generate_checkin_interaction(goals: list, period: str) -> str:
     
     Responda em Português (Brasil).
     """
-    
-    try:
-        with console.status("[bold magenta]Preparando seu check-in...[/bold magenta]"):
-            response = client.chat.completions.create(
-                model=model,
-                messages=[
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=0.7,
-            )
-            return response.choices[0].message.content.strip()
-    except Exception as e:
-        return f"Bem-vindo ao seu check-in de {period}! Vamos ver como você está indo."
+    return [{"role": "user", "content": prompt}], 0.7
 
-def analyze_checkin_period(checkin_data: list, user_reflection: str, period: str, user_instruction: str = None) -> Optional[str]:
-    """
-    Analyzes the check-in data and user reflection to provide a cohesive summary.
-    """
-    client = get_ai_client()
-    if not client:
-        return None
-        
-    model = os.getenv("OPENROUTER_MODEL", "google/gemini-2.0-flash-exp:free")
-    
+def build_checkin_analysis_request(checkin_data: list, user_reflection: str, period: str, user_instruction: str = None):
     updates_text = ""
     for item in checkin_data:
         g = item['goal']
-        diff = item['new_percent'] - item['old_percent']
         updates_text += f"- {g.title}: {item['old_percent']}% -> {item['new_percent']}% (Total: {g.progress_percentage}%). Comentário: {item['comment']}\n"
     
     base_instruction = """
@@ -297,62 +196,17 @@ def analyze_checkin_period(checkin_data: list, user_reflection: str, period: str
     
     Responda em Português (Brasil).
     """
-    
-    try:
-        with console.status("[bold magenta]Analisando seu progresso...[/bold magenta]"):
-            response = client.chat.completions.create(
-                model=model,
-                messages=[
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=0.7,
-            )
-            return response.choices[0].message.content.strip()
-    except Exception as e:
-        console.print(f"[red]Erro na análise: {str(e)}[/red]")
-        return None
+    return [{"role": "user", "content": prompt}], 0.7
 
-def process_intelligent_checkin(user_text: str, goals: list) -> list:
-    """
-    Parses user natural language text to extract progress updates for goals.
-    Supports value translation (e.g. 150k/1M -> 15%).
-    Returns a list of dicts: [{'goal_id': str, 'new_percent': int, 'comment': str, 'confidence': float}]
-    """
-    client = get_ai_client()
-    if not client:
-        return []
-        
-    model = os.getenv("OPENROUTER_MODEL", "google/gemini-2.0-flash-exp:free")
-    
-    # Context for AI
-    goals_context = []
-    for g in goals:
-        # Pre-calculate target from title/description
-        inferred_target = _extract_value_from_text(g.title)
-        if inferred_target is None:
-            inferred_target = _extract_value_from_text(g.description)
-
-        goals_context.append({
-            "id": g.id,
-            "title": g.title,
-            "description": g.description,
-            "category": g.category.value if hasattr(g.category, 'value') else str(g.category),
-            "horizon": g.horizon.value if hasattr(g.horizon, 'value') else str(g.horizon),
-            "current_percent": g.progress_percentage,
-            "smart_measurable": g.smart_criteria.measurable,
-            "inferred_target_value": inferred_target
-        })
-        
+def build_intelligent_checkin_request(user_text: str, goals: list):
+    # Context for AI: only the most relevant goals, trimmed to the token budget
+    from horizonte.core import prompt_budget
+    
+    goals_context, size = prompt_budget.build_goal_context(user_text, goals)
     goals_json = json.dumps(goals_context, ensure_ascii=False)
     
-    # Pre-extract numbers from user input as hints
-    inferred_input_values = []
-    # Find all potential matches in user text
-    matches = re.finditer(r'([\d\.,]+)\s*(k|m|mi|bi|t)?', user_text.lower())
-    for m in matches:
-        val = _extract_value_from_text(m.group(0))
-        if val is not None:
-            inferred_input_values.append(val)
+    # Pre-extract numbers from user input as hints (precompiled patterns)
+    inferred_input_values = [q.value for q in quantities(user_text)]
     
     input_hints = f"Números detectados via Python no input: {inferred_input_values}"
     
@@ -376,100 +230,81 @@ def process_intelligent_checkin(user_text: str, goals: list) -> list:
        - 'current_value': Tente casar os números do texto do usuário com o valor atual deste objetivo.
        - Se o usuário disse "277k em 27", e '277k' está nos hints, use 277000.
     
-    Retorne APENAS um JSON array. Formato:
-    [
-        {{
-            "goal_id": "id_do_objetivo",
-            "target_value": 227000, 
-            "current_value": 277000,
-            "delta_value": null,
-            "explicit_percent": null,
-            "comment": "Comentário curto.",
-            "reasoning": "Texto explicativo"
-        }}
+    Retorne APENAS um objeto JSON com a lista de updates na chave "updates". Formato:
+    {{
+        "updates": [
+            {{
+                "goal_id": "id_do_objetivo",
+                "target_value": 227000, 
+                "current_value": 277000,
+                "delta_value": null,
+                "explicit_percent": null,
+                "comment": "Comentário curto.",
+                "reasoning": "Texto explicativo"
+            }}
+        ]
+    }}
+    """
+    messages = [
+        {"role": "system", "content": "You are a helpful assistant that outputs JSON. Convert all written numbers (k, M, mi) to float."},
+        {"role": "user", "content": prompt}
     ]
+    prompt_budget.record(size, sum(prompt_budget.estimate_tokens(m["content"]) for m in messages))
+    return messages, 0.1, structured.CheckinUpdates
+
+def apply_checkin_math(raw_data: list, goals: list) -> list:
+    """
+    Post-processing with Python Math: turns the model's extracted values into
+    [{'goal_id', 'new_percent', 'comment', 'reasoning'}].
     """
+    processed_data = []
     
-    try:
-        with console.status("[bold cyan]Interpretando seu check-in com IA + Math Engine...[/bold cyan]"):
-            response = client.chat.completions.create(
-                model=model,
-                messages=[
-                    {"role": "system", "content": "You are a helpful assistant that outputs JSON. Convert all written numbers (k, M, mi) to float."},
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=0.1, 
-            )
-            
-            content = response.choices[0].message.content.strip()
-            
-            # Cleanup Markdown
-            if content.startswith("```json"):
-                content = content.replace("```json", "").replace("```", "")
-            elif content.startswith("```"):
-                content = content.replace("```", "")
-            
-            raw_data = json.loads(content)
-            
-            # Post-processing with Python Math
-            processed_data = []
+    # Get goal objects for reference
+    goals_map = {g.id: g for g in goals}
+    
+    for item in raw_data:
+        g_id = item.get("goal_id")
+        goal = goals_map.get(g_id)
+        if not goal:
+            continue
             
-            # Get goal objects for reference
-            goals_map = {g.id: g for g in goals}
+        new_percent = goal.progress_percentage # Default to no change
+        
+        # Math Logic
+        if item.get("explicit_percent") is not None:
+            new_percent = float(item["explicit_percent"])
+        
+        elif item.get("target_value"):
+            target = float(item["target_value"])
+            current = None
             
-            for item in raw_data:
-                g_id = item.get("goal_id")
-                goal = goals_map.get(g_id)
-                if not goal:
-                    continue
-                    
-                new_percent = goal.progress_percentage # Default to no change
-                
-                # Math Logic
-                if item.get("explicit_percent") is not None:
-                    new_percent = float(item["explicit_percent"])
-                
-                elif item.get("target_value"):
-                    target = float(item["target_value"])
-                    current = None
-                    
-                    if item.get("current_value") is not None:
-                        current = float(item["current_value"])
-                    elif item.get("delta_value") is not None:
-                        # Infer current from previous % + delta
-                        # Current Abs = (Old % * Target / 100) + Delta
-                        old_abs = (goal.progress_percentage / 100.0) * target
-                        current = old_abs + float(item["delta_value"])
-                        
-                    if current is not None and target > 0:
-                        new_percent = (current / target) * 100.0
-                
-                # Cap at 0-100
-                new_percent = max(0, min(100, int(round(new_percent))))
+            if item.get("current_value") is not None:
+                current = float(item["current_value"])
+            elif item.get("delta_value") is not None:
+                # Infer current from previous % + delta
+                # Current Abs = (Old % * Target / 100) + Delta
+                old_abs = (goal.progress_percentage / 100.0) * target
+                current = old_abs + float(item["delta_value"])
                 
-                processed_data.append({
-                    "goal_id": g_id,
-                    "new_percent": new_percent,
-                    "comment": item.get("comment", ""),
-                    "reasoning": item.get("reasoning", "")
-                })
-                
-            return processed_data
-            
-    except Exception as e:
-        console.print(f"[red]Erro ao processar check-in inteligente: {str(e)}[/red]")
-        return []
-
-def suggest_milestones(title: str, description: str, current_smart: str) -> List[str]:
-    """
-    Suggests a list of 3-5 milestones for a goal.
-    """
-    client = get_ai_client()
-    if not client:
-        return []
+            if current is not None and target > 0:
+                new_percent = (current / target) * 100.0
         
-    model = os.getenv("OPENROUTER_MODEL", "google/gemini-2.0-flash-exp:free")
-    
+        # Cap at 0-100
+        new_percent = max(0, min(100, int(round(new_percent))))
+        
+        processed_data.append({
+            "goal_id": g_id,
+            "new_percent": new_percent,
+            "comment": item.get("comment", ""),
+            "reasoning": item.get("reasoning", "")
+        })
+        
+    return processed_data
+
+def parse_intelligent_checkin(content: str, goals: list) -> list:
+    return apply_checkin_math(structured.parse_checkin_updates(content), goals)
+
+def build_milestones_request(title: str, description: str, current_smart: str):
     prompt = f"""
     Contexto do Objetivo:
     Título: {title}
@@ -483,28 +318,182 @@ def suggest_milestones(title: str, description: str, current_smart: str) -> List
     Retorne APENAS um JSON array de strings:
     ["Milestone 1", "Milestone 2", "Milestone 3"]
     """
+    messages = [
+        {"role": "system", "content": "You are a helpful assistant that outputs JSON arrays."},
+        {"role": "user", "content": prompt}
+    ]
+    return messages, 0.5
+
+def parse_milestones(content: str) -> List[str]:
+    data = structured.loads(content, whole_items=True)
+    if isinstance(data, list):
+        return [str(i) for i in data]
+    return []
+
+# Goals per bulk request: keeps the JSON answer well within the model's output limits
+BULK_BATCH_SIZE = 10
+
+def build_bulk_goals_request(goals: List[dict], avail_categories: list):
+    """goals: [{'title', 'description', 'horizon'}] — answered in one structured request."""
+    goals_json = json.dumps(
+        [{"index": i, **g} for i, g in enumerate(goals)], ensure_ascii=False
+    )
+    prompt = f"""
+    Atue como um especialista em produtividade e objetivos (Life Coach).
+    O usuário está cadastrando vários objetivos de uma vez:
+    
+    {goals_json}
+    
+    Para CADA objetivo:
+    1. Classifique-o EM UMA das categorias: {', '.join(avail_categories)} (se nenhuma se encaixar, use 'outros').
+    2. Expanda-o em critérios SMART (Específico, Mensurável, Atingível, Relevante, Temporal), de forma concisa, direta e prática.
+    3. Quebre-o em 3 a 5 "Milestones" (marcos intermediários) curtos, acionáveis e sequenciais.
+    Responda em Português (Brasil).
+    
+    Retorne APENAS um JSON array com um item por objetivo, sem markdown code blocks:
+    [
+        {{
+            "index": 0,
+            "category": "...",
+            "smart": {{
+                "specific": "...",
+                "measurable": "...",
+                "achievable": "...",
+                "relevant": "...",
+                "time_bound": "..."
+            }},
+            "milestones": ["Milestone 1", "Milestone 2", "Milestone 3"]
+        }}
+    ]
+    """
+    messages = [
+        {"role": "system", "content": "You are a helpful assistant that outputs JSON arrays."},
+        {"role": "user", "content": prompt}
+    ]
+    return messages, 0.5
+
+def parse_bulk_goals(content: str, count: int) -> List[Optional[dict]]:
+    """
+    Returns one item per requested goal (same order): {'category', 'smart', 'milestones'}
+    or None when the model skipped it (or the answer was cut before it).
+    """
+    data = structured.loads(content, whole_items=True)
+    results: List[Optional[dict]] = [None] * count
+    if not isinstance(data, list):
+        return results
+    for pos, item in enumerate(data):
+        if not isinstance(item, dict):
+            continue
+        index = item.get("index", pos)
+        if not isinstance(index, int) or not 0 <= index < count:
+            continue
+        smart = item.get("smart") or {}
+        results[index] = {
+            "category": str(item.get("category", "")).strip().lower() or None,
+            "smart": SmartCriteria(
+                specific=smart.get("specific", ""),
+                measurable=smart.get("measurable", ""),
+                achievable=smart.get("achievable", ""),
+                relevant=smart.get("relevant", ""),
+                time_bound=smart.get("time_bound", "")
+            ) if smart else None,
+            "milestones": [str(m) for m in item.get("milestones", []) if m],
+        }
+    return results
+
+def _chunks(items: list, size: int) -> List[list]:
+    return [items[i:i + size] for i in range(0, len(items), size)]
+
+# ---------------------------------------------------------------------------
+# Sync API
+# ---------------------------------------------------------------------------
+
+def refine_smart_field(field_name: str, current_value: str, context_goal: Dict[str, str], user_instruction: str = None,
+                       refresh: bool = False) -> Optional[str]:
+    """
+    Refine a specific SMART field using AI suggestion, optionally guided by user instruction.
+    refresh=True skips the response cache (explicit "regenerate").
+    """
+    client = get_ai_client()
+    if not client:
+        return None
+    
+    messages, temperature = build_refine_request(field_name, current_value, context_goal, user_instruction)
     
     try:
-        with console.status("[bold cyan]Gerando milestones...[/bold cyan]"):
-            response = client.chat.completions.create(
-                model=model,
-                messages=[
-                    {"role": "system", "content": "You are a helpful assistant that outputs JSON arrays."},
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=0.5,
-            )
+        with console.status(f"[bold green]Refinando '{field_name}'...[/bold green]"):
+            return _complete(client, messages, temperature, refresh=refresh)
             
-            content = response.choices[0].message.content.strip()
-            if content.startswith("```json"):
-                content = content.replace("```json", "").replace("```", "")
-            elif content.startswith("```"):
-                content = content.replace("```", "")
-                
-            data = json.loads(content)
-            if isinstance(data, list):
-                return [str(i) for i in data]
-            return []
+    except Exception as e:
+        console.print(f"[red]Erro ao refinar: {str(e)}[/red]")
+        return None
+
+def generate_checkin_interaction(goals: list, period: str) -> str:
+    """
+    Generates a fun, interactive intro for the check-in session using AI.
+    """
+    client = get_ai_client()
+    if not client:
+        return checkin_intro_fallback(period)
+    
+    messages, temperature = build_checkin_intro_request(goals, period)
+    
+    try:
+        with console.status("[bold magenta]Preparando seu check-in...[/bold magenta]"):
+            return _complete(client, messages, temperature)
+    except Exception:
+        return checkin_intro_fallback(period)
+
+def analyze_checkin_period(checkin_data: list, user_reflection: str, period: str, user_instruction: str = None,
+                           refresh: bool = False) -> Optional[str]:
+    """
+    Analyzes the check-in data and user reflection to provide a cohesive summary.
+    refresh=True skips the response cache (explicit "regenerate").
+    """
+    client = get_ai_client()
+    if not client:
+        return None
+        
+    messages, temperature = build_checkin_analysis_request(checkin_data, user_reflection, period, user_instruction)
+    
+    try:
+        with console.status("[bold magenta]Analisando seu progresso...[/bold magenta]"):
+            return _complete(client, messages, temperature, refresh=refresh)
+    except Exception as e:
+        console.print(f"[red]Erro na análise: {str(e)}[/red]")
+        return None
+
+def process_intelligent_checkin(user_text: str, goals: list) -> list:
+    """
+    Parses user natural language text to extract progress updates for goals.
+    Supports value translation (e.g. 150k/1M -> 15%).
+    Runs ai_async.process_intelligent_checkin (offline parser first, LLM only for what is
+    left) on the background loop.
+    Returns a list of dicts: [{'goal_id': str, 'new_percent': int, 'comment': str, 'reasoning': str}]
+    """
+    from horizonte.core import ai_async
+    
+    future = ai_async.run_in_background(ai_async.process_intelligent_checkin(user_text, goals))
+    return ai_async.wait(
+        future,
+        "[bold cyan]Interpretando seu check-in com IA + Math Engine...[/bold cyan]",
+        default=[],
+        error_label="Erro ao processar check-in inteligente",
+    )
+
+def suggest_milestones(title: str, description: str, current_smart: str) -> List[str]:
+    """
+    Suggests a list of 3-5 milestones for a goal.
+    """
+    client = get_ai_client()
+    if not client:
+        return []
+        
+    messages, temperature = build_milestones_request(title, description, current_smart)
+    
+    try:
+        with console.status("[bold cyan]Gerando milestones...[/bold cyan]"):
+            return parse_milestones(_complete(client, messages, temperature))
             
     except Exception as e:
         console.print(f"[red]Erro ao gerar milestones: {str(e)}[/red]")
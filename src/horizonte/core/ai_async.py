@@ -0,0 +1,356 @@
+"""
+asyncio variant of the horizonte.core.ai API.
+
+Prompts and response parsing are shared with the sync module; only the transport
+differs (AsyncOpenAI). Coroutines run on one long-lived background event loop so
+the interactive commands can start independent AI calls early (e.g. while the user
+is still answering a prompt) and only block when the result is actually needed.
+"""
+import asyncio
+import atexit
+import os
+import threading
+from concurrent.futures import Future
+from typing import Any, Coroutine, List, Optional, Type
+
+from pydantic import BaseModel
+from rich.console import Console
+
+from horizonte.core import ai
+from horizonte.core.ai_executor import get_executor
+from horizonte.core.models import SmartCriteria
+
+console = Console()
+
+_loop: Optional[asyncio.AbstractEventLoop] = None
+_loop_lock = threading.Lock()
+
+def _get_loop() -> asyncio.AbstractEventLoop:
+    global _loop
+    with _loop_lock:
+        if _loop is None:
+            _loop = asyncio.new_event_loop()
+            thread = threading.Thread(target=_loop.run_forever, name="horizonte-ai", daemon=True)
+            thread.start()
+        return _loop
+
+def run_in_background(coro: Coroutine) -> Future:
+    """Schedules a coroutine on the background loop and returns immediately."""
+    return asyncio.run_coroutine_threadsafe(coro, _get_loop())
+
+def run_sync(coro: Coroutine) -> Any:
+    return run_in_background(coro).result()
+
+def wait(future: Future, status: str, default: Any = None, error_label: Optional[str] = None) -> Any:
+    """
+    Blocks on a background AI call, with a spinner only if it is still running.
+    Errors are reported here (on the main thread) and turned into `default`.
+    """
+    try:
+        if future.done():
+            return future.result()
+        with console.status(status):
+            return future.result()
+    except Exception as e:
+        if error_label:
+            console.print(f"[red]{error_label}: {str(e)}[/red]")
+        return default
+
+def shutdown():
+    global _loop
+    with _loop_lock:
+        loop, _loop = _loop, None
+    if loop is None:
+        return
+    from horizonte.core.ai_client import aclose_async_clients
+
+    try:
+        asyncio.run_coroutine_threadsafe(aclose_async_clients(), loop).result(timeout=5)
+    except Exception:
+        pass
+    loop.call_soon_threadsafe(loop.stop)
+
+atexit.register(shutdown)
+
+def _get_client():
+    """Shared async client, or None without an API key or while the circuit breaker is open."""
+    from horizonte.core.ai_client import get_async_client
+
+    if not get_executor().available():
+        return None
+    return get_async_client()
+
+async def _complete(messages: List[dict], temperature: float, schema: Optional[Type[BaseModel]] = None) -> Optional[str]:
+    from horizonte.core import ai_cache, structured
+
+    client = _get_client()
+    if not client:
+        return None
+    model = ai.get_model()
+    key, cached = ai_cache.lookup(model, messages, temperature)
+    if cached is not None:
+        return cached
+
+    async def create(**extra):
+        return await get_executor().acall(model, lambda: client.chat.completions.create(
+            model=model,
+            messages=messages,
+            temperature=temperature,
+            **extra,
+        ))
+
+    response = await structured.acreate_with_fallback(create, schema, model)
+    content = response.choices[0].message.content.strip()
+    ai_cache.store(key, model, content)
+    return content
+
+# The coroutines below raise on API/parse errors; use wait() to surface them.
+
+async def suggest_smart_criteria(title: str, description: str, category: Optional[str], horizon: str) -> Optional[SmartCriteria]:
+    content = await _complete(*ai.build_smart_criteria_request(title, description, category, horizon))
+    return ai.parse_smart_criteria(content) if content else None
+
+async def suggest_category(title: str, description: str, avail_categories: list) -> Optional[str]:
+    content = await _complete(*ai.build_category_request(title, description, avail_categories))
+    return content.lower() if content else None
+
+async def generate_checkin_interaction(goals: list, period: str) -> str:
+    try:
+        content = await _complete(*ai.build_checkin_intro_request(goals, period))
+    except Exception:
+        content = None
+    return content or ai.checkin_intro_fallback(period)
+
+# Shard requests in flight at the same time
+SHARD_CONCURRENCY = 4
+
+async def parse_checkin_sharded(user_text: str, goals: list, key: str = "category") -> list:
+    """
+    One parsing request per shard of goals (see prompt_budget.shard_goals), at most
+    SHARD_CONCURRENCY at a time. Results are merged and de-duplicated by goal_id; failed
+    shards are skipped unless every shard failed.
+    """
+    from horizonte.core import metrics
+    from horizonte.core.prompt_budget import shard_goals
+
+    shards = shard_goals(goals, key)
+    semaphore = asyncio.Semaphore(SHARD_CONCURRENCY)
+
+    async def run(shard: list) -> list:
+        async with semaphore:
+            content = await _complete(*ai.build_intelligent_checkin_request(user_text, shard))
+        return ai.parse_intelligent_checkin(content, shard) if content else []
+
+    results = await asyncio.gather(*(run(shard) for shard in shards), return_exceptions=True)
+    metrics.increment("checkin.shards", len(shards))
+
+    errors = [r for r in results if isinstance(r, BaseException)]
+    if errors and len(errors) == len(results):
+        raise errors[0]
+
+    merged = {}
+    for updates in results:
+        if isinstance(updates, BaseException):
+            continue
+        for update in updates:
+            merged.setdefault(update["goal_id"], update)
+    return list(merged.values())
+
+async def process_intelligent_checkin(user_text: str, goals: list) -> list:
+    """
+    Progress updates from a conversational check-in (see ai.process_intelligent_checkin).
+    The offline parser resolves what it can; the clauses it did not resolve (and the goals
+    not updated locally) are sent to the LLM, which is skipped only when every clause was
+    resolved. If that call fails the local updates are kept.
+    """
+    from horizonte.core import metrics
+    from horizonte.core.checkin_parser import parse_checkin
+    from horizonte.core.prompt_budget import SHARD_THRESHOLD, shard_key
+
+    local = parse_checkin(user_text, goals)
+    if local.updates:
+        metrics.increment("checkin.local_updates", len(local.updates))
+    resolved = {u["goal_id"] for u in local.updates}
+    remaining_goals = [g for g in goals if g.id not in resolved]
+    if not local.ambiguous or not remaining_goals or not _get_client():
+        return local.updates
+    ambiguous_text = ". ".join(local.ambiguous)
+    metrics.increment("checkin.llm_calls")
+    try:
+        if len(remaining_goals) > SHARD_THRESHOLD:
+            # Many goals: concurrent per-category (or horizon) requests instead of one huge prompt
+            return local.updates + await parse_checkin_sharded(ambiguous_text, remaining_goals, shard_key())
+        content = await _complete(*ai.build_intelligent_checkin_request(ambiguous_text, remaining_goals))
+    except Exception as e:
+        console.print(f"[red]Erro ao processar check-in inteligente: {str(e)}[/red]")
+        return local.updates
+    return local.updates + (ai.parse_intelligent_checkin(content, remaining_goals) if content else [])
+
+async def suggest_milestones(title: str, description: str, current_smart: str) -> List[str]:
+    content = await _complete(*ai.build_milestones_request(title, description, current_smart))
+    return ai.parse_milestones(content) if content else []
+
+async def _stream_into(buffer: "StreamBuffer", messages: List[dict], temperature: float, refresh: bool = False) -> Optional[str]:
+    from horizonte.core import ai_cache
+
+    client = _get_client()
+    if not client:
+        return None
+    model = ai.get_model()
+    key, cached = ai_cache.lookup(model, messages, temperature, refresh=refresh)
+    if cached is not None:
+        buffer.append(cached)
+        return cached
+    # Only opening the stream is retried; a stream that breaks midway is not restarted
+    response = await get_executor().acall(model, lambda: client.chat.completions.create(
+        model=model,
+        messages=messages,
+        temperature=temperature,
+        stream=True,
+    ))
+    # Closing the response on exit (including cancellation) releases the connection
+    async with response as stream:
+        async for chunk in stream:
+            delta = chunk.choices[0].delta.content if chunk.choices else None
+            if delta:
+                buffer.append(delta)
+    # Only complete streams are cached (cancellation raises before this point)
+    content = buffer.text.strip()
+    ai_cache.store(key, model, content)
+    return content
+
+async def _stream_json(messages: List[dict], temperature: float) -> Optional[str]:
+    """
+    Streams a JSON answer. If the connection drops midway, the text received so far is
+    returned (uncached) and the tolerant parser in core.structured keeps its complete items.
+    """
+    buffer = StreamBuffer()
+    try:
+        return await _stream_into(buffer, messages, temperature)
+    except Exception:
+        if not buffer.text.strip():
+            raise
+        return buffer.text
+
+# Bulk batches sent at the same time (free-tier models are heavily rate limited)
+BULK_CONCURRENCY = 3
+
+async def suggest_goals_bulk(goals: List[dict], avail_categories: list) -> List[Optional[dict]]:
+    """
+    SMART criteria, category and milestones for many goals, one request per
+    ai.BULK_BATCH_SIZE goals; the batches run concurrently. Items are None where the AI
+    gave no answer (a failed batch yields None items).
+    """
+    semaphore = asyncio.Semaphore(BULK_CONCURRENCY)
+
+    async def run(chunk: List[dict]) -> List[Optional[dict]]:
+        async with semaphore:
+            try:
+                request = ai.build_bulk_goals_request(chunk, avail_categories)
+                content = await (_stream_json(*request) if streaming_enabled() else _complete(*request))
+            except Exception:
+                content = None
+            if not content:
+                return [None] * len(chunk)
+            try:
+                return ai.parse_bulk_goals(content, len(chunk))
+            except ValueError:
+                return [None] * len(chunk)
+
+    batches = await asyncio.gather(*(run(chunk) for chunk in ai._chunks(goals, ai.BULK_BATCH_SIZE)))
+    return [item for batch in batches for item in batch]
+
+# ---------------------------------------------------------------------------
+# Streaming
+# ---------------------------------------------------------------------------
+
+def streaming_enabled() -> bool:
+    return os.getenv("HORIZONTE_AI_STREAM", "1").lower() not in ("0", "false", "no")
+
+class StreamBuffer:
+    """Text received so far from a streamed completion, shared with the rendering thread."""
+    def __init__(self):
+        self._parts: List[str] = []
+        self._changed = threading.Condition()
+
+    def append(self, text: str):
+        with self._changed:
+            self._parts.append(text)
+            self._changed.notify_all()
+
+    def wait_for_change(self, seen: int, timeout: float) -> int:
+        with self._changed:
+            self._changed.wait_for(lambda: len(self._parts) != seen, timeout=timeout)
+            return len(self._parts)
+
+    @property
+    def text(self) -> str:
+        with self._changed:
+            return "".join(self._parts)
+
+class ResponseStream:
+    """
+    A streamed completion running on the background loop. Tokens start arriving as
+    soon as it is created; render() shows them progressively in a Live Markdown panel.
+    refresh=True skips the response cache (explicit "regenerate").
+    """
+    def __init__(self, messages: List[dict], temperature: float, refresh: bool = False):
+        self.buffer = StreamBuffer()
+        self.cancelled = False
+        self.future = run_in_background(_stream_into(self.buffer, messages, temperature, refresh))
+
+    def cancel(self):
+        self.cancelled = True
+        self.future.cancel()
+
+    def _wait_first_token(self, status: str):
+        if self.buffer.text or self.future.done():
+            return
+        with console.status(status):
+            seen = 0
+            while not seen and not self.future.done():
+                seen = self.buffer.wait_for_change(0, timeout=0.1)
+
+    def render(self, title: str, status: str, **panel_options) -> Optional[str]:
+        """
+        Renders the stream and returns the final text. Ctrl+C stops the stream and keeps
+        what was received so far (possibly ""). Returns None if streaming failed before
+        producing any text, so the caller can fall back to the blocking call.
+        """
+        from rich.live import Live
+        from rich.markdown import Markdown
+        from rich.panel import Panel
+
+        def panel(text: str) -> Panel:
+            return Panel(Markdown(text), title=title, **panel_options)
+
+        try:
+            self._wait_first_token(status)
+            if not self.buffer.text:
+                self.future.result()
+                return None
+
+            with Live(panel(self.buffer.text), console=console, refresh_per_second=12) as live:
+                seen = 0
+                while not self.future.done():
+                    seen = self.buffer.wait_for_change(seen, timeout=0.1)
+                    live.update(panel(self.buffer.text))
+                live.update(panel(self.buffer.text.strip()))
+            self.future.result()
+        except KeyboardInterrupt:
+            self.cancel()
+            console.print("[dim]Geração interrompida.[/dim]")
+            return self.buffer.text.strip()
+        except Exception:
+            # Mid-stream failure: keep the partial text if there is any
+            if not self.buffer.text:
+                return None
+        return self.buffer.text.strip() or None
+
+def stream_checkin_interaction(goals: list, period: str) -> ResponseStream:
+    return ResponseStream(*ai.build_checkin_intro_request(goals, period))
+
+def stream_checkin_analysis(checkin_data: list, user_reflection: str, period: str, user_instruction: str = None,
+                            refresh: bool = False) -> ResponseStream:
+    messages, temperature = ai.build_checkin_analysis_request(checkin_data, user_reflection, period, user_instruction)
+    return ResponseStream(messages, temperature, refresh=refresh)
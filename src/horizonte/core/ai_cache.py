@@ -0,0 +1,168 @@
+import hashlib
+import json
+import os
+import sqlite3
+import time
+from contextlib import closing
+from pathlib import Path
+from typing import List, Optional
+
+from .config import APP_DIR, env_float, env_int
+
+CACHE_FILE = APP_DIR / "ai_cache.db"
+
+DEFAULT_TTL = 7 * 24 * 3600
+DEFAULT_MAX_ENTRIES = 500
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    key TEXT PRIMARY KEY,
+    model TEXT NOT NULL,
+    content TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    last_used REAL NOT NULL,
+    hits INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_responses_last_used ON responses(last_used);
+
+CREATE TABLE IF NOT EXISTS stats (
+    name TEXT PRIMARY KEY,
+    value INTEGER NOT NULL DEFAULT 0
+);
+"""
+
+def cache_key(model: str, messages: List[dict], temperature: float) -> str:
+    """Content address of a request: sha256 of the canonical JSON of (model, messages, temperature)."""
+    payload = json.dumps(
+        {"model": model, "messages": messages, "temperature": temperature},
+        ensure_ascii=False, sort_keys=True, separators=(",", ":"),
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+class ResponseCache:
+    """
+    On-disk cache of AI completions keyed by cache_key(). Entries expire after `ttl`
+    seconds and the least recently used ones are evicted above `max_entries`.
+    A connection is opened per operation, so the cache is safe to use from the
+    background AI event loop as well as the main thread.
+    """
+    def __init__(self, db_path: Path = CACHE_FILE, ttl: float = DEFAULT_TTL, max_entries: int = DEFAULT_MAX_ENTRIES):
+        self.db_path = db_path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._initialized = False
+
+    def _connect(self) -> sqlite3.Connection:
+        if not self._initialized:
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(str(self.db_path), timeout=5)
+        if not self._initialized:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(SCHEMA)
+            self._initialized = True
+        return conn
+
+    def _count(self, conn: sqlite3.Connection, name: str):
+        conn.execute(
+            "INSERT INTO stats(name, value) VALUES (?, 1) ON CONFLICT(name) DO UPDATE SET value = value + 1",
+            (name,),
+        )
+
+    def get(self, key: str) -> Optional[str]:
+        now = time.time()
+        with closing(self._connect()) as conn, conn:
+            row = conn.execute("SELECT content, created_at FROM responses WHERE key = ?", (key,)).fetchone()
+            if row and now - row[1] > self.ttl:
+                conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self._count(conn, "expired")
+                row = None
+            if row is None:
+                self._count(conn, "misses")
+                return None
+            conn.execute("UPDATE responses SET last_used = ?, hits = hits + 1 WHERE key = ?", (now, key))
+            self._count(conn, "hits")
+            return row[0]
+
+    def put(self, key: str, model: str, content: str):
+        now = time.time()
+        with closing(self._connect()) as conn, conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO responses(key, model, content, created_at, last_used) VALUES (?, ?, ?, ?, ?)",
+                (key, model, content, now, now),
+            )
+            conn.execute("DELETE FROM responses WHERE created_at < ?", (now - self.ttl,))
+            overflow = conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0] - self.max_entries
+            if overflow > 0:
+                conn.execute(
+                    "DELETE FROM responses WHERE key IN (SELECT key FROM responses ORDER BY last_used LIMIT ?)",
+                    (overflow,),
+                )
+                conn.execute(
+                    "INSERT INTO stats(name, value) VALUES ('evictions', ?) "
+                    "ON CONFLICT(name) DO UPDATE SET value = value + excluded.value",
+                    (overflow,),
+                )
+
+    def stats(self) -> dict:
+        with closing(self._connect()) as conn:
+            counters = dict(conn.execute("SELECT name, value FROM stats").fetchall())
+            entries = conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+        hits, misses = counters.get("hits", 0), counters.get("misses", 0)
+        return {
+            "entries": entries,
+            "hits": hits,
+            "misses": misses,
+            "expired": counters.get("expired", 0),
+            "evictions": counters.get("evictions", 0),
+            "hit_rate": round(100.0 * hits / (hits + misses), 1) if hits + misses else 0.0,
+        }
+
+    def clear(self):
+        with closing(self._connect()) as conn, conn:
+            conn.execute("DELETE FROM responses")
+            conn.execute("DELETE FROM stats")
+
+_enabled = True
+_cache: Optional[ResponseCache] = None
+
+def set_enabled(enabled: bool):
+    """Global switch used by the --no-cache option."""
+    global _enabled
+    _enabled = enabled
+
+def get_cache() -> Optional[ResponseCache]:
+    """Returns the shared response cache, or None if caching is disabled."""
+    global _cache
+    if not _enabled or os.getenv("HORIZONTE_AI_CACHE", "1").lower() in ("0", "false", "no"):
+        return None
+    if _cache is None:
+        _cache = ResponseCache(
+            ttl=env_float("HORIZONTE_AI_CACHE_TTL", DEFAULT_TTL),
+            max_entries=env_int("HORIZONTE_AI_CACHE_MAX_ENTRIES", DEFAULT_MAX_ENTRIES),
+        )
+    return _cache
+
+def lookup(model: str, messages: List[dict], temperature: float, refresh: bool = False):
+    """
+    Returns (key, cached content or None). Cache failures are treated as misses; with
+    refresh=True the cached entry is skipped (the new answer still replaces it via store()).
+    """
+    cache = get_cache()
+    if cache is None:
+        return None, None
+    key = cache_key(model, messages, temperature)
+    if refresh:
+        return key, None
+    try:
+        return key, cache.get(key)
+    except sqlite3.Error:
+        return key, None
+
+def store(key: Optional[str], model: str, content: Optional[str]):
+    cache = get_cache()
+    if cache is None or key is None or not content:
+        return
+    try:
+        cache.put(key, model, content)
+    except sqlite3.Error:
+        pass
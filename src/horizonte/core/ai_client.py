@@ -0,0 +1,145 @@
+import atexit
+import os
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict, Optional, TYPE_CHECKING
+
+from .config import env_float, env_int
+
+if TYPE_CHECKING:
+    from openai import AsyncOpenAI, OpenAI
+
+OPENROUTER_BASE_URL = "https://openrouter.ai/api/v1"
+
+@lru_cache(maxsize=None)
+def load_env():
+    # Deferred so that importing the AI modules does not touch .env or the OpenAI SDK
+    from dotenv import load_dotenv
+    load_dotenv()
+
+@dataclass(frozen=True)
+class ClientSettings:
+    """Connection settings for the OpenRouter client, overridable through the environment."""
+    api_key: str
+    base_url: str = OPENROUTER_BASE_URL
+    timeout: float = 60.0
+    connect_timeout: float = 10.0
+    max_connections: int = 10
+    max_keepalive_connections: int = 5
+    keepalive_expiry: float = 60.0
+
+    @classmethod
+    def from_env(cls) -> Optional["ClientSettings"]:
+        load_env()
+        api_key = os.getenv("OPENROUTER_API_KEY")
+        if not api_key:
+            return None
+        return cls(
+            api_key=api_key,
+            base_url=os.getenv("OPENROUTER_BASE_URL", OPENROUTER_BASE_URL),
+            timeout=env_float("HORIZONTE_AI_TIMEOUT", 60.0),
+            connect_timeout=env_float("HORIZONTE_AI_CONNECT_TIMEOUT", 10.0),
+            max_connections=env_int("HORIZONTE_AI_MAX_CONNECTIONS", 10),
+            max_keepalive_connections=env_int("HORIZONTE_AI_MAX_KEEPALIVE", 5),
+            keepalive_expiry=env_float("HORIZONTE_AI_KEEPALIVE_EXPIRY", 60.0),
+        )
+
+    def httpx_options(self) -> dict:
+        import httpx
+
+        return {
+            "timeout": httpx.Timeout(self.timeout, connect=self.connect_timeout),
+            "limits": httpx.Limits(
+                max_connections=self.max_connections,
+                max_keepalive_connections=self.max_keepalive_connections,
+                keepalive_expiry=self.keepalive_expiry,
+            ),
+        }
+
+class ClientManager:
+    """
+    Process-wide cache of OpenAI clients. Each client owns one pooled HTTP
+    connection pool, so consecutive AI calls reuse TLS/keep-alive connections.
+    """
+    def __init__(self):
+        self._clients: Dict[ClientSettings, "OpenAI"] = {}
+        self._async_clients: Dict[ClientSettings, "AsyncOpenAI"] = {}
+
+    def get(self, settings: ClientSettings) -> "OpenAI":
+        client = self._clients.get(settings)
+        if client is None:
+            from openai import OpenAI, DefaultHttpxClient
+
+            options = settings.httpx_options()
+            client = OpenAI(
+                base_url=settings.base_url,
+                api_key=settings.api_key,
+                timeout=options["timeout"],
+                # Retries are done by horizonte.core.ai_executor (backoff, Retry-After, circuit breaker)
+                max_retries=0,
+                http_client=DefaultHttpxClient(**options),
+            )
+            self._clients[settings] = client
+        return client
+
+    def get_async(self, settings: ClientSettings) -> "AsyncOpenAI":
+        """
+        Async counterpart of get(). AsyncOpenAI clients are bound to the event loop
+        they are first used on, so callers should use a single long-lived loop
+        (see horizonte.core.ai_async).
+        """
+        client = self._async_clients.get(settings)
+        if client is None:
+            from openai import AsyncOpenAI, DefaultAsyncHttpxClient
+
+            options = settings.httpx_options()
+            client = AsyncOpenAI(
+                base_url=settings.base_url,
+                api_key=settings.api_key,
+                timeout=options["timeout"],
+                # Retries are done by horizonte.core.ai_executor (backoff, Retry-After, circuit breaker)
+                max_retries=0,
+                http_client=DefaultAsyncHttpxClient(**options),
+            )
+            self._async_clients[settings] = client
+        return client
+
+    def close(self):
+        for client in self._clients.values():
+            try:
+                client.close()
+            except Exception:
+                pass
+        self._clients.clear()
+        # Async clients are closed on the loop that owns them (see aclose_async)
+
+    async def aclose_async(self):
+        for client in self._async_clients.values():
+            try:
+                await client.close()
+            except Exception:
+                pass
+        self._async_clients.clear()
+
+_manager = ClientManager()
+atexit.register(_manager.close)
+
+def get_client() -> Optional["OpenAI"]:
+    """Returns the shared OpenRouter client, or None if no API key is configured."""
+    settings = ClientSettings.from_env()
+    if settings is None:
+        return None
+    return _manager.get(settings)
+
+def get_async_client() -> Optional["AsyncOpenAI"]:
+    """Returns the shared async OpenRouter client, or None if no API key is configured."""
+    settings = ClientSettings.from_env()
+    if settings is None:
+        return None
+    return _manager.get_async(settings)
+
+def close_clients():
+    _manager.close()
+
+async def aclose_async_clients():
+    await _manager.aclose_async()
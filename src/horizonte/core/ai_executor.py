@@ -0,0 +1,236 @@
+"""
+Shared executor for AI requests: retries, rate limits and a circuit breaker.
+
+Every completion (sync and async) goes through RequestExecutor. Transient errors
+(429, 5xx, dropped connections) are retried with jittered exponential backoff,
+honouring Retry-After. A 429 also blocks the model until its reset time, so other
+requests wait (or fail fast) instead of hitting the limit again. After repeated
+failed requests the circuit opens and AI calls fail immediately, so the commands
+switch to their offline fallbacks; one probe request is let through after a cooldown.
+No call waits longer than the retry budget.
+"""
+import asyncio
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from typing import Awaitable, Callable, Dict, Optional, TypeVar
+
+from .config import env_float, env_int
+
+T = TypeVar("T")
+
+DEFAULT_MAX_RETRIES = 2
+DEFAULT_BASE_DELAY = 0.5
+DEFAULT_MAX_DELAY = 8.0
+# Max seconds a single call may spend waiting for retries / rate limits
+DEFAULT_RETRY_BUDGET = 20.0
+DEFAULT_FAILURE_THRESHOLD = 3
+DEFAULT_COOLDOWN = 60.0
+
+class CircuitOpenError(RuntimeError):
+    """The AI endpoint failed repeatedly; requests are refused until the cooldown ends."""
+
+class RateLimitedError(RuntimeError):
+    """The model is rate limited for longer than the retry budget allows to wait."""
+
+def status_code(error: Exception) -> Optional[int]:
+    return getattr(error, "status_code", None)
+
+def is_transient(error: Exception) -> bool:
+    """429/408/409/5xx and connection failures are worth retrying; timeouts are not (they already took long)."""
+    status = status_code(error)
+    if status is not None:
+        return status in (408, 409, 429) or status >= 500
+    name = type(error).__name__
+    if name == "APITimeoutError":
+        return False
+    return name == "APIConnectionError" or isinstance(error, ConnectionError)
+
+def counts_as_failure(error: Exception) -> bool:
+    """Errors that say something about the endpoint's health (not e.g. a 400 for a bad request)."""
+    return is_transient(error) or type(error).__name__ == "APITimeoutError"
+
+def retry_after(error: Exception, now: Optional[float] = None) -> Optional[float]:
+    """Seconds to wait according to the response headers (Retry-After, retry-after-ms, X-RateLimit-Reset)."""
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None)
+    if not headers:
+        return None
+    now = time.time() if now is None else now
+    try:
+        if headers.get("retry-after-ms"):
+            return max(0.0, float(headers["retry-after-ms"]) / 1000)
+        value = headers.get("retry-after")
+        if value:
+            try:
+                return max(0.0, float(value))
+            except ValueError:
+                return max(0.0, parsedate_to_datetime(value).timestamp() - now)
+        reset = headers.get("x-ratelimit-reset")
+        if reset:
+            # OpenRouter sends the reset time as epoch milliseconds
+            reset = float(reset)
+            return max(0.0, (reset / 1000 if reset > 1e11 else reset) - now)
+    except (TypeError, ValueError):
+        return None
+    return None
+
+class CircuitBreaker:
+    """closed -> open after `failure_threshold` failed requests in a row -> half-open after `cooldown`."""
+    def __init__(self, failure_threshold: int = DEFAULT_FAILURE_THRESHOLD, cooldown: float = DEFAULT_COOLDOWN,
+                 clock: Callable[[], float] = time.monotonic):
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.clock = clock
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self._probing = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        return "half_open" if self.clock() - self.opened_at >= self.cooldown else "open"
+
+    def available(self) -> bool:
+        """Whether a request would currently be allowed (without claiming the half-open probe)."""
+        return self.state != "open" and not self._probing
+
+    def allow(self) -> bool:
+        with self._lock:
+            state = self.state
+            if state == "closed":
+                return True
+            if state == "half_open" and not self._probing:
+                self._probing = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self._probing = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self._probing or self.failures >= self.failure_threshold:
+                self.opened_at = self.clock()
+            self._probing = False
+
+class RateLimits:
+    """Per-model 'do not call before' times learned from 429 answers."""
+    def __init__(self, clock: Callable[[], float] = time.monotonic):
+        self.clock = clock
+        self._blocked_until: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def block(self, model: str, seconds: float):
+        with self._lock:
+            until = self.clock() + seconds
+            self._blocked_until[model] = max(until, self._blocked_until.get(model, 0.0))
+
+    def wait_time(self, model: str) -> float:
+        return max(0.0, self._blocked_until.get(model, 0.0) - self.clock())
+
+class RequestExecutor:
+    def __init__(self, max_retries: int = DEFAULT_MAX_RETRIES, base_delay: float = DEFAULT_BASE_DELAY,
+                 max_delay: float = DEFAULT_MAX_DELAY, retry_budget: float = DEFAULT_RETRY_BUDGET,
+                 breaker: Optional[CircuitBreaker] = None, rate_limits: Optional[RateLimits] = None,
+                 clock: Callable[[], float] = time.monotonic, sleep: Callable[[float], None] = time.sleep):
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.retry_budget = retry_budget
+        self.breaker = breaker or CircuitBreaker(clock=clock)
+        self.rate_limits = rate_limits or RateLimits(clock=clock)
+        self.clock = clock
+        self.sleep = sleep
+
+    def available(self) -> bool:
+        return self.breaker.available()
+
+    def backoff(self, attempt: int) -> float:
+        """Full-jitter exponential backoff for the given (1-based) retry."""
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** (attempt - 1)))
+
+    def _before_attempt(self, model: str, deadline: float) -> float:
+        """Seconds to wait before the next attempt; raises if the call must not be made."""
+        wait = self.rate_limits.wait_time(model)
+        if wait and self.clock() + wait > deadline:
+            raise RateLimitedError(f"Limite de requisições do modelo {model} atingido; tente novamente em {wait:.0f}s.")
+        if not self.breaker.allow():
+            raise CircuitOpenError("IA indisponível após falhas seguidas; usando o modo offline por enquanto.")
+        return wait
+
+    def _after_failure(self, model: str, error: Exception, attempt: int, deadline: float) -> float:
+        """Seconds to wait before retrying; re-raises the error when giving up."""
+        if not is_transient(error):
+            if counts_as_failure(error):
+                self.breaker.record_failure()
+            else:
+                # The endpoint answered: a 4xx is a problem with the request, not an outage
+                self.breaker.record_success()
+            raise error
+        hinted = retry_after(error)
+        if status_code(error) == 429:
+            self.rate_limits.block(model, hinted if hinted is not None else self.backoff(attempt))
+        delay = hinted if hinted is not None else self.backoff(attempt)
+        # A failed half-open probe reopens the circuit right away
+        if attempt > self.max_retries or self.breaker.state == "half_open" or self.clock() + delay > deadline:
+            self.breaker.record_failure()
+            raise error
+        return delay
+
+    def call(self, model: str, fn: Callable[[], T]) -> T:
+        deadline = self.clock() + self.retry_budget
+        attempt = 1
+        while True:
+            wait = self._before_attempt(model, deadline)
+            if wait:
+                self.sleep(wait)
+            try:
+                result = fn()
+            except Exception as e:
+                self.sleep(self._after_failure(model, e, attempt, deadline))
+                attempt += 1
+                continue
+            self.breaker.record_success()
+            return result
+
+    async def acall(self, model: str, fn: Callable[[], Awaitable[T]]) -> T:
+        deadline = self.clock() + self.retry_budget
+        attempt = 1
+        while True:
+            wait = self._before_attempt(model, deadline)
+            if wait:
+                await asyncio.sleep(wait)
+            try:
+                result = await fn()
+            except Exception as e:
+                await asyncio.sleep(self._after_failure(model, e, attempt, deadline))
+                attempt += 1
+                continue
+            self.breaker.record_success()
+            return result
+
+_executor: Optional[RequestExecutor] = None
+_executor_lock = threading.Lock()
+
+def get_executor() -> RequestExecutor:
+    """Process-wide executor configured from the environment (HORIZONTE_AI_MAX_RETRIES etc.)."""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = RequestExecutor(
+                max_retries=env_int("HORIZONTE_AI_MAX_RETRIES", DEFAULT_MAX_RETRIES),
+                retry_budget=env_float("HORIZONTE_AI_RETRY_BUDGET", DEFAULT_RETRY_BUDGET),
+                breaker=CircuitBreaker(
+                    failure_threshold=env_int("HORIZONTE_AI_BREAKER_THRESHOLD", DEFAULT_FAILURE_THRESHOLD),
+                    cooldown=env_float("HORIZONTE_AI_BREAKER_COOLDOWN", DEFAULT_COOLDOWN),
+                ),
+            )
+    return _executor
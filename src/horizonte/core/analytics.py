@@ -1,72 +1,21 @@
-from typing import List, Dict
-from datetime import datetime
+from typing import List
 from rich.console import Console
 from rich.table import Table
 from rich.panel import Panel
 from rich.text import Text
 from rich import box
 
-from horizonte.core.models import CheckIn, Goal, GoalCategory
+from horizonte.core.models import Goal, GoalCategory
+from horizonte.core.analytics_engine import AnalyticsSummary
 
 console = Console()
 
-def calculate_mom_growth(checkins: List[CheckIn]) -> Dict[str, dict]:
-    """
-    Calculates Month-over-Month growth for global and per-category progress.
-    Returns structured data for visualization.
-    """
-    if not checkins:
-        return {}
-    
-    # Sort by date just in case
-    sorted_checkins = sorted(checkins, key=lambda c: c.date)
-    
-    history = []
-    
-    for c in sorted_checkins:
-        if not c.snapshot:
-            continue
-            
-        period_stats = {
-            "date": c.date,
-            "period": c.date.strftime("%Y-%m"),
-            "total_goals": len(c.snapshot),
-            "avg_progress": 0,
-            "categories": {}
-        }
-        
-        total_p = 0
-        cat_sums = {}
-        cat_counts = {}
-        
-        for g_data in c.snapshot:
-            # Reconstruct minimal dict or use directly
-            # g_data is a dict from model_dump
-            p = g_data.get("progress_percentage", 0)
-            cat = g_data.get("category", "outros")
-            
-            total_p += p
-            
-            cat_sums[cat] = cat_sums.get(cat, 0) + p
-            cat_counts[cat] = cat_counts.get(cat, 0) + 1
-            
-        if period_stats["total_goals"] > 0:
-            period_stats["avg_progress"] = round(total_p / period_stats["total_goals"], 1)
-            
-        for cat, s in cat_sums.items():
-            count = cat_counts[cat]
-            period_stats["categories"][cat] = round(s / count, 1)
-            
-        history.append(period_stats)
-        
-    return history
-
-def render_analytics_dashboard(checkins: List[CheckIn]):
-    if not checkins:
+def render_analytics_dashboard(summary: AnalyticsSummary):
+    if not summary.checkin_count:
         console.print("[yellow]Sem dados históricos suficientes para análise.[/yellow]")
         return
 
-    history = calculate_mom_growth(checkins)
+    history = summary.history
     if not history:
         console.print("[yellow]Sem snapshots de dados para análise.[/yellow]")
         return
@@ -83,9 +32,27 @@ def render_analytics_dashboard(checkins: List[CheckIn]):
     vel_color = "green" if velocity >= 0 else "red"
     vel_sign = "+" if velocity > 0 else ""
     
+    # Longer-range deltas and distribution from the materialized summary
+    extra_lines = []
+    deltas = []
+    for label, months in (("QoQ", 3), ("YoY", 12)):
+        d = summary.delta(months)
+        if d is not None:
+            d_color = "green" if d >= 0 else "red"
+            deltas.append(f"[{d_color}]{'+' if d > 0 else ''}{d:.1f}% {label}[/{d_color}]")
+    if deltas:
+        extra_lines.append(" · ".join(deltas))
+    
+    spread = summary.latest_percentiles
+    rolling = summary.rolling_mean(3)
+    extra_lines.append(
+        f"[dim]Média móvel (3): {rolling}% · P25/Mediana/P75: "
+        f"{spread[25]}% / {spread[50]}% / {spread[75]}%[/dim]"
+    )
+    
     console.print(Panel(
         f"[bold]Progresso Global:[/bold] {current['avg_progress']}% "
-        f"[{vel_color}]({vel_sign}{velocity:.1f}% MoM)[/{vel_color}]",
+        f"[{vel_color}]({vel_sign}{velocity:.1f}% MoM)[/{vel_color}]\n" + "\n".join(extra_lines),
         title="📊 Analytics & MoM",
         border_style="magenta"
     ))
@@ -120,59 +87,11 @@ def render_analytics_dashboard(checkins: List[CheckIn]):
     console.print(table)
     
     # 4. Motivation / Streak
-    streak = calculate_streak(checkins)
+    streak = summary.streak()
     
     streak_color = "green" if streak >= 3 else ("yellow" if streak >= 1 else "dim")
     console.print(f"\n🔥 [bold]Check-in Streak:[/bold] [{streak_color}]{streak} meses consecutivos focados![/{streak_color}]\n")
 
-def calculate_streak(checkins: List[CheckIn]) -> int:
-    """
-    Calculates the streak of consecutive monthly check-ins.
-    """
-    if not checkins:
-        return 0
-        
-    # Sort descending
-    dates = sorted([c.date for c in checkins], reverse=True)
-    
-    streak = 0
-    if not dates:
-        return 0
-        
-    # Check if the most recent check-in is relevant (this month or last month)
-    # If the user hasn't checked in this month yet, but did last month, the streak is alive (but pending this month)
-    # If the last check-in was 2 months ago, streak is broken (0).
-    
-    now = datetime.now()
-    current_month_val = now.year * 12 + now.month
-    last_checkin_val = dates[0].year * 12 + dates[0].month
-    
-    diff_now = current_month_val - last_checkin_val
-    
-    if diff_now > 1:
-        # Streak broken
-        return 0
-        
-    streak = 1
-    current_val = last_checkin_val
-    
-    for i in range(1, len(dates)):
-        date = dates[i]
-        val = date.year * 12 + date.month
-        
-        diff = current_val - val
-        
-        if diff == 1:
-            streak += 1
-            current_val = val
-        elif diff == 0:
-            continue
-        else:
-            break
-            
-    return streak
-
-
 def render_ascii_chart(history: List[dict]):
     """
     Renders a simple vertical bar chart using unicode blocks.
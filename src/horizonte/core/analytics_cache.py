@@ -0,0 +1,71 @@
+import json
+from pathlib import Path
+from typing import Optional
+
+from .models import HistoryEntry
+
+class AnalyticsCache:
+    """
+    Materialized analytics summary persisted next to the check-in data, keyed on the
+    history index version. A saved check-in either extends it in place (one delta
+    update) or drops it so the next dashboard recomputes from the index.
+    """
+    def __init__(self, cache_path: Path):
+        self.cache_path = cache_path
+
+    def _read(self) -> Optional[dict]:
+        if not self.cache_path.exists():
+            return None
+        try:
+            with open(self.cache_path, 'r') as f:
+                data = json.load(f)
+        except json.JSONDecodeError:
+            return None
+        return data if isinstance(data, dict) else None
+
+    def load(self, version: Optional[str]):
+        from .analytics_engine import AnalyticsSummary
+
+        data = self._read()
+        if version is None or data is None or data.get("version") != version:
+            return None
+        return AnalyticsSummary(data["summary"])
+
+    def store(self, version: Optional[str], summary):
+        from .storage import atomic_write
+
+        if version is None:
+            return
+        content = json.dumps({"version": version, "summary": summary.data}, ensure_ascii=False)
+        atomic_write(self.cache_path, content, make_backup=False)
+
+    def invalidate(self):
+        self.cache_path.unlink(missing_ok=True)
+
+    def on_append(self, old_version: Optional[str], new_version: Optional[str], entry: HistoryEntry, appended: bool = True):
+        """Called after a check-in is saved; old_version is the history version before the save."""
+        from .analytics_engine import AnalyticsSummary
+
+        data = self._read()
+        if not appended or old_version is None or data is None or data.get("version") != old_version:
+            self.invalidate()
+            return
+
+        summary = AnalyticsSummary(data["summary"])
+        if not summary.extend(entry):
+            self.invalidate()
+            return
+        self.store(new_version, summary)
+
+def load_analytics(repo):
+    """Returns the AnalyticsSummary for a checkin repository, recomputing only on a cache miss."""
+    from .analytics_engine import AnalyticsSummary
+
+    cached = repo.analytics_cache.load(repo.history_version())
+    if cached is not None:
+        return cached
+
+    summary = AnalyticsSummary.from_entries(repo.load_history())
+    # Version is read after load_history(), which may have rebuilt the index
+    repo.analytics_cache.store(repo.history_version(), summary)
+    return summary
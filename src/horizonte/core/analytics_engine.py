@@ -0,0 +1,247 @@
+from datetime import datetime
+from typing import Dict, List, Optional, Sequence
+
+from horizonte.core.models import HistoryEntry
+
+try:
+    import numpy as np
+except ImportError:  # Optional dependency: fall back to pure-Python aggregation
+    np = None
+
+def _month_key(date) -> int:
+    return date.year * 12 + (date.month - 1)
+
+def _percentile(sorted_values: Sequence[float], q: float) -> float:
+    """Linear-interpolated percentile (same definition as numpy's default)."""
+    if not sorted_values:
+        return 0.0
+    pos = (len(sorted_values) - 1) * q / 100.0
+    lo = int(pos)
+    hi = min(lo + 1, len(sorted_values) - 1)
+    return sorted_values[lo] + (sorted_values[hi] - sorted_values[lo]) * (pos - lo)
+
+class ColumnarHistory:
+    """
+    Check-in history flattened into columns, one row per (check-in, goal):
+    period index, category code and progress. Aggregates are computed with
+    vectorized group-bys (NumPy when installed, plain loops otherwise).
+    """
+    def __init__(self, entries: List[HistoryEntry]):
+        self.entries = [e for e in sorted(entries, key=lambda e: e.date) if e.goals]
+        self.categories: List[str] = []
+        cat_codes: Dict[str, int] = {}
+
+        period_col, cat_col, progress_col = [], [], []
+        for i, e in enumerate(self.entries):
+            for progress, _status, cat in e.goals.values():
+                code = cat_codes.get(cat)
+                if code is None:
+                    code = cat_codes[cat] = len(self.categories)
+                    self.categories.append(cat)
+                period_col.append(i)
+                cat_col.append(code)
+                progress_col.append(progress)
+
+        if np is not None:
+            self.period = np.asarray(period_col, dtype=np.int64)
+            self.category = np.asarray(cat_col, dtype=np.int64)
+            self.progress = np.asarray(progress_col, dtype=np.float64)
+        else:
+            self.period, self.category, self.progress = period_col, cat_col, progress_col
+
+        self._totals = None
+
+    @classmethod
+    def from_entries(cls, entries: List[HistoryEntry]) -> "ColumnarHistory":
+        return cls(entries)
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def _group_totals(self):
+        """Returns (sums, counts, cat_sums, cat_counts) indexed by [period] and [period][category]."""
+        if self._totals is not None:
+            return self._totals
+
+        n, k = len(self.entries), len(self.categories)
+        if np is not None:
+            sums = np.bincount(self.period, weights=self.progress, minlength=n)
+            counts = np.bincount(self.period, minlength=n)
+            keys = self.period * max(k, 1) + self.category
+            cat_sums = np.bincount(keys, weights=self.progress, minlength=n * k).reshape(n, k)
+            cat_counts = np.bincount(keys, minlength=n * k).reshape(n, k)
+            self._totals = (sums.tolist(), counts.tolist(), cat_sums.tolist(), cat_counts.tolist())
+        else:
+            sums, counts = [0.0] * n, [0] * n
+            cat_sums = [[0.0] * k for _ in range(n)]
+            cat_counts = [[0] * k for _ in range(n)]
+            for p_idx, c_idx, value in zip(self.period, self.category, self.progress):
+                sums[p_idx] += value
+                counts[p_idx] += 1
+                cat_sums[p_idx][c_idx] += value
+                cat_counts[p_idx][c_idx] += 1
+            self._totals = (sums, counts, cat_sums, cat_counts)
+        return self._totals
+
+    def period_stats(self) -> List[dict]:
+        """Per check-in global and per-category averages (the AnalyticsSummary history rows)."""
+        sums, counts, cat_sums, cat_counts = self._group_totals()
+        history = []
+        for i, e in enumerate(self.entries):
+            categories = {
+                cat: round(cat_sums[i][c] / cat_counts[i][c], 1)
+                for c, cat in enumerate(self.categories)
+                if cat_counts[i][c]
+            }
+            history.append({
+                "date": e.date,
+                "period": e.date.strftime("%Y-%m"),
+                "total_goals": counts[i],
+                "avg_progress": round(sums[i] / counts[i], 1) if counts[i] else 0,
+                "categories": categories,
+            })
+        return history
+
+    def monthly_averages(self) -> Dict[int, float]:
+        """Average progress per calendar month (last check-in of the month wins)."""
+        sums, counts, _, _ = self._group_totals()
+        monthly = {}
+        for i, e in enumerate(self.entries):
+            if counts[i]:
+                monthly[_month_key(e.date)] = sums[i] / counts[i]
+        return monthly
+
+    def percentiles(self, qs: Sequence[float] = (25, 50, 75)) -> List[Dict[float, float]]:
+        """Distribution of goal progress within each check-in."""
+        n = len(self.entries)
+        if np is not None:
+            if not n:
+                return []
+            order = np.lexsort((self.progress, self.period))
+            values = self.progress[order]
+            bounds = np.searchsorted(self.period[order], np.arange(n + 1))
+            result = []
+            for i in range(n):
+                chunk = values[bounds[i]:bounds[i + 1]]
+                points = np.percentile(chunk, qs) if len(chunk) else [0.0] * len(qs)
+                result.append({q: round(float(v), 1) for q, v in zip(qs, points)})
+            return result
+
+        buckets: List[List[float]] = [[] for _ in range(n)]
+        for p_idx, value in zip(self.period, self.progress):
+            buckets[p_idx].append(value)
+        result = []
+        for values in buckets:
+            values.sort()
+            result.append({q: round(_percentile(values, q), 1) for q in qs})
+        return result
+
+PERCENTILES = (25, 50, 75)
+# Raw per-check-in averages kept for rolling windows
+ROLLING_HISTORY = 12
+
+def _streak_state(dates: List[datetime]) -> dict:
+    """Consecutive-month run ending at the most recent check-in month."""
+    months = sorted({_month_key(d) for d in dates})
+    if not months:
+        return {"last_month": None, "run": 0}
+    run = 1
+    for prev, cur in zip(reversed(months[:-1]), reversed(months)):
+        if cur - prev != 1:
+            break
+        run += 1
+    return {"last_month": months[-1], "run": run}
+
+class AnalyticsSummary:
+    """
+    Materialized dashboard data (per-check-in stats, monthly averages, latest percentiles,
+    streak state). JSON-serializable and extendable one check-in at a time.
+    """
+    def __init__(self, data: dict):
+        self.data = data
+
+    @classmethod
+    def from_entries(cls, entries: List[HistoryEntry]) -> "AnalyticsSummary":
+        engine = ColumnarHistory.from_entries(entries)
+        sums, counts, _, _ = engine._group_totals()
+        dates = sorted(e.date for e in entries)
+        percentiles = engine.percentiles(PERCENTILES)
+        return cls({
+            "checkin_count": len(entries),
+            "last_date": dates[-1].isoformat() if dates else None,
+            "history": [dict(h, date=h["date"].isoformat()) for h in engine.period_stats()],
+            "averages": [s / c for s, c in zip(sums, counts)][-ROLLING_HISTORY:],
+            "monthly": {str(k): v for k, v in engine.monthly_averages().items()},
+            "percentiles": {str(q): v for q, v in percentiles[-1].items()} if percentiles else {},
+            "streak": _streak_state(dates),
+        })
+
+    def extend(self, entry: HistoryEntry) -> bool:
+        """Folds one newer check-in into the summary. Returns False if a full recompute is needed."""
+        last_date = self.data.get("last_date")
+        if last_date and entry.date < datetime.fromisoformat(last_date):
+            return False
+
+        month = _month_key(entry.date)
+        streak = self.data["streak"]
+        if streak["last_month"] is None or month - streak["last_month"] > 1:
+            streak["run"] = 1
+        elif month - streak["last_month"] == 1:
+            streak["run"] += 1
+        streak["last_month"] = month
+
+        self.data["checkin_count"] += 1
+        self.data["last_date"] = entry.date.isoformat()
+
+        if entry.goals:
+            engine = ColumnarHistory.from_entries([entry])
+            sums, counts, _, _ = engine._group_totals()
+            stats = engine.period_stats()[0]
+            average = sums[0] / counts[0]
+            self.data["history"].append(dict(stats, date=stats["date"].isoformat()))
+            self.data["averages"] = (self.data["averages"] + [average])[-ROLLING_HISTORY:]
+            self.data["monthly"][str(month)] = average
+            self.data["percentiles"] = {str(q): v for q, v in engine.percentiles(PERCENTILES)[0].items()}
+        return True
+
+    @property
+    def checkin_count(self) -> int:
+        return self.data["checkin_count"]
+
+    @property
+    def history(self) -> List[dict]:
+        return [dict(h, date=datetime.fromisoformat(h["date"])) for h in self.data["history"]]
+
+    @property
+    def latest_percentiles(self) -> Dict[int, float]:
+        return {int(q): v for q, v in self.data["percentiles"].items()}
+
+    def delta(self, months: int) -> Optional[float]:
+        """
+        Change in average progress between the latest month and `months` earlier
+        (1 = MoM, 3 = QoQ, 12 = YoY). None if there is no check-in for that month.
+        """
+        monthly = {int(k): v for k, v in self.data["monthly"].items()}
+        if not monthly:
+            return None
+        latest = max(monthly)
+        previous = monthly.get(latest - months)
+        if previous is None:
+            return None
+        return round(monthly[latest] - previous, 1)
+
+    def rolling_mean(self, window: int = 3) -> Optional[float]:
+        """Latest rolling mean of the per-check-in global average."""
+        chunk = self.data["averages"][-window:]
+        if not chunk:
+            return None
+        return round(sum(chunk) / len(chunk), 1)
+
+    def streak(self, now: Optional[datetime] = None) -> int:
+        state = self.data["streak"]
+        if state["last_month"] is None:
+            return 0
+        now = now or datetime.now()
+        if _month_key(now) - state["last_month"] > 1:
+            return 0
+        return state["run"]
@@ -0,0 +1,428 @@
+"""
+Content-addressed, incremental backup store (replaces the full-copy .bak files).
+
+Every version written by atomic_write() is recorded in a manifest as
+(timestamp, sha256 of the content). Objects are zlib-compressed and stored once per
+content; most are line diffs against the previous version of the same file, with a
+full copy every MAX_CHAIN versions or when a diff would not be smaller. The manifest
+keeps a reference count per object, so pruning a version only touches the objects it
+frees — no directory scans.
+
+Retention is time based: everything from the last hour, then the newest version per
+hour (HORIZONTE_BACKUP_HOURS, 48), per day (HORIZONTE_BACKUP_DAYS, 60) and per month
+(HORIZONTE_BACKUP_MONTHS, 24). The current version of a file is always kept. Pruning is
+incremental: a write only looks at the versions that changed tier since the last one.
+
+The `*.bak` full copies of the previous scheme are imported once (import_legacy) and
+deleted.
+
+goals.json.log appends and deletions (compaction) are recorded too, so a restore puts
+back the base file and its log as they were. Files written together (a transaction
+commit, a compaction) are recorded inside batch(): one timestamp, one manifest write.
+Listing and restoring are limited to the files under `scope` (the app directory).
+"""
+import difflib
+import hashlib
+import json
+import os
+import threading
+import time
+import zlib
+from bisect import bisect_right
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from .config import env_int
+
+# Deltas applied in a row before a full copy is stored again
+MAX_CHAIN = 16
+# A diff is only stored if it is clearly smaller than the full compressed content
+DELTA_RATIO = 0.8
+
+_FULL = b"F"
+_DELTA = b"D"
+_EXPIRED = ("expired",)
+
+def content_hash(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+def make_delta(base: bytes, new: bytes) -> list:
+    """Ops rebuilding `new` from `base`: [start, end] copies base lines, a string inserts text."""
+    base_lines = base.decode("utf-8").splitlines(keepends=True)
+    new_lines = new.decode("utf-8").splitlines(keepends=True)
+    ops = []
+    matcher = difflib.SequenceMatcher(None, base_lines, new_lines, autojunk=False)
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag == "equal":
+            ops.append([i1, i2])
+        elif j2 > j1:
+            ops.append("".join(new_lines[j1:j2]))
+    return ops
+
+def apply_delta(base: bytes, ops: list) -> bytes:
+    base_lines = base.decode("utf-8").splitlines(keepends=True)
+    parts = [op if isinstance(op, str) else "".join(base_lines[op[0]:op[1]]) for op in ops]
+    return "".join(parts).encode("utf-8")
+
+@dataclass
+class Version:
+    path: str
+    timestamp: float
+    hash: Optional[str]  # None: the file was deleted
+
+    @property
+    def date(self) -> datetime:
+        return datetime.fromtimestamp(self.timestamp)
+
+class BackupStore:
+    def __init__(self, root: Path, hours: int = 48, days: int = 60, months: int = 24,
+                 scope: Optional[Path] = None):
+        self.root = Path(root)
+        self.scope = Path(scope).resolve() if scope is not None else None
+        self.objects_dir = self.root / "objects"
+        self.manifest_path = self.root / "manifest.json"
+        self.hours = hours
+        self.days = days
+        self.months = months
+        self._lock = threading.RLock()
+        self._manifest: Optional[dict] = None
+        self._batch: Optional[dict] = None
+
+    # -- manifest -----------------------------------------------------------
+
+    def _load(self) -> dict:
+        if self._manifest is None:
+            manifest = None
+            if self.manifest_path.exists():
+                try:
+                    with open(self.manifest_path, 'r') as f:
+                        manifest = json.load(f)
+                except (OSError, json.JSONDecodeError):
+                    manifest = None
+            self._manifest = manifest if isinstance(manifest, dict) else {"files": {}, "objects": {}}
+        return self._manifest
+
+    def _save(self):
+        from .storage import atomic_write
+
+        atomic_write(self.manifest_path, json.dumps(self._manifest, separators=(",", ":")), make_backup=False)
+
+    @contextmanager
+    def batch(self):
+        """
+        Groups the records made inside into one backup: they share a timestamp and the
+        manifest is written once on exit. Nested batches join the outer one.
+        """
+        with self._lock:
+            if self._batch is not None:
+                yield
+                return
+            self._batch = {"now": time.time(), "dirty": False}
+            try:
+                yield
+            finally:
+                dirty = self._batch["dirty"]
+                self._batch = None
+                if dirty:
+                    self._save()
+
+    # -- objects ------------------------------------------------------------
+
+    def _object_path(self, digest: str) -> Path:
+        return self.objects_dir / digest[:2] / digest
+
+    def _write_object(self, digest: str, payload: bytes):
+        path = self._object_path(digest)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(".tmp")
+        tmp.write_bytes(payload)
+        os.replace(tmp, path)
+
+    def read(self, digest: str) -> bytes:
+        """Content of a stored version (resolving its delta chain)."""
+        with self._lock:
+            chain = []
+            while True:
+                raw = zlib.decompress(self._object_path(digest).read_bytes())
+                if raw[:1] == _FULL:
+                    data = raw[1:]
+                    break
+                delta = json.loads(raw[1:])
+                chain.append(delta["ops"])
+                digest = delta["base"]
+            for ops in reversed(chain):
+                data = apply_delta(data, ops)
+            return data
+
+    def _add_object(self, data: bytes, base: Optional[str], base_data: Optional[bytes]) -> str:
+        objects = self._load()["objects"]
+        digest = content_hash(data)
+        if digest in objects:
+            objects[digest]["refs"] += 1
+            return digest
+
+        full = zlib.compress(_FULL + data)
+        payload, entry = full, {"base": None, "depth": 0, "refs": 1}
+        if base is not None and base_data is not None and base in objects and objects[base]["depth"] < MAX_CHAIN:
+            delta = zlib.compress(_DELTA + json.dumps({"base": base, "ops": make_delta(base_data, data)}).encode("utf-8"))
+            if len(delta) < len(full) * DELTA_RATIO:
+                payload = delta
+                entry = {"base": base, "depth": objects[base]["depth"] + 1, "refs": 1}
+                objects[base]["refs"] += 1
+        self._write_object(digest, payload)
+        objects[digest] = entry
+        return digest
+
+    def _release(self, digest: Optional[str]):
+        objects = self._load()["objects"]
+        while digest is not None and digest in objects:
+            entry = objects[digest]
+            entry["refs"] -= 1
+            if entry["refs"] > 0:
+                return
+            del objects[digest]
+            self._object_path(digest).unlink(missing_ok=True)
+            digest = entry["base"]
+
+    # -- versions -----------------------------------------------------------
+
+    @staticmethod
+    def _key(path: Path) -> str:
+        return str(Path(path).resolve())
+
+    def record(self, path: Path, content: Optional[str], previous: Optional[str] = None,
+               now: Optional[float] = None):
+        """
+        Records the version of `path` being written (None: deleted). `previous` is the
+        content currently on disk; it is recorded first if the store has never seen it.
+        """
+        with self._lock:
+            if now is None:
+                now = self._batch["now"] if self._batch is not None else time.time()
+            manifest = self._load()
+            key = self._key(path)
+            entries = manifest["files"].setdefault(key, [])
+            count = len(entries)
+            last = entries[-1][1] if entries else None
+
+            base, base_data = last, None
+            if previous is not None:
+                base_data = previous.encode("utf-8")
+                if last != content_hash(base_data):
+                    # Changed outside atomic_write (or seen for the first time): keep that version too
+                    try:
+                        mtime = min(Path(path).stat().st_mtime, now)
+                    except OSError:
+                        mtime = now
+                    base = self._add_object(base_data, last, None)
+                    entries.append([max(mtime, entries[-1][0]) if entries else mtime, base])
+
+            if content is not None:
+                data = content.encode("utf-8")
+                if base != content_hash(data):
+                    if base_data is None and base is not None:
+                        base_data = self.read(base)
+                    entries.append([now, self._add_object(data, base, base_data)])
+            elif base is not None:
+                entries.append([now, None])
+
+            if len(entries) == count:
+                if not entries:
+                    del manifest["files"][key]
+                return  # Nothing new (same content as the current version)
+            self._prune(key, now)
+            if self._batch is not None:
+                self._batch["dirty"] = True
+            else:
+                self._save()
+
+    def restore(self, plan: List["Version"], now: Optional[float] = None):
+        """Puts back the versions of a restore_plan(); the replaced contents are recorded first."""
+        from .storage import atomic_write
+
+        for version in plan:
+            path = Path(version.path)
+            previous = path.read_text() if path.exists() else None
+            if version.hash is None:
+                self.record(path, None, previous, now)
+                path.unlink(missing_ok=True)
+            else:
+                content = self.read(version.hash).decode("utf-8")
+                self.record(path, content, previous, now)
+                atomic_write(path, content, make_backup=False)
+
+    def _in_scope(self, key: str) -> bool:
+        return self.scope is None or Path(key).is_relative_to(self.scope)
+
+    def versions(self, path: Optional[Path] = None) -> List[Version]:
+        with self._lock:
+            files = self._load()["files"]
+            keys = [self._key(path)] if path is not None else [k for k in files if self._in_scope(k)]
+            found = [Version(k, ts, digest) for k in keys for ts, digest in files.get(k, [])]
+        return sorted(found, key=lambda v: v.timestamp)
+
+    def version_at(self, path: Path, when: datetime) -> Optional[Version]:
+        """The version that was current at `when`, or None if the file did not exist yet."""
+        cutoff = when.timestamp()
+        found = [v for v in self.versions(path) if v.timestamp <= cutoff]
+        return found[-1] if found else None
+
+    def restore_plan(self, when: datetime) -> List[Version]:
+        """Versions to put back so every tracked file matches its state at `when`."""
+        plan = []
+        for key, entries in list(self._load()["files"].items()):
+            if not entries or not self._in_scope(key):
+                continue
+            target = self.version_at(Path(key), when)
+            path = Path(key)
+            current = content_hash(path.read_text().encode("utf-8")) if path.exists() else None
+            wanted = target.hash if target else None
+            if target is None and not path.exists():
+                continue
+            if wanted != current:
+                plan.append(Version(key, target.timestamp if target else 0.0, wanted))
+        return plan
+
+    # -- retention ----------------------------------------------------------
+
+    def _tiers(self):
+        return (
+            (3600 * self.hours, "%Y%m%d%H"),
+            (86400 * self.days, "%Y%m%d"),
+            (86400 * 31 * self.months, "%Y%m"),
+        )
+
+    def _bucket(self, ts: float, now: float):
+        """None for versions of the last hour (all kept), _EXPIRED past the last tier, else the (tier, period) bucket."""
+        age = now - ts
+        if age < 3600:
+            return None
+        for max_age, bucket_format in self._tiers():
+            if age < max_age:
+                return (bucket_format, datetime.fromtimestamp(ts).strftime(bucket_format))
+        return _EXPIRED
+
+    def _prune(self, key: str, now: float):
+        """
+        Keeps the newest version per bucket (and always the current one). Only versions
+        that may have changed bucket since the last prune of the file are looked at: the
+        ones that crossed a tier boundary in the meantime, the ones written since, and the
+        contiguous runs of versions sharing a bucket with them.
+        """
+        manifest = self._load()
+        entries = manifest["files"][key]
+        pruned_at = manifest.setdefault("pruned_at", {})
+        since = pruned_at.get(key)
+        pruned_at[key] = now
+        newest = len(entries) - 1
+
+        def position(ts: float) -> int:
+            return bisect_right(entries, ts, key=lambda e: e[0])
+
+        if since is None or since > now:
+            candidates = set(range(newest))
+        else:
+            written = position(since)
+            candidates = set(range(max(written - 1, 0), newest))
+            for boundary in (3600,) + tuple(max_age for max_age, _ in self._tiers()):
+                candidates.update(range(position(since - boundary), position(now - boundary)))
+
+        drop = set()
+        for i in sorted(candidates):
+            if i in drop:
+                continue
+            bucket = self._bucket(entries[i][0], now)
+            if bucket is None:
+                continue
+            if bucket is _EXPIRED:
+                drop.add(i)
+                continue
+            first = last = i
+            while first > 0 and self._bucket(entries[first - 1][0], now) == bucket:
+                first -= 1
+            while last + 1 < newest and self._bucket(entries[last + 1][0], now) == bucket:
+                last += 1
+            drop.update(range(first, last))
+        for i in sorted(drop, reverse=True):
+            self._release(entries[i][1])
+            del entries[i]
+
+    # -- legacy full copies ---------------------------------------------------
+
+    def import_legacy(self, target: Callable[[str], Path], now: Optional[float] = None) -> int:
+        """
+        One-time import of the `<name>.<YYYYMMDDHHMMSS>.bak` full copies of the old backup
+        scheme as versions of target(name), older than anything already recorded; the .bak
+        files are deleted afterwards. Returns the number of files found.
+        """
+        with self._lock:
+            manifest = self._load()
+            if manifest.get("legacy_imported"):
+                return 0
+            now = time.time() if now is None else now
+            found: Dict[str, list] = {}
+            copies = sorted(self.root.glob("*.bak")) if self.root.exists() else []
+            for bak in copies:
+                name, _, stamp = bak.name[:-len(".bak")].rpartition(".")
+                try:
+                    ts = datetime.strptime(stamp, "%Y%m%d%H%M%S").timestamp()
+                except ValueError:
+                    continue
+                found.setdefault(self._key(target(name)), []).append((ts, bak))
+            for key, versions in found.items():
+                self._import_versions(key, versions, now)
+            manifest["legacy_imported"] = True
+            self._save()
+            for versions in found.values():
+                for _, bak in versions:
+                    bak.unlink(missing_ok=True)
+            return sum(len(v) for v in found.values())
+
+    def _import_versions(self, key: str, versions: List[tuple], now: float):
+        files = self._load()["files"]
+        entries = files.get(key, [])
+        first = entries[0][0] if entries else None
+        imported, last, last_data = [], None, None
+        for ts, bak in sorted(versions):
+            if first is not None and ts >= first:
+                continue  # Already covered by the versioned store
+            data = bak.read_bytes()
+            try:
+                data.decode("utf-8")
+            except UnicodeDecodeError:
+                continue
+            if last is not None and content_hash(data) == last:
+                continue
+            last = self._add_object(data, last, last_data)
+            last_data = data
+            imported.append([ts, last])
+        if imported:
+            files[key] = imported + entries
+            self._load().setdefault("pruned_at", {}).pop(key, None)
+            self._prune(key, now)
+
+def _legacy_target(name: str) -> Path:
+    """Where an old .bak copy came from: check-in files start with their date, the rest lived in the app directory."""
+    from .storage import APP_DIR, CHECKINS_DIR
+
+    return CHECKINS_DIR / name if name[:4].isdigit() else APP_DIR / name
+
+_store: Optional[BackupStore] = None
+
+def get_backup_store() -> BackupStore:
+    global _store
+    if _store is None:
+        from .storage import APP_DIR, BACKUPS_DIR
+
+        _store = BackupStore(
+            BACKUPS_DIR,
+            hours=env_int("HORIZONTE_BACKUP_HOURS", 48),
+            days=env_int("HORIZONTE_BACKUP_DAYS", 60),
+            months=env_int("HORIZONTE_BACKUP_MONTHS", 24),
+            scope=APP_DIR,
+        )
+        _store.import_legacy(_legacy_target)
+    return _store
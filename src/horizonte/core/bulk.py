@@ -0,0 +1,92 @@
+import json
+from pathlib import Path
+from typing import List, Optional
+
+from pydantic import BaseModel, Field, ValidationError
+
+from .classifier import CategoryClassifier
+from .models import Goal, GoalCategory, Horizon, Milestone, SmartCriteria
+from .targets import apply_inferred_target
+
+class GoalSpec(BaseModel):
+    """One entry of a bulk goals file. Missing category/SMART/milestones are filled by the AI."""
+    title: str
+    description: str = ""
+    horizon: Optional[Horizon] = None
+    category: Optional[GoalCategory] = None
+    smart_criteria: Optional[SmartCriteria] = None
+    milestones: List[str] = Field(default_factory=list)
+
+    @property
+    def needs_ai(self) -> bool:
+        return self.category is None or self.smart_criteria is None or not self.milestones
+
+def _read_document(path: Path):
+    text = path.read_text(encoding="utf-8")
+    if path.suffix.lower() in (".yaml", ".yml"):
+        try:
+            import yaml
+        except ImportError:  # Optional dependency: JSON files work without it
+            raise ValueError("Arquivos YAML exigem o pacote 'pyyaml'. Instale-o ou use um arquivo JSON.")
+        return yaml.safe_load(text)
+    return json.loads(text)
+
+def load_goal_specs(path: Path) -> List[GoalSpec]:
+    """
+    Reads a list of goals from a JSON (or YAML, if PyYAML is installed) file. The
+    document is either a list of goals or an object with a "goals" list.
+    Raises ValueError with a readable message on invalid content.
+    """
+    try:
+        data = _read_document(path)
+    except (OSError, json.JSONDecodeError) as e:
+        raise ValueError(f"Não foi possível ler {path}: {e}")
+
+    if isinstance(data, dict):
+        data = data.get("goals")
+    if not isinstance(data, list):
+        raise ValueError("O arquivo deve conter uma lista de objetivos (ou um objeto com a chave 'goals').")
+
+    specs = []
+    for i, item in enumerate(data, start=1):
+        if isinstance(item, str):
+            item = {"title": item}
+        try:
+            specs.append(GoalSpec.model_validate(item))
+        except ValidationError as e:
+            raise ValueError(f"Objetivo #{i} inválido: {e.errors()[0]['msg']}")
+    return specs
+
+def build_goal(spec: GoalSpec, suggestion: Optional[dict], default_horizon: Horizon,
+               classifier: Optional[CategoryClassifier] = None) -> Goal:
+    """
+    Merges a spec with the AI suggestion for it; values from the file always win.
+    `classifier` (trained on the user's goals) is the fallback for the category.
+    """
+    suggestion = suggestion or {}
+
+    category = spec.category
+    if category is None:
+        try:
+            category = GoalCategory(suggestion.get("category"))
+        except ValueError:
+            # No usable AI answer: local classifier, then 'outros'
+            classifier = classifier or CategoryClassifier.from_goals()
+            predicted, _ = classifier.predict(f"{spec.title} {spec.description}")
+            category = predicted or GoalCategory.OTHERS
+
+    smart = spec.smart_criteria or suggestion.get("smart") or SmartCriteria(
+        specific=spec.description, measurable="", achievable="", relevant="", time_bound=""
+    )
+    milestone_titles = spec.milestones or suggestion.get("milestones") or []
+
+    goal = Goal(
+        title=spec.title,
+        description=spec.description,
+        category=category,
+        horizon=spec.horizon or default_horizon,
+        smart_criteria=smart,
+        milestones=[Milestone(title=t) for t in milestone_titles],
+    )
+    apply_inferred_target(goal)
+    return goal
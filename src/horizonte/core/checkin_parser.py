@@ -0,0 +1,172 @@
+"""
+Offline parser for conversational check-ins ("guardei 5k, corri 40km").
+
+Each clause of the user's text is matched against a token index of the active goals
+and turned into the same raw update format the LLM returns, so both paths share
+ai.apply_checkin_math. Clauses that are not resolved with confidence are returned
+as ambiguous and only those are sent to the LLM.
+"""
+import re
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Set
+
+from .ai import apply_checkin_math
+from .classifier import tokenize
+from .models import Goal, GoalCategory
+from .targets import Quantity, goal_target, quantities as _quantities
+
+# Clause boundaries: ; ! ? newlines, "." / "," not inside a number, and the conjunction " e "
+_CLAUSE_SPLIT = re.compile(r"[;!?\n]+|(?<!\d)[.,]|[.,](?!\d)|\s+e\s+")
+
+# Words that make a number the new total instead of an increment
+_ABSOLUTE_MARKERS = {
+    "tenho", "estou", "cheguei", "atingi", "alcancei", "total", "agora", "acumulado",
+    "acumulei", "somando", "marca", "saldo", "patrimonio",
+}
+_ABSOLUTE_TOKENS = set(tokenize(" ".join(_ABSOLUTE_MARKERS)))
+
+# Action verbs that add weight to the goals of a category. They only break ties: a
+# number is applied to a goal only when the clause shares a word with it.
+_CATEGORY_VERBS: Dict[GoalCategory, Set[str]] = {
+    GoalCategory.FINANCIAL: set(tokenize("guardei juntei poupei investi economizei aportei depositei reais")),
+    GoalCategory.HEALTH: set(tokenize("corri pedalei nadei treinei emagreci perdi malhei caminhei")),
+    GoalCategory.LIFE: set(tokenize("li viajei visitei")),
+    GoalCategory.PROFESSIONAL: set(tokenize("estudei conclui terminei entreguei vendi")),
+}
+
+# Paying off a debt is not saving: these verbs only point to debt goals (and the
+# saving verbs above never do)
+_DEBT_VERBS = set(tokenize("paguei quitei amortizei abati"))
+_DEBT_TERMS = set(tokenize("divida quitar pagar financiamento emprestimo cartao parcela amortizar"))
+
+@dataclass
+class GoalTerms:
+    """Precomputed match data for one goal."""
+    goal: Goal
+    tokens: Set[str]
+    target: Optional[float]
+    unit: Optional[str]
+    debt: bool = False
+
+@dataclass
+class ParseResult:
+    updates: List[dict] = field(default_factory=list)
+    ambiguous: List[str] = field(default_factory=list)
+
+def build_goal_index(goals: List[Goal]) -> List[GoalTerms]:
+    index = []
+    for g in goals:
+        tokens = set(tokenize(f"{g.title} {g.description}"))
+        debt = g.category == GoalCategory.FINANCIAL and bool(tokens & _DEBT_TERMS)
+        target, unit = goal_target(g)
+        index.append(GoalTerms(goal=g, tokens=tokens, target=target, unit=unit, debt=debt))
+    return index
+
+def clause_tokens(clause: str) -> Set[str]:
+    """
+    Tokens of a clause plus the infinitives of its first-person past verbs, so that
+    "corri" names the goal "Correr 1000km" (corri -> correr, guardei -> guardar).
+    """
+    tokens = set(tokenize(clause))
+    for token in list(tokens):
+        if token.endswith("guei"):
+            forms = token[:-4] + "gar"
+        elif token.endswith("quei"):
+            forms = token[:-4] + "car"
+        elif token.endswith("ei"):
+            forms = token[:-2] + "ar"
+        elif token.endswith("i"):
+            forms = f"{token[:-1]}er {token[:-1]}ir"
+        else:
+            continue
+        tokens.update(tokenize(forms))
+    return tokens
+
+def split_clauses(text: str) -> List[str]:
+    return [c.strip() for c in _CLAUSE_SPLIT.split(text) if c and c.strip()]
+
+def score_goal(terms: GoalTerms, clause_tokens: Set[str], quantity: Optional[Quantity]) -> float:
+    score = float(len(terms.tokens & clause_tokens))
+    if quantity is not None and quantity.unit and quantity.unit == terms.unit:
+        score += 2
+    verbs = _DEBT_VERBS if terms.debt else _CATEGORY_VERBS.get(terms.goal.category, set())
+    if verbs & clause_tokens:
+        score += 1
+    return score
+
+def _match(index: List[GoalTerms], clause_tokens: Set[str], quantity: Optional[Quantity]) -> List[GoalTerms]:
+    """
+    Best-scoring goals for a clause. With a number, only goals the clause names (shares
+    a word with) are candidates. Ties are only accepted between goals of the same
+    category, kind (debt or not) and unit (e.g. the short and long term versions of a
+    savings goal).
+    """
+    candidates = index if quantity is None else [t for t in index if t.tokens & clause_tokens]
+    scored = [(s, t) for t in candidates if (s := score_goal(t, clause_tokens, quantity)) > 0]
+    if not scored:
+        return []
+    best = max(s for s, _ in scored)
+    winners = [t for s, t in scored if s == best]
+    if len({(t.goal.category, t.debt, t.unit) for t in winners}) > 1:
+        return []
+    return winners
+
+def _raw_update(terms: GoalTerms, quantity: Quantity, absolute: bool, clause: str) -> Optional[dict]:
+    raw = {
+        "goal_id": terms.goal.id,
+        "target_value": None,
+        "current_value": None,
+        "delta_value": None,
+        "explicit_percent": None,
+        "comment": clause[:1].upper() + clause[1:],
+    }
+    if quantity.percent:
+        raw["explicit_percent"] = quantity.value
+        raw["reasoning"] = f"Percentual informado: {quantity.value:g}%"
+        return raw
+    if not terms.target:
+        return None
+    raw["target_value"] = terms.target
+    if absolute:
+        raw["current_value"] = quantity.value
+        raw["reasoning"] = f"Valor atual {quantity.value:g} de {terms.target:g} (parser local)"
+    else:
+        raw["delta_value"] = quantity.value
+        raw["reasoning"] = f"+{quantity.value:g} sobre o progresso anterior, meta {terms.target:g} (parser local)"
+    return raw
+
+def parse_checkin(text: str, goals: List[Goal], index: Optional[List[GoalTerms]] = None) -> ParseResult:
+    """
+    Resolves what it can locally. Every other clause (no number, no goal named, a
+    goal without a numeric target, several candidate goals) ends up in `ambiguous`,
+    so nothing the user wrote is dropped without the LLM seeing it.
+    """
+    index = index if index is not None else build_goal_index(goals)
+    result = ParseResult()
+    raw_items: Dict[str, dict] = {}
+
+    for clause in split_clauses(text):
+        quantities = _quantities(clause)
+        tokens = clause_tokens(clause)
+        if not quantities:
+            # Qualitative ("avancei bem na corrida"): the LLM decides if it is progress
+            result.ambiguous.append(clause)
+            continue
+
+        amounts = [q for q in quantities if not q.percent]
+        if len(amounts) > 1 and len(amounts) == len(quantities):
+            # "guardei 500 de 1000": several numbers, the relation needs the LLM
+            result.ambiguous.append(clause)
+            continue
+        quantity = next((q for q in quantities if q.percent), quantities[0])
+        matches = _match(index, tokens, quantity)
+        absolute = bool(tokens & _ABSOLUTE_TOKENS)
+        updates = [_raw_update(terms, quantity, absolute, clause) for terms in matches]
+        if not matches or None in updates:
+            result.ambiguous.append(clause)
+            continue
+        for raw in updates:
+            raw_items[raw["goal_id"]] = raw
+
+    result.updates = apply_checkin_math(list(raw_items.values()), goals)
+    return result
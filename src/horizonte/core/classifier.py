@@ -0,0 +1,130 @@
+import math
+import re
+import unicodedata
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from .config import env_float
+from .models import Goal, GoalCategory
+
+# pt-BR seed vocabulary per category, so the classifier works before the user has any goals
+SEED_VOCABULARY: Dict[GoalCategory, str] = {
+    GoalCategory.FINANCIAL: (
+        "dinheiro investir investimento investimentos poupar poupança economizar reserva emergência "
+        "dívida dívidas quitar renda salário patrimônio ações bolsa tesouro aposentadoria "
+        "financeiro financeira juntar reais mil orçamento gastos milhão imóvel apartamento comprar"
+    ),
+    GoalCategory.HEALTH: (
+        "saúde correr corrida maratona academia treino treinar peso emagrecer quilos dieta "
+        "alimentação dormir sono médico exercício exercícios musculação nadar natação bicicleta "
+        "pedalar meditar meditação ansiedade terapia beber água fumar álcool km"
+    ),
+    GoalCategory.PROFESSIONAL: (
+        "carreira trabalho emprego promoção empresa negócio cliente clientes projeto certificação "
+        "curso cursos faculdade mestrado inglês idioma aprender programação linkedin sênior gerente "
+        "liderança vendas startup freelance currículo entrevista estudar"
+    ),
+    GoalCategory.LIFE: (
+        "família filhos filho filha casamento casar viagem viajar amigos relacionamento namoro "
+        "ler livros leitura hobby música tocar violão casa morar cozinhar voluntariado "
+        "pais tempo lazer férias cachorro"
+    ),
+    GoalCategory.OTHERS: "outros outro diversos geral",
+}
+
+STOPWORDS = set("""
+a o as os de da do das dos e em no na nos nas um uma uns umas para pra por com sem que
+ao aos meu minha meus minhas seu sua mais menos ate até ser ter fazer cada todo toda todos
+este esta isso esse essa ano anos mes mês meses dia dias vez vezes ou se eu
+""".split())
+
+# Predictions below this posterior probability are escalated to the LLM
+CONFIDENCE_THRESHOLD = 0.7
+# User goals weigh more than the generic seed vocabulary
+USER_DOCUMENT_WEIGHT = 3
+# Additive smoothing; small so that a single seed word is already a strong signal
+ALPHA = 0.1
+
+_SUFFIXES = ("imentos", "imento", "mentos", "mento", "ções", "ção", "coes", "cao", "ando", "endo", "indo", "ar", "er", "ir", "as", "os", "es", "a", "o", "s")
+
+def _normalize(text: str) -> str:
+    decomposed = unicodedata.normalize("NFKD", text.lower())
+    return "".join(c for c in decomposed if not unicodedata.combining(c))
+
+def _stem(word: str) -> str:
+    for suffix in _SUFFIXES:
+        if len(word) - len(suffix) >= 4 and word.endswith(suffix):
+            return word[:-len(suffix)]
+    return word
+
+_STOPWORDS = {_normalize(w) for w in STOPWORDS}
+_WORD_RE = re.compile(r"[a-z]+|\d+k?")
+
+def tokenize(text: str) -> List[str]:
+    tokens = []
+    for word in _WORD_RE.findall(_normalize(text)):
+        if word in _STOPWORDS or (len(word) < 3 and not word.isdigit()):
+            continue
+        tokens.append(_stem(word))
+    return tokens
+
+class CategoryClassifier:
+    """Multinomial naive Bayes over stemmed pt-BR tokens (additive smoothing)."""
+    def __init__(self):
+        self.token_counts: Dict[GoalCategory, Counter] = {c: Counter() for c in GoalCategory}
+        self.doc_counts: Counter = Counter()
+        self.vocabulary: set = set()
+
+    def train(self, text: str, category: GoalCategory, weight: int = 1):
+        tokens = tokenize(text)
+        for _ in range(weight):
+            self.token_counts[category].update(tokens)
+        self.doc_counts[category] += weight
+        self.vocabulary.update(tokens)
+
+    @classmethod
+    def from_goals(cls, goals: Iterable[Goal] = ()) -> "CategoryClassifier":
+        model = cls()
+        for category, words in SEED_VOCABULARY.items():
+            for word in words.split():
+                model.train(word, category)
+        for goal in goals:
+            model.train(f"{goal.title} {goal.description}", goal.category, weight=USER_DOCUMENT_WEIGHT)
+        return model
+
+    def predict(self, text: str) -> Tuple[Optional[GoalCategory], float]:
+        """Returns (category, posterior probability); (None, 0.0) if no known word is present."""
+        tokens = [t for t in tokenize(text) if t in self.vocabulary]
+        if not tokens:
+            return None, 0.0
+
+        total_docs = sum(self.doc_counts.values())
+        vocab_size = len(self.vocabulary)
+        scores = {}
+        for category, counts in self.token_counts.items():
+            total = sum(counts.values())
+            score = math.log((self.doc_counts[category] + 1) / (total_docs + len(self.token_counts)))
+            for token in tokens:
+                score += math.log((counts[token] + ALPHA) / (total + ALPHA * vocab_size))
+            scores[category] = score
+
+        best = max(scores, key=scores.get)
+        norm = sum(math.exp(s - scores[best]) for s in scores.values())
+        return best, 1.0 / norm
+
+def _threshold() -> float:
+    return env_float("HORIZONTE_CLASSIFIER_THRESHOLD", CONFIDENCE_THRESHOLD)
+
+def local_category(title: str, description: str, goals: Iterable[Goal] = ()) -> Optional[str]:
+    """
+    Category answered locally when the classifier is confident, otherwise None and
+    the caller escalates to the LLM. Both outcomes are counted in the metrics store.
+    """
+    from . import metrics
+
+    category, confidence = CategoryClassifier.from_goals(goals).predict(f"{title} {description}")
+    if category is not None and confidence >= _threshold():
+        metrics.increment("category.local")
+        return category.value
+    metrics.increment("category.llm")
+    return None
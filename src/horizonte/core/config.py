@@ -0,0 +1,24 @@
+"""
+Settings shared by the core modules: the app directory, and numeric settings read from
+the environment (HORIZONTE_* / OPENROUTER_* knobs, see .env.example). A value that
+does not parse falls back to the default.
+
+Kept dependency-free so small modules (metrics, classifier, AI cache) can use it
+without importing the storage layer.
+"""
+import os
+from pathlib import Path
+
+APP_DIR = Path.home() / ".road-to-35"
+
+def env_int(name: str, default: int) -> int:
+    try:
+        return int(os.getenv(name, default))
+    except ValueError:
+        return default
+
+def env_float(name: str, default: float) -> float:
+    try:
+        return float(os.getenv(name, default))
+    except ValueError:
+        return default
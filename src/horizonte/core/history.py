@@ -0,0 +1,278 @@
+import json
+from bisect import insort
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+from . import serialization
+from .models import CheckIn, HistoryEntry
+from .views import history_entry
+
+def entry_from_checkin(checkin: CheckIn) -> HistoryEntry:
+    goals = {}
+    for g in checkin.snapshot or []:
+        goals[g.get("id", "")] = (
+            g.get("progress_percentage", 0),
+            g.get("status", "active"),
+            g.get("category", "outros"),
+        )
+    return HistoryEntry(
+        id=checkin.id,
+        date=checkin.date,
+        type=checkin.type,
+        file_path=checkin.file_path,
+        goals=goals,
+        snapshot_base=(checkin.snapshot_delta or {}).get("base"),
+    )
+
+def _timeseries_from(entries: List[HistoryEntry]) -> Dict[str, List[list]]:
+    series: Dict[str, List[list]] = {}
+    for e in entries:
+        date_str = e.date.isoformat()
+        for goal_id, (progress, status, _category) in e.goals.items():
+            series.setdefault(goal_id, []).append([date_str, progress, status])
+    return series
+
+class HistoryIndex:
+    """
+    Persistent index of check-in history stored next to the check-ins directory,
+    plus a goal id -> [(date, progress, status)] timeseries file.
+    Both are trusted as long as the directory mtime matches the one recorded at the last
+    write; otherwise they are rebuilt. The index has a checksum sidecar: when it matches,
+    entries are loaded without validation.
+
+    A saved check-in that is new (not a re-save) is appended as one line to a log next
+    to the index instead of rewriting both files; the log is folded into them every
+    COMPACT_THRESHOLD entries. Parsed files are kept in memory while their stat is unchanged.
+    """
+    COMPACT_THRESHOLD = 50
+    # Bumped when the entry fields change: indexes written in another format are rebuilt
+    FORMAT = 2
+
+    def __init__(self, index_path: Path, checkins_dir: Path, timeseries_path: Optional[Path] = None):
+        self.index_path = index_path
+        self.timeseries_path = timeseries_path or index_path.with_suffix(".timeseries.json")
+        self.log_path = index_path.with_name(f"{index_path.name}.log")
+        self.checkins_dir = checkins_dir
+        self.version = 0
+        self._parsed: Dict[Path, tuple] = {}
+
+    def _dir_mtime(self) -> Optional[int]:
+        try:
+            return self.checkins_dir.stat().st_mtime_ns
+        except FileNotFoundError:
+            return None
+
+    @staticmethod
+    def _signature(path: Path) -> Optional[tuple]:
+        try:
+            st = path.stat()
+        except OSError:
+            return None
+        return (st.st_mtime_ns, st.st_size, st.st_ino)
+
+    def _file_signature(self, path: Path) -> Optional[tuple]:
+        signature = self._signature(path)
+        if signature is None:
+            return None
+        return signature, self._signature(serialization.checksum_path(path))
+
+    def _read(self, path: Path, validate: bool = True) -> Optional[dict]:
+        return self._read_verified(path, validate)[0]
+
+    def _read_verified(self, path: Path, validate: bool = True) -> Tuple[Optional[dict], bool]:
+        """The parsed file (None if missing, stale or invalid) and whether it matches its checksum."""
+        signature = self._file_signature(path)
+        cached = self._parsed.get(path)
+        if signature is not None and cached is not None and cached[0] == signature:
+            data, trusted = cached[1], cached[2]
+        else:
+            content, trusted = serialization.read_verified(path)
+            if content is None:
+                return None, False
+            try:
+                data = serialization.loads(content)
+            except json.JSONDecodeError:
+                return None, False
+            if not isinstance(data, dict):
+                return None, False
+            self._parsed[path] = (signature, data, trusted)
+        if validate and (data.get("format") != self.FORMAT or self._logged_state(data)[1] != self._dir_mtime()):
+            return None, False
+        return data, trusted
+
+    def _read_log(self) -> List[dict]:
+        """Lines of the append log (a torn last line is ignored)."""
+        signature = self._signature(self.log_path)
+        if signature is None:
+            return []
+        cached = self._parsed.get(self.log_path)
+        if cached is not None and cached[0] == signature:
+            return cached[1]
+        lines = []
+        with open(self.log_path, 'rb') as f:
+            for raw in f:
+                try:
+                    lines.append(serialization.loads(raw))
+                except json.JSONDecodeError:
+                    continue
+        self._parsed[self.log_path] = (signature, lines)
+        return lines
+
+    def _logged_state(self, data: dict) -> Tuple[List[dict], Optional[int]]:
+        """
+        Entries logged on top of a base file (index or timeseries) and the directory mtime
+        recorded by the last write. Lines written for another base version are already
+        folded into it.
+        """
+        lines = [line for line in self._read_log() if line.get("base") == data.get("version")]
+        if not lines:
+            return [], data.get("dir_mtime_ns")
+        return [line["entry"] for line in lines], lines[-1].get("dir_mtime_ns")
+
+    def _logged(self, data: dict) -> List[dict]:
+        return self._logged_state(data)[0]
+
+    def version_key(self) -> Optional[str]:
+        """Cheap stat-based version of the index: changes whenever it, its log or the directory is rewritten."""
+        try:
+            st = self.index_path.stat()
+        except FileNotFoundError:
+            return None
+        log = self._signature(self.log_path)
+        return f"{self._dir_mtime()}:{st.st_mtime_ns}:{st.st_size}:{log[1] if log else 0}"
+
+    def is_fresh(self) -> bool:
+        """True if the index matches the directory. Call before writing new check-in files."""
+        data = self._read(self.index_path)
+        return data is not None and data.get("version") == self._read_version(self.timeseries_path)
+
+    def _read_version(self, path: Path) -> Optional[int]:
+        data = self._read(path, validate=False)
+        return data.get("version") if data else None
+
+    def _write(self, entries: List[HistoryEntry]):
+        from .storage import atomic_write, remove_file
+
+        self.version += 1
+        dir_mtime = self._dir_mtime()
+        series = _timeseries_from(entries)
+        index_data = {
+            "format": self.FORMAT,
+            "version": self.version,
+            "dir_mtime_ns": dir_mtime,
+            "entries": [e.model_dump(mode='json') for e in entries],
+        }
+        series_data = {"format": self.FORMAT, "version": self.version, "dir_mtime_ns": dir_mtime, "series": series}
+        # Derived data: no backups needed. The log goes first: without it, a base left
+        # behind by a crash no longer matches the directory and is rebuilt.
+        remove_file(self.log_path, make_backup=False)
+        atomic_write(self.timeseries_path, serialization.dumps(series_data), make_backup=False)
+        index_content = serialization.dumps(index_data)
+        atomic_write(self.index_path, index_content, make_backup=False)
+        atomic_write(serialization.checksum_path(self.index_path), serialization.checksum(index_content), make_backup=False)
+        self._parsed = {
+            self.index_path: (self._file_signature(self.index_path), index_data, True),
+            self.timeseries_path: (self._file_signature(self.timeseries_path), series_data, False),
+        }
+
+    def _append_log(self, entry: HistoryEntry):
+        from .storage import append_line
+
+        line = {"base": self.version, "dir_mtime_ns": self._dir_mtime(), "entry": entry.model_dump(mode='json')}
+        lines = self._read_log()
+        append_line(self.log_path, serialization.dumps(line), make_backup=False)
+        self._parsed[self.log_path] = (self._signature(self.log_path), lines + [line])
+
+    def _rebuild(self, rebuild: Callable[[], List[CheckIn]]) -> List[HistoryEntry]:
+        entries = sorted((entry_from_checkin(c) for c in rebuild()), key=lambda e: e.date)
+        self._write(entries)
+        return entries
+
+    def load(self, rebuild: Callable[[], List[CheckIn]]) -> List[HistoryEntry]:
+        """Returns entries sorted by date, rebuilding from the full check-ins if the index is stale."""
+        if self._dir_mtime() is None:
+            return []
+
+        data, trusted = self._read_verified(self.index_path)
+        if data is not None:
+            self.version = data.get("version", 0)
+            raw_entries = data.get("entries", [])
+            entries = None
+            if trusted:
+                try:
+                    entries = [history_entry(e) for e in raw_entries]
+                except (KeyError, ValueError, TypeError):
+                    pass
+            if entries is None:
+                entries = [HistoryEntry(**e) for e in raw_entries]
+            for raw in self._logged(data):
+                insort(entries, HistoryEntry(**raw), key=lambda e: e.date)
+            return entries
+
+        return self._rebuild(rebuild)
+
+    def snapshot_bases(self, rebuild: Callable[[], List[CheckIn]]) -> Dict[str, Optional[str]]:
+        """Check-in file stem -> the stem its snapshot is a delta on (None for keyframes), read from the raw records."""
+        if self._dir_mtime() is None:
+            return {}
+
+        data = self._read(self.index_path)
+        if data is None:
+            return {Path(e.file_path).stem: e.snapshot_base for e in self._rebuild(rebuild)}
+        return {
+            Path(raw["file_path"]).stem: raw.get("snapshot_base")
+            for raw in data.get("entries", []) + self._logged(data)
+        }
+
+    def goal_timeseries(self, goal_id: str, rebuild: Callable[[], List[CheckIn]]) -> List[dict]:
+        """Returns [{'date', 'progress', 'status'}] for one goal with a single keyed lookup."""
+        if self._dir_mtime() is None:
+            return []
+
+        data = self._read(self.timeseries_path)
+        if data is not None:
+            points = list(data.get("series", {}).get(goal_id, []))
+            for raw in self._logged(data):
+                row = raw.get("goals", {}).get(goal_id)
+                if row is not None:
+                    insort(points, [raw["date"], row[0], row[1]], key=lambda pt: pt[0])
+        else:
+            points = _timeseries_from(self._rebuild(rebuild)).get(goal_id, [])
+
+        return [
+            {"date": datetime.fromisoformat(d), "progress": p, "status": status}
+            for d, p, status in points
+        ]
+
+    def append(self, checkin: CheckIn, rebuild: Callable[[], List[CheckIn]], was_fresh: bool = True) -> bool:
+        """
+        Records a freshly saved check-in (replacing any entry for the same file).
+        was_fresh is the result of is_fresh() taken before the check-in files were written.
+        Returns True if the check-in was simply appended as the newest entry.
+        """
+        data = self._read(self.index_path, validate=False) if was_fresh else None
+        if data is None or data.get("version") != self._read_version(self.timeseries_path):
+            # Stale or missing: a rebuild already includes the new check-in
+            self._rebuild(rebuild)
+            return False
+
+        self.version = data.get("version", 0)
+        new_entry = entry_from_checkin(checkin)
+        logged = self._logged(data)
+        raw_entries = data.get("entries", []) + logged
+        replaced = any(raw["id"] == new_entry.id or raw["file_path"] == new_entry.file_path for raw in raw_entries)
+        newest = all(datetime.fromisoformat(raw["date"]) <= new_entry.date for raw in raw_entries)
+
+        if not replaced and len(logged) < self.COMPACT_THRESHOLD:
+            # Incremental: one log line instead of rewriting the index and every series
+            self._append_log(new_entry)
+            return newest
+
+        entries = [HistoryEntry(**raw) for raw in raw_entries
+                   if raw["id"] != new_entry.id and raw["file_path"] != new_entry.file_path]
+        entries.append(new_entry)
+        # Logged entries are in save order, not date order
+        entries.sort(key=lambda e: e.date)
+        self._write(entries)
+        return not replaced and newest
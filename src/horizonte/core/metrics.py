@@ -0,0 +1,67 @@
+import json
+import os
+import tempfile
+import threading
+from pathlib import Path
+from typing import Dict
+
+from .config import APP_DIR
+
+METRICS_FILE = APP_DIR / "metrics.json"
+
+_lock = threading.Lock()
+
+class MetricsStore:
+    """Small persistent counters (e.g. local vs LLM answers) shown by `horizonte stats`."""
+    def __init__(self, file_path: Path = METRICS_FILE):
+        self.file_path = file_path
+
+    def load(self) -> Dict[str, float]:
+        if not self.file_path.exists():
+            return {}
+        try:
+            with open(self.file_path, 'r') as f:
+                data = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return {}
+        return data if isinstance(data, dict) else {}
+
+    def increment(self, name: str, value: float = 1):
+        self.increment_many({name: value})
+
+    def increment_many(self, values: Dict[str, float]):
+        with _lock:
+            data = self.load()
+            for name, value in values.items():
+                data[name] = data.get(name, 0) + value
+            try:
+                self._write(json.dumps(data, indent=2, sort_keys=True))
+            except OSError:
+                # Metrics are best effort and must never break a command
+                pass
+
+    def _write(self, content: str):
+        """Temp file + rename (no backups: counters are not user data)."""
+        self.file_path.parent.mkdir(parents=True, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=self.file_path.parent, text=True)
+        try:
+            with os.fdopen(fd, 'w') as f:
+                f.write(content)
+            os.replace(temp_path, self.file_path)
+        except OSError:
+            os.remove(temp_path)
+            raise
+
+    def reset(self):
+        self.file_path.unlink(missing_ok=True)
+
+_store = MetricsStore()
+
+def increment(name: str, value: float = 1):
+    _store.increment(name, value)
+
+def increment_many(values: Dict[str, float]):
+    _store.increment_many(values)
+
+def load() -> Dict[str, float]:
+    return _store.load()
@@ -1,6 +1,6 @@
 from datetime import datetime
 from enum import Enum
-from typing import List, Optional
+from typing import Dict, List, Optional, Tuple
 from pydantic import BaseModel, Field
 import uuid
 
@@ -47,6 +47,9 @@ class Goal(BaseModel):
     status: GoalStatus = GoalStatus.ACTIVE
     status_reason: Optional[str] = None
     progress_percentage: int = Field(default=0, ge=0, le=100)
+    # Inferred from title/description when the goal is created or adjusted (see core.targets)
+    target_value: Optional[float] = None
+    unit: Optional[str] = None
 
 class CheckInType(str, Enum):
     MONTHLY = "monthly"
@@ -60,8 +63,22 @@ class CheckIn(BaseModel):
     goals_covered: List[str]  # List of Goal IDs
     file_path: str  # Path to the markdown file containing the check-in content
     snapshot: Optional[List[dict]] = None # List of Goal dict representations at the time of check-in
+    # On disk, most check-ins store a delta against the previous one instead (see core.snapshots)
+    snapshot_delta: Optional[dict] = None
+
+class HistoryEntry(BaseModel):
+    """Compact index record of a check-in: goal id -> (progress, status, category)."""
+    id: str
+    date: datetime
+    type: CheckInType
+    file_path: str
+    goals: Dict[str, Tuple[int, str, str]] = Field(default_factory=dict)
+    # Check-in file (stem) this one's snapshot is stored as a delta on, None for keyframes
+    snapshot_base: Optional[str] = None
 
 class Config(BaseModel):
     user_name: Optional[str] = None
     created_at: datetime = Field(default_factory=datetime.now)
     last_run_at: Optional[datetime] = None
+    # 'sqlite' once `horizonte migrate` has run: the JSON files are kept but no longer used
+    storage: Optional[str] = None
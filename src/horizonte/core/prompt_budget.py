@@ -0,0 +1,119 @@
+"""
+Keeps the check-in prompt small: only the goals relevant to the user's text are sent,
+and their fields are trimmed until the goal context fits a token budget.
+"""
+import json
+import os
+from dataclasses import dataclass
+from typing import Dict, List, Tuple
+
+from .config import env_int
+from .models import Goal
+
+DEFAULT_TOP_K = 8
+# Budget for the serialized goal context only (the fixed instructions are ~500 tokens)
+DEFAULT_CONTEXT_BUDGET = 1500
+# Above this many goals the check-in is parsed in concurrent shards
+SHARD_THRESHOLD = 12
+SHARD_KEYS = ("category", "horizon")
+# Trimming steps: max characters kept for description / smart_measurable
+_TRIM_STEPS = ((400, 300), (160, 160), (60, 80), (0, 80), (0, 0))
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (~4 characters per token), good enough for budgeting."""
+    return (len(text) + 3) // 4
+
+@dataclass
+class PromptSize:
+    goals_total: int
+    goals_sent: int
+    full_tokens: int
+    sent_tokens: int
+
+def goal_context(g: Goal, description_chars: int = None, measurable_chars: int = None) -> dict:
+    from .targets import goal_target
+
+    description = g.description if description_chars is None else g.description[:description_chars]
+    measurable = g.smart_criteria.measurable if measurable_chars is None else g.smart_criteria.measurable[:measurable_chars]
+    item = {
+        "id": g.id,
+        "title": g.title,
+        "description": description,
+        "category": g.category.value if hasattr(g.category, 'value') else str(g.category),
+        "horizon": g.horizon.value if hasattr(g.horizon, 'value') else str(g.horizon),
+        "current_percent": g.progress_percentage,
+        "smart_measurable": measurable,
+        "inferred_target_value": goal_target(g)[0]
+    }
+    # Empty fields cost tokens and say nothing
+    return {k: v for k, v in item.items() if v not in ("", None) or k == "inferred_target_value"}
+
+def rank_goals(user_text: str, goals: List[Goal]) -> List[Goal]:
+    """Goals ordered by relevance to the text (word, unit and action-verb overlap); ties keep input order."""
+    from .checkin_parser import build_goal_index, score_goal
+    from .classifier import tokenize
+    from .targets import quantities
+
+    text_tokens = set(tokenize(user_text))
+    amounts = [q for q in quantities(user_text) if q.unit]
+    scored = []
+    for pos, terms in enumerate(build_goal_index(goals)):
+        score = max([score_goal(terms, text_tokens, q) for q in amounts] or [score_goal(terms, text_tokens, None)])
+        scored.append((-score, pos, terms.goal))
+    return [g for _, _, g in sorted(scored, key=lambda t: (t[0], t[1]))]
+
+def build_goal_context(user_text: str, goals: List[Goal]) -> Tuple[List[dict], PromptSize]:
+    """
+    Top-K relevant goals, trimmed step by step (descriptions first) until the
+    serialized context fits the budget; as a last resort the least relevant goals
+    are dropped. HORIZONTE_CHECKIN_TOP_K / HORIZONTE_PROMPT_BUDGET override the limits.
+    """
+    top_k = max(1, env_int("HORIZONTE_CHECKIN_TOP_K", DEFAULT_TOP_K))
+    budget = env_int("HORIZONTE_PROMPT_BUDGET", DEFAULT_CONTEXT_BUDGET)
+
+    full_tokens = estimate_tokens(json.dumps([goal_context(g) for g in goals], ensure_ascii=False))
+    selected = rank_goals(user_text, goals)[:top_k]
+
+    context = [goal_context(g) for g in selected]
+    tokens = estimate_tokens(json.dumps(context, ensure_ascii=False))
+    for description_chars, measurable_chars in _TRIM_STEPS:
+        if tokens <= budget:
+            break
+        context = [goal_context(g, description_chars, measurable_chars) for g in selected]
+        tokens = estimate_tokens(json.dumps(context, ensure_ascii=False))
+
+    while tokens > budget and len(context) > 1:
+        context.pop()
+        tokens = estimate_tokens(json.dumps(context, ensure_ascii=False))
+
+    return context, PromptSize(
+        goals_total=len(goals), goals_sent=len(context), full_tokens=full_tokens, sent_tokens=tokens
+    )
+
+def record(size: PromptSize, prompt_tokens: int):
+    """Accumulates prompt-size metrics (shown by `horizonte stats`)."""
+    from . import metrics
+
+    metrics.increment_many({
+        "prompt.checkin.requests": 1,
+        "prompt.checkin.goals_total": size.goals_total,
+        "prompt.checkin.goals_sent": size.goals_sent,
+        "prompt.checkin.context_tokens_full": size.full_tokens,
+        "prompt.checkin.context_tokens_sent": size.sent_tokens,
+        "prompt.checkin.prompt_tokens": prompt_tokens,
+    })
+
+def shard_goals(goals: List[Goal], key: str = "category", max_size: int = DEFAULT_TOP_K) -> List[List[Goal]]:
+    """
+    Groups goals by category (or horizon) for concurrent parsing requests. Groups larger
+    than max_size are split so every shard fits the top-K filter untouched.
+    """
+    groups: Dict[str, List[Goal]] = {}
+    for g in goals:
+        value = getattr(g, key)
+        groups.setdefault(value.value if hasattr(value, 'value') else str(value), []).append(g)
+    return [group[i:i + max_size] for group in groups.values() for i in range(0, len(group), max_size)]
+
+def shard_key() -> str:
+    key = os.getenv("HORIZONTE_CHECKIN_SHARD_BY", "category")
+    return key if key in SHARD_KEYS else "category"
@@ -0,0 +1,105 @@
+"""
+Serialization of the stored documents (goals, check-ins).
+
+Storage files use a compact form: goals.json is a JSON array with one goal per
+line (still valid JSON, and line diffs stay small for the backup store) and check-in
+documents are written without indentation. When orjson is installed it does the
+encoding/decoding; HORIZONTE_SERIALIZER=json forces the standard library. Goal lists
+are validated in one pass with a pydantic TypeAdapter instead of Goal(**g) per record,
+with the cyclic garbage collector paused (see bulk()).
+
+The indented, human-readable JSON is kept for `horizonte export` (see pretty()).
+
+Files the app reads in bulk (goals.json, the history index) get a `.sha256` sidecar
+when written; read_verified() tells whether a file still matches it, which is what
+allows the read-only views (core.views) to skip validation.
+"""
+import gc
+import hashlib
+import json
+import os
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, List, Optional, Tuple, Union
+
+from pydantic import TypeAdapter
+
+from .models import CheckIn, Goal
+
+try:
+    import orjson
+except ImportError:  # Optional dependency: the standard json module is the fallback
+    orjson = None
+
+GOAL_LIST = TypeAdapter(List[Goal])
+CHECKIN = TypeAdapter(CheckIn)
+# Reused: json.dumps() with non-default options builds a new encoder on every call
+_ENCODER = json.JSONEncoder(ensure_ascii=False, separators=(",", ":"))
+
+def backend() -> str:
+    """'orjson' or 'json' (orjson is used when installed, unless HORIZONTE_SERIALIZER=json)."""
+    if orjson is not None and os.getenv("HORIZONTE_SERIALIZER", "").strip().lower() != "json":
+        return "orjson"
+    return "json"
+
+def loads(data: Union[str, bytes]) -> Any:
+    if backend() == "orjson":
+        return orjson.loads(data)
+    return json.loads(data)
+
+def dumps(obj: Any) -> str:
+    """Compact JSON (no indentation, non-ASCII kept as is)."""
+    if backend() == "orjson":
+        return orjson.dumps(obj).decode("utf-8")
+    return _ENCODER.encode(obj)
+
+def dumps_lines(items: List[Any]) -> str:
+    """A JSON array with one compact item per line."""
+    if not items:
+        return "[]"
+    return "[\n" + ",\n".join(dumps(item) for item in items) + "\n]"
+
+def pretty(obj: Any) -> str:
+    """Indented JSON for files meant to be read by people (exports)."""
+    return json.dumps(obj, indent=2, ensure_ascii=False)
+
+@contextmanager
+def bulk():
+    """
+    Pauses the cyclic GC while many long-lived objects are created (loading thousands of
+    goals otherwise triggers repeated full collections that find nothing to free).
+    """
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if enabled:
+            gc.enable()
+
+def validate_goals(data: List[dict]) -> List[Goal]:
+    with bulk():
+        return GOAL_LIST.validate_python(data)
+
+def validate_checkin(data: dict) -> CheckIn:
+    return CHECKIN.validate_python(data)
+
+def checksum(content: Union[str, bytes]) -> str:
+    if isinstance(content, str):
+        content = content.encode("utf-8")
+    return hashlib.sha256(content).hexdigest()
+
+def checksum_path(file_path: Path) -> Path:
+    return file_path.with_name(f"{file_path.name}.sha256")
+
+def read_verified(file_path: Path) -> Tuple[Optional[bytes], bool]:
+    """Raw content of a data file (None if missing) and whether it matches its checksum sidecar."""
+    try:
+        content = file_path.read_bytes()
+    except FileNotFoundError:
+        return None, False
+    try:
+        expected = checksum_path(file_path).read_text().strip()
+    except OSError:
+        return content, False
+    return content, expected == checksum(content)
@@ -0,0 +1,131 @@
+"""
+Delta-encoded check-in snapshots.
+
+A check-in used to store a full dump of every active goal. Now only every
+KEYFRAME_INTERVAL-th check-in in a chain is a full snapshot (keyframe); the others
+store a delta against the previous check-in:
+
+    {"base": <previous check-in>, "depth": <hops to the keyframe>,
+     "goals": [[id, progress_percentage, status, category], ...],
+     "changes": {goal_id: {field: new value}},
+     "added": {goal_id: <all fields of a goal not in the base>}}
+
+The "goals" rows are always complete: they fix the order and membership of the
+snapshot and carry what the history index needs, so history survives a missing
+base file. Everything else (title, SMART text, milestones...) is only stored when
+it changes; milestone changes are stored per milestone id.
+"""
+from typing import Callable, Dict, List, Optional
+
+KEYFRAME_INTERVAL = 6
+
+# Stored for every goal in every delta (see history.entry_from_checkin)
+ROW_FIELDS = ("id", "progress_percentage", "status", "category")
+
+class SnapshotChainError(ValueError):
+    """A delta refers to a base snapshot that is missing or inconsistent."""
+
+def _milestone_patch(old: list, new: list) -> Optional[Dict[str, dict]]:
+    """{milestone_id: changed fields}, or None if milestones were added, removed or reordered."""
+    if [m.get("id") for m in old] != [m.get("id") for m in new]:
+        return None
+    patch = {}
+    for o, n in zip(old, new):
+        if set(o) != set(n):
+            return None
+        changed = {k: v for k, v in n.items() if o.get(k) != v}
+        if changed:
+            patch[n["id"]] = changed
+    return patch
+
+def _goal_changes(old: dict, new: dict) -> dict:
+    changes = {}
+    for key, value in new.items():
+        if key in ROW_FIELDS or old.get(key) == value:
+            continue
+        if key == "milestones":
+            patch = _milestone_patch(old.get(key) or [], value or [])
+            # A dict patches milestones by id, a list replaces them
+            changes[key] = patch if patch is not None else value
+        else:
+            changes[key] = value
+    return changes
+
+def encode_delta(previous: List[dict], current: List[dict], base: str, depth: int) -> dict:
+    previous_by_id = {g.get("id"): g for g in previous}
+    delta = {"base": base, "depth": depth, "goals": [], "changes": {}, "added": {}}
+    for goal in current:
+        goal_id = goal.get("id")
+        delta["goals"].append([goal.get(f) for f in ROW_FIELDS])
+        old = previous_by_id.get(goal_id)
+        if old is None or set(old) != set(goal):
+            delta["added"][goal_id] = {k: v for k, v in goal.items() if k not in ROW_FIELDS}
+            continue
+        changes = _goal_changes(old, goal)
+        if changes:
+            delta["changes"][goal_id] = changes
+    return delta
+
+def apply_delta(previous: List[dict], delta: dict) -> List[dict]:
+    previous_by_id = {g.get("id"): g for g in previous}
+    added = delta.get("added") or {}
+    changes = delta.get("changes") or {}
+    snapshot = []
+    for row in delta.get("goals", []):
+        goal_id = row[0]
+        if goal_id in added:
+            goal = dict(added[goal_id])
+        elif goal_id in previous_by_id:
+            goal = dict(previous_by_id[goal_id])
+        else:
+            raise SnapshotChainError(f"Objetivo {goal_id} ausente do snapshot base {delta.get('base')}")
+        goal.update(zip(ROW_FIELDS, row))
+        for key, value in changes.get(goal_id, {}).items():
+            if key == "milestones" and isinstance(value, dict):
+                value = [{**m, **value.get(m.get("id"), {})} for m in goal.get("milestones") or []]
+            goal[key] = value
+        snapshot.append(goal)
+    return snapshot
+
+def summary(delta: dict) -> List[dict]:
+    """Partial snapshot (only the row fields) for when the chain cannot be resolved."""
+    return [dict(zip(ROW_FIELDS, row)) for row in delta.get("goals", [])]
+
+def encode(current: List[dict], previous: Optional[List[dict]], base: Optional[str], base_depth: int) -> Optional[dict]:
+    """
+    Delta for `current` against the previous check-in, or None when a keyframe
+    should be written (no usable base, or the chain reached KEYFRAME_INTERVAL).
+    """
+    depth = base_depth + 1
+    if previous is None or base is None or depth >= KEYFRAME_INTERVAL:
+        return None
+    return encode_delta(previous, current, base, depth)
+
+def resolve(key: str, load: Callable[[str], Optional[dict]], cache: Optional[Dict[str, List[dict]]] = None) -> List[dict]:
+    """
+    Full snapshot of one check-in. `load(key)` returns {"snapshot": [...]} for a
+    keyframe, {"snapshot_delta": {...}} for a delta, or None if the check-in is missing.
+    Resolved snapshots are memoized in `cache`, so resolving many check-ins of the same
+    chain reads and applies each delta once.
+    """
+    cache = {} if cache is None else cache
+    chain = []
+    seen = set()
+    while key not in cache:
+        if key in seen:
+            raise SnapshotChainError(f"Ciclo na cadeia de snapshots em {key}")
+        seen.add(key)
+        data = load(key)
+        if data is None:
+            raise SnapshotChainError(f"Snapshot base {key} não encontrado")
+        delta = data.get("snapshot_delta")
+        if not delta:
+            cache[key] = data.get("snapshot") or []
+            break
+        chain.append((key, delta))
+        key = delta.get("base")
+    snapshot = cache[key]
+    for chain_key, delta in reversed(chain):
+        snapshot = apply_delta(snapshot, delta)
+        cache[chain_key] = snapshot
+    return snapshot
@@ -0,0 +1,521 @@
+import json
+import os
+import sqlite3
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from pydantic import ValidationError
+
+from .models import Goal, Milestone, CheckIn, HistoryEntry
+from .history import entry_from_checkin
+from . import serialization, snapshots
+from .analytics_cache import AnalyticsCache
+from .views import GoalView
+from .storage import (
+    APP_DIR,
+    CHECKINS_DIR,
+    GOALS_FILE,
+    GoalsRepository,
+    CheckinRepository,
+    Transaction,
+    atomic_write,
+    ensure_app_dir,
+)
+
+DB_FILE = APP_DIR / "horizonte.db"
+
+SCHEMA_VERSION = 2
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS goals (
+    id TEXT PRIMARY KEY,
+    position INTEGER NOT NULL,
+    status TEXT NOT NULL,
+    category TEXT NOT NULL,
+    horizon TEXT NOT NULL,
+    progress_percentage INTEGER NOT NULL DEFAULT 0,
+    updated_at TEXT,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_goals_status ON goals(status);
+CREATE INDEX IF NOT EXISTS idx_goals_category ON goals(category);
+CREATE INDEX IF NOT EXISTS idx_goals_position ON goals(position);
+
+CREATE TABLE IF NOT EXISTS milestones (
+    id TEXT PRIMARY KEY,
+    goal_id TEXT NOT NULL REFERENCES goals(id) ON DELETE CASCADE,
+    position INTEGER NOT NULL,
+    title TEXT NOT NULL,
+    is_completed INTEGER NOT NULL DEFAULT 0,
+    completed_at TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_milestones_goal ON milestones(goal_id, position);
+
+CREATE TABLE IF NOT EXISTS checkins (
+    id TEXT PRIMARY KEY,
+    date TEXT NOT NULL,
+    type TEXT NOT NULL,
+    file_path TEXT NOT NULL,
+    goals_covered TEXT NOT NULL,
+    base_id TEXT,
+    depth INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_checkins_date ON checkins(date);
+
+CREATE TABLE IF NOT EXISTS checkin_snapshots (
+    checkin_id TEXT NOT NULL REFERENCES checkins(id) ON DELETE CASCADE,
+    goal_id TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    progress_percentage INTEGER NOT NULL DEFAULT 0,
+    status TEXT,
+    category TEXT,
+    data TEXT NOT NULL,
+    PRIMARY KEY (checkin_id, goal_id)
+);
+CREATE INDEX IF NOT EXISTS idx_snapshots_goal ON checkin_snapshots(goal_id);
+"""
+
+# Statements that bring a database from the previous version to the given one
+MIGRATIONS = {
+    # Delta snapshots: base_id is NULL for keyframes (full goal data in checkin_snapshots.data)
+    2: """
+    ALTER TABLE checkins ADD COLUMN base_id TEXT;
+    ALTER TABLE checkins ADD COLUMN depth INTEGER NOT NULL DEFAULT 0;
+    """,
+}
+
+_connections: Dict[Path, sqlite3.Connection] = {}
+
+def _value(v) -> str:
+    # Some commands assign plain strings to enum fields (e.g. goal.status = "completed")
+    return v.value if hasattr(v, 'value') else str(v)
+
+def connect(db_path: Path = DB_FILE) -> sqlite3.Connection:
+    """Returns a shared WAL-mode connection for the given database, creating the schema if needed."""
+    db_path = Path(db_path)
+    conn = _connections.get(db_path)
+    if conn is not None:
+        return conn
+
+    db_path.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(db_path)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute("PRAGMA foreign_keys=ON")
+
+    version = conn.execute("PRAGMA user_version").fetchone()[0]
+    if version < SCHEMA_VERSION:
+        with conn:
+            if version == 0:
+                conn.executescript(SCHEMA)
+            else:
+                for target in range(version + 1, SCHEMA_VERSION + 1):
+                    conn.executescript(MIGRATIONS[target])
+            conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
+    _connections[db_path] = conn
+    return conn
+
+def close_all():
+    for conn in _connections.values():
+        conn.close()
+    _connections.clear()
+
+def close(db_path: Path):
+    conn = _connections.pop(Path(db_path), None)
+    if conn is not None:
+        conn.close()
+
+class _SqliteRepository:
+    def __init__(self, db_path: Path = DB_FILE):
+        self.db_path = Path(db_path)
+        self._tx: Optional[Transaction] = None
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        return connect(self.db_path)
+
+    @contextmanager
+    def _transaction(self):
+        if self._tx is not None:
+            # Committed (or rolled back) by the enclosing batch()
+            yield
+        else:
+            with self.conn:
+                yield
+
+    def _begin_batch(self, tx: Transaction):
+        self._tx = tx
+        tx.enlist(self.conn)
+
+    def _flush_batch(self, tx: Transaction):
+        pass
+
+    def _discard_batch(self):
+        pass
+
+class SqliteGoalsRepository(_SqliteRepository):
+
+    def _goal_row(self, goal: Goal, position: int) -> tuple:
+        data = goal.model_dump(mode='json', exclude={'milestones'})
+        return (
+            goal.id,
+            position,
+            _value(goal.status),
+            _value(goal.category),
+            _value(goal.horizon),
+            goal.progress_percentage,
+            data.get('updated_at'),
+            serialization.dumps(data),
+        )
+
+    def _milestone_rows(self, goal: Goal) -> List[tuple]:
+        rows = []
+        for i, m in enumerate(goal.milestones):
+            completed_at = m.completed_at.isoformat() if m.completed_at else None
+            rows.append((m.id, goal.id, i, m.title, int(m.is_completed), completed_at))
+        return rows
+
+    def _write_goal(self, goal: Goal, position: int):
+        self.conn.execute(
+            "INSERT OR REPLACE INTO goals (id, position, status, category, horizon, progress_percentage, updated_at, data) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            self._goal_row(goal, position)
+        )
+        self.conn.execute("DELETE FROM milestones WHERE goal_id = ?", (goal.id,))
+        self.conn.executemany(
+            "INSERT INTO milestones (id, goal_id, position, title, is_completed, completed_at) VALUES (?, ?, ?, ?, ?, ?)",
+            self._milestone_rows(goal)
+        )
+
+    def _build_goals(self, rows) -> List[Goal]:
+        if not rows:
+            return []
+        ids = [r["id"] for r in rows]
+        placeholders = ",".join("?" * len(ids))
+        milestones: Dict[str, List[Milestone]] = {}
+        for m in self.conn.execute(
+            f"SELECT * FROM milestones WHERE goal_id IN ({placeholders}) ORDER BY goal_id, position", ids
+        ):
+            milestones.setdefault(m["goal_id"], []).append(Milestone(
+                id=m["id"],
+                title=m["title"],
+                is_completed=bool(m["is_completed"]),
+                completed_at=m["completed_at"],
+            ))
+        data = [{**serialization.loads(r["data"]), "milestones": milestones.get(r["id"], [])} for r in rows]
+        return serialization.validate_goals(data)
+
+    def load(self) -> List[Goal]:
+        rows = self.conn.execute("SELECT id, data FROM goals ORDER BY position").fetchall()
+        return self._build_goals(rows)
+
+    def get(self, goal_id: str) -> Optional[Goal]:
+        rows = self.conn.execute("SELECT id, data FROM goals WHERE id = ?", (goal_id,)).fetchall()
+        goals = self._build_goals(rows)
+        return goals[0] if goals else None
+
+    def load_views(self) -> List[GoalView]:
+        """Read-only projection of the goals (see core.views), from the indexed columns."""
+        rows = self.conn.execute(
+            "SELECT id, json_extract(data, '$.title') AS title, category, horizon, status, progress_percentage "
+            "FROM goals ORDER BY position"
+        ).fetchall()
+        return [GoalView.from_dict(dict(r)) for r in rows]
+
+    def find(self, status: Optional[str] = None, category: Optional[str] = None) -> List[Goal]:
+        """Returns goals filtered by status and/or category using the table indexes."""
+        clauses, params = [], []
+        if status is not None:
+            clauses.append("status = ?")
+            params.append(_value(status))
+        if category is not None:
+            clauses.append("category = ?")
+            params.append(_value(category))
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        rows = self.conn.execute(f"SELECT id, data FROM goals {where} ORDER BY position", params).fetchall()
+        return self._build_goals(rows)
+
+    def save(self, goals: List[Goal]):
+        with self._transaction():
+            self.conn.execute("DELETE FROM goals")
+            for i, g in enumerate(goals):
+                self._write_goal(g, i)
+
+    def add(self, goal: Goal):
+        with self._transaction():
+            position = self.conn.execute("SELECT COALESCE(MAX(position), -1) + 1 FROM goals").fetchone()[0]
+            self._write_goal(goal, position)
+
+    def update(self, goal: Goal):
+        with self._transaction():
+            row = self.conn.execute("SELECT position FROM goals WHERE id = ?", (goal.id,)).fetchone()
+            if row is None:
+                return
+            self._write_goal(goal, row["position"])
+
+class SqliteCheckinRepository(_SqliteRepository):
+    def __init__(self, db_path: Path = DB_FILE, dir_path: Path = CHECKINS_DIR):
+        super().__init__(db_path)
+        self.dir_path = dir_path
+        self.analytics_cache = AnalyticsCache(self.db_path.with_name(f"{self.db_path.stem}_analytics.json"))
+
+    def history_version(self) -> Optional[str]:
+        count, max_rowid = self.conn.execute("SELECT COUNT(*), MAX(rowid) FROM checkins").fetchone()
+        return f"sqlite:{count}:{max_rowid}"
+
+    def _snapshot_document(self, checkin_id: str) -> Optional[dict]:
+        """One check-in's snapshot in the core.snapshots format (keyframe or delta)."""
+        row = self.conn.execute("SELECT base_id, depth FROM checkins WHERE id = ?", (checkin_id,)).fetchone()
+        if row is None:
+            return None
+        goals = self.conn.execute(
+            "SELECT goal_id, progress_percentage, status, category, data FROM checkin_snapshots "
+            "WHERE checkin_id = ? ORDER BY position", (checkin_id,)
+        ).fetchall()
+        return self._document(row["base_id"], row["depth"], goals)
+
+    @staticmethod
+    def _document(base_id: Optional[str], depth: int, goals: list) -> dict:
+        if base_id is None:
+            return {"snapshot": [json.loads(g["data"]) for g in goals]}
+        delta = {"base": base_id, "depth": depth, "goals": [], "changes": {}, "added": {}}
+        for g in goals:
+            delta["goals"].append([g["goal_id"], g["progress_percentage"], g["status"], g["category"]])
+            data = json.loads(g["data"])
+            if "added" in data:
+                delta["added"][g["goal_id"]] = data["added"]
+            elif data.get("changes"):
+                delta["changes"][g["goal_id"]] = data["changes"]
+        return {"snapshot_delta": delta}
+
+    def _snapshot_delta(self, checkin: CheckIn) -> Optional[dict]:
+        """Delta against the latest other check-in dated on or before this one, or None to store a full keyframe."""
+        if not checkin.snapshot:
+            return None
+        row = self.conn.execute(
+            "SELECT id, depth FROM checkins WHERE id != ? AND file_path != ? AND date <= ? "
+            "ORDER BY date DESC, rowid DESC LIMIT 1",
+            (checkin.id, checkin.file_path, checkin.date.isoformat())
+        ).fetchone()
+        if row is None:
+            return None
+        try:
+            previous = snapshots.resolve(row["id"], self._snapshot_document)
+        except snapshots.SnapshotChainError:
+            return None
+        return snapshots.encode(checkin.snapshot, previous, row["id"], row["depth"])
+
+    def _insert(self, checkin: CheckIn):
+        delta = self._snapshot_delta(checkin)
+        self.conn.execute(
+            "INSERT OR REPLACE INTO checkins (id, date, type, file_path, goals_covered, base_id, depth) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (checkin.id, checkin.date.isoformat(), _value(checkin.type), checkin.file_path,
+             json.dumps(checkin.goals_covered), delta["base"] if delta else None, delta["depth"] if delta else 0)
+        )
+        self._write_snapshot(checkin.id, checkin.snapshot or [], delta)
+
+    def _write_snapshot(self, checkin_id: str, snapshot: List[dict], delta: Optional[dict]):
+        self.conn.execute("DELETE FROM checkin_snapshots WHERE checkin_id = ?", (checkin_id,))
+        rows = []
+        for i, g in enumerate(snapshot):
+            goal_id = g.get("id", str(i))
+            if delta is None:
+                data = g
+            elif goal_id in delta["added"]:
+                data = {"added": delta["added"][goal_id]}
+            else:
+                data = {"changes": delta["changes"].get(goal_id, {})}
+            rows.append((
+                checkin_id,
+                goal_id,
+                i,
+                g.get("progress_percentage", 0),
+                g.get("status"),
+                g.get("category"),
+                json.dumps(data, ensure_ascii=False),
+            ))
+        self.conn.executemany(
+            "INSERT INTO checkin_snapshots (checkin_id, goal_id, position, progress_percentage, status, category, data) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            rows
+        )
+
+    def _rebase_dependents(self, checkin_ids: List[str]):
+        """Rewrites the check-ins stored as deltas on `checkin_ids` as keyframes (before those are replaced)."""
+        placeholders = ",".join("?" * len(checkin_ids))
+        dependents = self.conn.execute(
+            f"SELECT id FROM checkins WHERE base_id IN ({placeholders})", checkin_ids
+        ).fetchall()
+        resolved: Dict[str, List[dict]] = {}
+        keyframes = []
+        for row in dependents:
+            try:
+                keyframes.append((row["id"], snapshots.resolve(row["id"], self._snapshot_document, resolved)))
+            except snapshots.SnapshotChainError:
+                continue  # Already broken: keep the summary rows it has
+        for checkin_id, snapshot in keyframes:
+            self.conn.execute("UPDATE checkins SET base_id = NULL, depth = 0 WHERE id = ?", (checkin_id,))
+            self._write_snapshot(checkin_id, snapshot, None)
+
+    def save(self, checkin: CheckIn, content: str):
+        ensure_app_dir()
+        base_name = f"{checkin.date.strftime('%Y-%m-%d')}-{checkin.type.value}"
+
+        # Markdown stays on disk so check-ins remain human-readable
+        file_path_md = self.dir_path / f"{base_name}.md"
+        checkin.file_path = str(file_path_md)
+        if self._tx is not None:
+            self._tx.write(file_path_md, content)
+        else:
+            atomic_write(file_path_md, content)
+
+        old_version = self.history_version()
+        latest = self.conn.execute("SELECT MAX(date) FROM checkins").fetchone()[0]
+        existing = self.conn.execute("SELECT id, file_path FROM checkins WHERE id = ? OR file_path = ?",
+                                     (checkin.id, checkin.file_path)).fetchall()
+        replaced = bool(existing)
+        with self._transaction():
+            if replaced:
+                old_ids = [r["id"] for r in existing]
+                self._rebase_dependents(old_ids)
+                # Re-saving keeps the row id, so it stays stable for anything referring to it
+                checkin.id = next((r["id"] for r in existing if r["file_path"] == checkin.file_path), checkin.id)
+                self.conn.execute(f"DELETE FROM checkins WHERE id IN ({','.join('?' * len(old_ids))})", old_ids)
+            self._insert(checkin)
+
+        appended = not replaced and (latest is None or checkin.date.isoformat() >= latest)
+
+        def update_cache():
+            self.analytics_cache.on_append(old_version, self.history_version(), entry_from_checkin(checkin), appended)
+
+        if self._tx is not None:
+            self._tx.after_commit(update_cache)
+        else:
+            update_cache()
+
+        return file_path_md
+
+    def list_all(self) -> List[Path]:
+        rows = self.conn.execute("SELECT file_path FROM checkins ORDER BY date DESC").fetchall()
+        return [Path(r["file_path"]) for r in rows if r["file_path"] and Path(r["file_path"]).exists()]
+
+    def load_all_snapshots(self) -> List[CheckIn]:
+        """Loads all CheckIn objects ordered by date, with delta snapshots resolved."""
+        goals: Dict[str, list] = {}
+        for row in self.conn.execute(
+            "SELECT checkin_id, goal_id, progress_percentage, status, category, data FROM checkin_snapshots "
+            "ORDER BY checkin_id, position"
+        ):
+            goals.setdefault(row["checkin_id"], []).append(row)
+
+        rows = self.conn.execute("SELECT * FROM checkins ORDER BY date").fetchall()
+        documents = {r["id"]: self._document(r["base_id"], r["depth"], goals.get(r["id"], [])) for r in rows}
+        resolved: Dict[str, List[dict]] = {}
+
+        checkins = []
+        for row in rows:
+            if row["id"] not in goals:
+                snapshot = None
+            else:
+                try:
+                    snapshot = snapshots.resolve(row["id"], documents.get, resolved)
+                except snapshots.SnapshotChainError:
+                    snapshot = snapshots.summary(documents[row["id"]]["snapshot_delta"])
+            checkins.append(CheckIn(
+                id=row["id"],
+                date=row["date"],
+                type=row["type"],
+                goals_covered=json.loads(row["goals_covered"]),
+                file_path=row["file_path"],
+                snapshot=snapshot,
+            ))
+        return checkins
+
+    def snapshot_at(self, when: datetime) -> Optional[List[dict]]:
+        """Goals (as dicts) as recorded by the last check-in on or before `when`; None if there is none."""
+        row = self.conn.execute(
+            "SELECT id FROM checkins WHERE date <= ? ORDER BY date DESC LIMIT 1", (when.isoformat(),)
+        ).fetchone()
+        if row is None:
+            return None
+        try:
+            return snapshots.resolve(row["id"], self._snapshot_document)
+        except snapshots.SnapshotChainError:
+            return None
+
+    def load_history(self) -> List[HistoryEntry]:
+        """Compact check-in history straight from the indexed snapshot columns."""
+        goals: Dict[str, dict] = {}
+        for row in self.conn.execute(
+            "SELECT checkin_id, goal_id, progress_percentage, status, category FROM checkin_snapshots ORDER BY checkin_id, position"
+        ):
+            goals.setdefault(row["checkin_id"], {})[row["goal_id"]] = (
+                row["progress_percentage"], row["status"] or "active", row["category"] or "outros"
+            )
+        return [
+            HistoryEntry(id=r["id"], date=r["date"], type=r["type"], file_path=r["file_path"], goals=goals.get(r["id"], {}))
+            for r in self.conn.execute("SELECT id, date, type, file_path FROM checkins ORDER BY date")
+        ]
+
+    def goal_history(self, goal_id: str) -> List[dict]:
+        """Returns [{'date', 'progress', 'status'}] for one goal, ordered by check-in date."""
+        rows = self.conn.execute(
+            "SELECT c.date, s.progress_percentage, s.status FROM checkin_snapshots s "
+            "JOIN checkins c ON c.id = s.checkin_id WHERE s.goal_id = ? ORDER BY c.date",
+            (goal_id,)
+        ).fetchall()
+        return [{"date": datetime.fromisoformat(r["date"]), "progress": r["progress_percentage"], "status": r["status"] or "active"} for r in rows]
+
+def migrate_json_to_sqlite(
+    goals_file: Path = GOALS_FILE,
+    checkins_dir: Path = CHECKINS_DIR,
+    db_path: Path = DB_FILE,
+    force: bool = False,
+) -> Dict[str, int]:
+    """
+    One-shot migration of the JSON layout (goals.json + checkins/*.json) into SQLite.
+    The JSON files are left untouched. Refuses to run on a non-empty database unless forced.
+    The data is validated first and written to a temporary database that only replaces
+    db_path once complete, so a failure never leaves a (switched-to) empty database.
+    Raises ValueError if goals.json is invalid.
+    """
+    db_path = Path(db_path)
+    if db_path.exists() and not force:
+        conn = connect(db_path)
+        existing = conn.execute("SELECT (SELECT COUNT(*) FROM goals) + (SELECT COUNT(*) FROM checkins)").fetchone()[0]
+        if existing:
+            raise RuntimeError(f"O banco {db_path} já contém dados. Use --force para sobrescrever.")
+
+    try:
+        if goals_file.exists():
+            # GoalsRepository treats an unreadable goals.json as empty; here that would lose every goal
+            serialization.validate_goals(serialization.loads(goals_file.read_bytes()))
+        goals = GoalsRepository(file_path=goals_file).load()
+    except (json.JSONDecodeError, ValidationError) as e:
+        raise ValueError(f"Não foi possível ler {goals_file}: {e}. Corrija o arquivo (ou use horizonte restore) e tente novamente.")
+    checkins = CheckinRepository(dir_path=checkins_dir).load_all_snapshots()
+
+    tmp_path = db_path.with_name(f"{db_path.name}.tmp")
+    for stale in (tmp_path, Path(f"{tmp_path}-wal"), Path(f"{tmp_path}-shm")):
+        stale.unlink(missing_ok=True)
+    try:
+        conn = connect(tmp_path)
+        goals_repo = SqliteGoalsRepository(db_path=tmp_path)
+        checkin_repo = SqliteCheckinRepository(db_path=tmp_path, dir_path=checkins_dir)
+        with conn:
+            for i, g in enumerate(goals):
+                goals_repo._write_goal(g, i)
+            for c in checkins:
+                checkin_repo._insert(c)
+    finally:
+        close(tmp_path)
+
+    # Closing the connections checkpoints and removes their WAL files before the swap
+    close(db_path)
+    os.replace(tmp_path, db_path)
+    return {"goals": len(goals), "checkins": len(checkins)}
@@ -1,57 +1,71 @@
+import hashlib
 import json
 import os
-import shutil
 import tempfile
+from contextlib import contextmanager
 from pathlib import Path
-from typing import List, Optional
+from typing import Callable, Dict, List, Optional, Tuple
 from datetime import datetime
 
-from .models import Goal, Config, CheckIn
+from .models import Goal, Config, CheckIn, HistoryEntry
+from .history import HistoryIndex, entry_from_checkin
+from . import serialization, snapshots
+from .analytics_cache import AnalyticsCache
+from .views import GoalView
+from .config import APP_DIR
 
-APP_DIR = Path.home() / ".road-to-35"
 GOALS_FILE = APP_DIR / "goals.json"
 CONFIG_FILE = APP_DIR / "config.json"
 CHECKINS_DIR = APP_DIR / "checkins"
 
 BACKUPS_DIR = APP_DIR / "backups"
+JOURNAL_FILE = APP_DIR / "journal.json"
 
 def ensure_app_dir():
     APP_DIR.mkdir(parents=True, exist_ok=True)
     CHECKINS_DIR.mkdir(parents=True, exist_ok=True)
     BACKUPS_DIR.mkdir(parents=True, exist_ok=True)
 
-def cleanup_old_backups(original_file_name: str, keep: int = 20):
-    """Keep only the 'keep' most recent backups for a given file name."""
-    if not BACKUPS_DIR.exists():
-        return
-        
-    # Pattern: filename.YYYYMMDDHHMMSS.bak
-    glob_pattern = f"{original_file_name}.*.bak"
-    backups = sorted(BACKUPS_DIR.glob(glob_pattern), key=os.path.getmtime, reverse=True)
-    
-    for backup in backups[keep:]:
-        try:
-            backup.unlink()
-        except OSError:
-            pass
+# (content hash, stat signature) of the last version read or written per file
+_persisted: Dict[str, tuple] = {}
+
+def _content_hash(content: str) -> str:
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+def _file_signature(file_path: Path) -> Optional[tuple]:
+    try:
+        st = file_path.stat()
+    except FileNotFoundError:
+        return None
+    return (st.st_mtime_ns, st.st_size)
 
-def atomic_write(file_path: Path, content: str, make_backup: bool = True):
+def remember_content(file_path: Path, content: str):
+    """Records `content` as what is currently on disk at `file_path` (call after reading it)."""
+    _persisted[str(file_path)] = (_content_hash(content), _file_signature(file_path))
+
+def atomic_write(file_path: Path, content: str, make_backup: bool = True) -> bool:
     """
     Writes content to a file atomically.
-    Optionally creates a backup of the existing file in the backups directory.
+    Optionally records the new version in the backup store (see core.backups).
+    Returns False (without backup or rewrite) if the file already has this content.
     """
+    key = str(file_path)
+    digest = _content_hash(content)
+    signature = _file_signature(file_path)
+    if signature is not None and _persisted.get(key) == (digest, signature):
+        return False
+
     # Ensure correct directory exists
     file_path.parent.mkdir(parents=True, exist_ok=True)
     
-    if file_path.exists() and make_backup:
-        ensure_app_dir() # Ensure backup dir exists
-        timestamp = datetime.now().strftime("%Y%m%d%H%M%S")
-        backup_name = f"{file_path.name}.{timestamp}.bak"
-        backup_path = BACKUPS_DIR / backup_name
-        shutil.copy2(file_path, backup_path)
-        
-        # Cleanup old backups
-        cleanup_old_backups(file_path.name)
+    if make_backup:
+        from .backups import get_backup_store
+
+        previous = file_path.read_text() if signature is not None else None
+        if previous == content:
+            _persisted[key] = (digest, signature)
+            return False
+        get_backup_store().record(file_path, content, previous)
 
     # Write to a temporary file first (unchanged logic)
     fd, temp_path = tempfile.mkstemp(dir=file_path.parent, text=True)
@@ -63,38 +77,354 @@ def atomic_write(file_path: Path, content: str, make_backup: bool = True):
     except Exception as e:
         os.remove(temp_path)
         raise e
+    _persisted[key] = (digest, _file_signature(file_path))
+    return True
+
+def remove_file(file_path: Path, make_backup: bool = True):
+    """Deletes a data file, recording the deletion in the backup store (so restores see it)."""
+    if not file_path.exists():
+        return
+    if make_backup:
+        from .backups import get_backup_store
+
+        get_backup_store().record(file_path, None, file_path.read_text())
+    file_path.unlink(missing_ok=True)
+    _persisted.pop(str(file_path), None)
+
+def append_line(file_path: Path, line: str, make_backup: bool = True):
+    """Appends one line durably (fsync); the resulting file is recorded in the backup store."""
+    previous = file_path.read_text() if make_backup and file_path.exists() else None
+    with open(file_path, 'a') as f:
+        f.write(line + "\n")
+        f.flush()
+        os.fsync(f.fileno())
+    if make_backup:
+        from .backups import get_backup_store
+
+        get_backup_store().record(file_path, (previous or "") + line + "\n", previous)
+
+def _apply_writes(writes: Dict[str, Optional[str]], make_backup: bool = True, no_backup: frozenset = frozenset()):
+    """Writes/deletes the files of a transaction; their versions are recorded as one backup."""
+    from .backups import get_backup_store
+
+    with get_backup_store().batch():
+        for path_str, content in writes.items():
+            path = Path(path_str)
+            if content is None:
+                remove_file(path, make_backup=make_backup and path_str not in no_backup)
+            else:
+                atomic_write(path, content, make_backup=make_backup and path_str not in no_backup)
+
+class Transaction:
+    """
+    Collects file writes/deletes and commits them as one unit.
+    The full set of changes is written to a journal with a single fsync before any
+    target file is touched, so a crash mid-commit is completed by recover_journal().
+    """
+    def __init__(self, journal_path: Path = JOURNAL_FILE):
+        self.journal_path = journal_path
+        self.writes: Dict[str, Optional[str]] = {}
+        self.no_backup = set()
+        self.connections = []
+        self._after_commit: List[Callable[[], None]] = []
+
+    def write(self, file_path: Path, content: str, make_backup: bool = True):
+        self.writes[str(file_path)] = content
+        if not make_backup:
+            self.no_backup.add(str(file_path))
+
+    def delete(self, file_path: Path):
+        self.writes[str(file_path)] = None
+
+    def enlist(self, conn):
+        """Registers a database connection to be committed/rolled back with this transaction."""
+        if conn not in self.connections:
+            self.connections.append(conn)
+
+    def after_commit(self, callback: Callable[[], None]):
+        self._after_commit.append(callback)
+
+    def _write_journal(self):
+        self.journal_path.parent.mkdir(parents=True, exist_ok=True)
+        payload = json.dumps({"writes": self.writes}, ensure_ascii=False)
+        fd, temp_path = tempfile.mkstemp(dir=self.journal_path.parent, text=True)
+        try:
+            with os.fdopen(fd, 'w') as f:
+                f.write(payload)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temp_path, self.journal_path)
+        except Exception as e:
+            os.remove(temp_path)
+            raise e
+
+    def commit(self):
+        if self.writes:
+            self._write_journal()
+        for conn in self.connections:
+            conn.commit()
+        if self.writes:
+            _apply_writes(self.writes, no_backup=frozenset(self.no_backup))
+            self.journal_path.unlink(missing_ok=True)
+        for callback in self._after_commit:
+            callback()
+
+    def rollback(self):
+        for conn in self.connections:
+            conn.rollback()
+        self.writes.clear()
+        self.no_backup.clear()
+
+def recover_journal(journal_path: Path = JOURNAL_FILE) -> bool:
+    """Completes a transaction interrupted after its journal was written. Returns True if one was replayed."""
+    if not journal_path.exists():
+        return False
+    try:
+        with open(journal_path, 'r') as f:
+            writes = json.load(f).get("writes", {})
+    except (json.JSONDecodeError, AttributeError):
+        # The journal is only renamed into place once complete, so this is foreign/corrupt data
+        journal_path.unlink(missing_ok=True)
+        return False
+    _apply_writes(writes, make_backup=False)
+    journal_path.unlink(missing_ok=True)
+    return True
+
+@contextmanager
+def batch(*repos, journal_path: Path = JOURNAL_FILE):
+    """
+    Unit of work across repositories:
+
+        with batch(goals_repo, checkin_repo):
+            goals_repo.update(goal)
+            checkin_repo.save(checkin, content)
+
+    Mutations are staged in memory and committed together on exit, or discarded on error.
+    """
+    tx = Transaction(journal_path)
+    for repo in repos:
+        repo._begin_batch(tx)
+    try:
+        yield tx
+        for repo in repos:
+            repo._flush_batch(tx)
+        tx.commit()
+    except BaseException:
+        tx.rollback()
+        for repo in repos:
+            repo._discard_batch()
+        raise
+    finally:
+        for repo in repos:
+            repo._tx = None
 
 class GoalsRepository:
+    """
+    JSON goals store. goals.json is the compacted base; single-goal writes are appended
+    to goals.json.log and replayed on load, so update() does not rewrite the whole file.
+    The last persisted form of each goal is kept, so writes of unchanged goals are skipped.
+    """
+    # Number of log entries after which the log is folded back into goals.json
+    COMPACT_THRESHOLD = 50
+
     def __init__(self, file_path: Path = GOALS_FILE):
         self.file_path = file_path
+        self.log_path = file_path.with_name(f"{file_path.name}.log")
+        self._index: Optional[Dict[str, Goal]] = None
+        # Goal id -> the goal as last read from / written to disk (model_dump(mode='json'))
+        self._persisted: Dict[str, dict] = {}
+        self._signature = None
+        self._log_entries = 0
+        self._tx: Optional[Transaction] = None
+        self._batch_dirty = False
 
-    def load(self) -> List[Goal]:
-        if not self.file_path.exists():
-            return []
+    def _stat_signature(self) -> tuple:
+        sig = []
+        for p in (self.file_path, self.log_path):
+            try:
+                st = p.stat()
+                sig.append((st.st_mtime_ns, st.st_size))
+            except FileNotFoundError:
+                sig.append(None)
+        return tuple(sig)
+
+    def _ensure_index(self) -> Dict[str, Goal]:
+        """Returns the id-keyed goal index, rebuilding it only if the files changed on disk."""
+        sig = self._stat_signature()
+        if self._index is not None and sig == self._signature:
+            return self._index
+
+        index: Dict[str, Goal] = {}
+        persisted: Dict[str, dict] = {}
+        if self.file_path.exists():
+            try:
+                with open(self.file_path, 'r') as f:
+                    content = f.read()
+                with serialization.bulk():
+                    raw = serialization.loads(content)
+                    goals = serialization.validate_goals(raw)
+                for goal, g in zip(goals, raw):
+                    index[goal.id] = goal
+                    persisted[goal.id] = g
+                remember_content(self.file_path, content)
+            except json.JSONDecodeError:
+                index, persisted = {}, {}
+
+        records = self._read_log()
+        for record in records:
+            if record.get("op") == "put":
+                goal = Goal(**record["goal"])
+                index[goal.id] = goal
+                persisted[goal.id] = record["goal"]
+
+        self._index = index
+        self._persisted = persisted
+        self._signature = sig
+        self._log_entries = len(records)
+        return index
+
+    def _read_log(self) -> List[dict]:
+        records = []
+        if self.log_path.exists():
+            with open(self.log_path, 'r') as f:
+                for line in f:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    try:
+                        records.append(serialization.loads(line))
+                    except json.JSONDecodeError:
+                        # Torn trailing write from a crash; everything before it is valid
+                        break
+        return records
+
+    def load_views(self) -> List[GoalView]:
+        """
+        Read-only projection of the goals (see core.views). goals.json is only validated
+        if it does not match its checksum; log entries (few) are always validated.
+        """
+        if self._index is not None and self._stat_signature() == self._signature:
+            return [GoalView.from_goal(g) for g in self._index.values()]
+        content, trusted = serialization.read_verified(self.file_path)
+        if not trusted:
+            return [GoalView.from_goal(g) for g in self.load()]
         try:
-            with open(self.file_path, 'r') as f:
-                data = json.load(f)
-                return [Goal(**g) for g in data]
-        except json.JSONDecodeError:
-            return []
+            with serialization.bulk():
+                views = {v.id: v for v in map(GoalView.from_dict, serialization.loads(content))}
+        except (KeyError, ValueError, TypeError, AttributeError):
+            return [GoalView.from_goal(g) for g in self.load()]
+        for record in self._read_log():
+            if record.get("op") == "put":
+                goal = Goal(**record["goal"])
+                views[goal.id] = GoalView.from_goal(goal)
+        return list(views.values())
+
+    def _append_log(self, goal: Goal):
+        data = goal.model_dump(mode='json')
+        if self._persisted.get(goal.id) == data:
+            return  # Unchanged since the last write
+        if self._tx is not None:
+            # Inside a batch: the whole index is written once on commit
+            self._batch_dirty = True
+            return
+
+        if not self.file_path.exists():
+            # Keep goals.json as the source of truth for "is there any data?"
+            self.compact()
+            return
+
+        self._persisted[goal.id] = data
+        append_line(self.log_path, serialization.dumps({"op": "put", "goal": data}))
+
+        self._log_entries += 1
+        self._signature = self._stat_signature()
+        if self._log_entries >= self.COMPACT_THRESHOLD:
+            self.compact()
+
+    def compact(self):
+        """Folds the mutation log into goals.json (one backup, one rewrite) and truncates the log."""
+        self._write_base(list(self._ensure_index().values()))
+
+    def _write_base(self, goals: List[Goal], data: Optional[List[dict]] = None):
+        from .backups import get_backup_store
+
+        if data is None:
+            data = [g.model_dump(mode='json') for g in goals]
+        content = serialization.dumps_lines(data)
+        with get_backup_store().batch():
+            atomic_write(self.file_path, content)
+            atomic_write(serialization.checksum_path(self.file_path), serialization.checksum(content), make_backup=False)
+            remove_file(self.log_path)
+        self._index = {g.id: g for g in goals}
+        self._persisted = {g.id: d for g, d in zip(goals, data)}
+        self._log_entries = 0
+        self._signature = self._stat_signature()
+
+    def _begin_batch(self, tx: Transaction):
+        self._ensure_index()
+        self._tx = tx
+        self._batch_dirty = False
+
+    def _flush_batch(self, tx: Transaction):
+        if not self._batch_dirty:
+            return
+        data = [g.model_dump(mode='json') for g in self._index.values()]
+        content = serialization.dumps_lines(data)
+        tx.write(self.file_path, content)
+        tx.write(serialization.checksum_path(self.file_path), serialization.checksum(content), make_backup=False)
+        tx.delete(self.log_path)
+        tx.after_commit(lambda: self._after_batch_commit(data))
+
+    def _after_batch_commit(self, data: List[dict]):
+        self._persisted = {d["id"]: d for d in data}
+        self._log_entries = 0
+        self._batch_dirty = False
+        self._signature = self._stat_signature()
+
+    def _discard_batch(self):
+        self._index = None
+        self._batch_dirty = False
+
+    def load(self) -> List[Goal]:
+        return list(self._ensure_index().values())
+
+    def get(self, goal_id: str) -> Optional[Goal]:
+        return self._ensure_index().get(goal_id)
+
+    def find(self, status: Optional[str] = None, category: Optional[str] = None) -> List[Goal]:
+        goals = self.load()
+        if status is not None:
+            goals = [g for g in goals if g.status == status]
+        if category is not None:
+            goals = [g for g in goals if g.category == category]
+        return goals
 
     def save(self, goals: List[Goal]):
         data = [g.model_dump(mode='json') for g in goals]
-        content = json.dumps(data, indent=2, ensure_ascii=False)
-        atomic_write(self.file_path, content)
+        index = self._ensure_index()
+        # Same goals in the same order, none of them changed: nothing to write
+        unchanged = list(index) == [g.id for g in goals] and all(
+            self._persisted.get(g.id) == d for g, d in zip(goals, data)
+        )
+        if self._tx is not None:
+            self._index = {g.id: g for g in goals}
+            self._batch_dirty = self._batch_dirty or not unchanged
+            return
+        if unchanged:
+            self._index = {g.id: g for g in goals}
+            return
+        self._write_base(goals, data)
 
     def add(self, goal: Goal):
-        goals = self.load()
-        goals.append(goal)
-        self.save(goals)
+        self._ensure_index()[goal.id] = goal
+        self._append_log(goal)
 
     def update(self, goal: Goal):
-        goals = self.load()
-        for i, g in enumerate(goals):
-            if g.id == goal.id:
-                goals[i] = goal
-                break
-        self.save(goals)
+        index = self._ensure_index()
+        if goal.id not in index:
+            return
+        index[goal.id] = goal
+        self._append_log(goal)
 
 class ConfigRepository:
     def __init__(self, file_path: Path = CONFIG_FILE):
@@ -105,10 +435,12 @@ class ConfigRepository:
             return Config()
         try:
             with open(self.file_path, 'r') as f:
-                data = json.load(f)
-                return Config(**data)
+                content = f.read()
+            config = Config(**json.loads(content))
         except json.JSONDecodeError:
             return Config()
+        remember_content(self.file_path, content)
+        return config
 
     def save(self, config: Config):
         data = config.model_dump(mode='json')
@@ -118,27 +450,150 @@ class ConfigRepository:
 class CheckinRepository:
     def __init__(self, dir_path: Path = CHECKINS_DIR):
         self.dir_path = dir_path
+        self.index = HistoryIndex(dir_path.with_name(f"{dir_path.name}_index.json"), dir_path)
+        self.analytics_cache = AnalyticsCache(dir_path.with_name(f"{dir_path.name}_analytics.json"))
+        self._tx: Optional[Transaction] = None
+        # Parsed check-in documents and the last saved snapshot, valid while the file's stat is unchanged
+        self._documents: Dict[str, Tuple[Optional[tuple], dict]] = {}
+        self._last_saved: Optional[Tuple[str, Optional[tuple], List[dict]]] = None
+
+    def _begin_batch(self, tx: Transaction):
+        self._tx = tx
+
+    def _flush_batch(self, tx: Transaction):
+        pass
+
+    def _discard_batch(self):
+        pass
+
+    def _write(self, file_path: Path, content: str) -> bool:
+        if self._tx is not None:
+            self._tx.write(file_path, content)
+            return True
+        return atomic_write(file_path, content)
 
     def save(self, checkin: CheckIn, content: str):
         ensure_app_dir()
+        # Delta bases and dependents are looked up in the index (rebuilt here if stale)
+        chains = self._snapshot_chains()
+        index_fresh = self.index.is_fresh()
+        old_version = self.history_version()
         base_name = f"{checkin.date.strftime('%Y-%m-%d')}-{checkin.type.value}"
         
         # 1. Save Markdown
         filename_md = f"{base_name}.md"
         file_path_md = self.dir_path / filename_md
         checkin.file_path = str(file_path_md)
-        atomic_write(file_path_md, content)
+        changed = self._write(file_path_md, content)
         
         # 2. Save JSON Data (Snapshot)
         filename_json = f"{base_name}.json"
         file_path_json = self.dir_path / filename_json
         
         data = checkin.model_dump(mode='json')
-        json_content = json.dumps(data, indent=2, ensure_ascii=False)
-        atomic_write(file_path_json, json_content)
+        # Check-ins that are deltas on the file being replaced must not follow its new content
+        self._rebase_dependents(base_name, chains)
+        delta = self._snapshot_delta(checkin, base_name, chains)
+        checkin.snapshot_delta = delta
+        if delta is not None:
+            data["snapshot"], data["snapshot_delta"] = None, delta
+        changed = self._write(file_path_json, serialization.dumps(data)) or changed
+        if not changed:
+            return file_path_md  # Same check-in saved again: history is already up to date
+
+        def remember_snapshot():
+            # The next save of this process can use it as its delta base without resolving the chain
+            if checkin.snapshot:
+                self._last_saved = (base_name, _file_signature(file_path_json), checkin.snapshot)
+        
+        # 3. Keep the history index and analytics cache in sync (after the files hit the disk)
+        def update_indexes():
+            appended = self.index.append(checkin, self.load_all_snapshots, index_fresh)
+            self.analytics_cache.on_append(old_version, self.history_version(), entry_from_checkin(checkin), appended)
+
+        if self._tx is not None:
+            self._tx.after_commit(remember_snapshot)
+            self._tx.after_commit(update_indexes)
+        else:
+            remember_snapshot()
+            update_indexes()
         
         return file_path_md
 
+    def _read_json(self, name: str) -> Optional[dict]:
+        """A check-in document (not to be modified: parsed documents are reused while the file is unchanged)."""
+        file_path = self.dir_path / f"{name}.json"
+        signature = _file_signature(file_path)
+        cached = self._documents.get(name)
+        if signature is not None and cached is not None and cached[0] == signature:
+            return cached[1]
+        try:
+            with open(file_path, 'rb') as f:
+                data = serialization.loads(f.read())
+        except (OSError, json.JSONDecodeError):
+            return None
+        self._documents[name] = (signature, data)
+        return data
+
+    def _snapshot_chains(self) -> Dict[str, Optional[str]]:
+        """Check-in file stem -> the stem its snapshot is a delta on (None for keyframes), from the history index."""
+        return self.index.snapshot_bases(self.load_all_snapshots)
+
+    @staticmethod
+    def _depends_on(chains: Dict[str, Optional[str]], name: str, target: str) -> bool:
+        """Whether the snapshot chain of `name` goes through `target`."""
+        seen = set()
+        while name and name not in seen:
+            if name == target:
+                return True
+            seen.add(name)
+            name = chains.get(name)
+        return False
+
+    def _rebase_dependents(self, base_name: str, chains: Dict[str, Optional[str]]):
+        """Rewrites the check-ins stored as deltas on `base_name` as keyframes (before it is replaced)."""
+        if not (self.dir_path / f"{base_name}.json").exists():
+            return
+        resolved: Dict[str, List[dict]] = {}
+        for name in [n for n, base in chains.items() if base == base_name]:
+            data = self._read_json(name)
+            delta = (data or {}).get("snapshot_delta")
+            if not delta or delta.get("base") != base_name:
+                continue
+            try:
+                snapshot = snapshots.resolve(name, self._read_json, resolved)
+            except snapshots.SnapshotChainError:
+                continue  # Already broken: keep the summary rows it has
+            self._write(self.dir_path / f"{name}.json",
+                        serialization.dumps({**data, "snapshot": snapshot, "snapshot_delta": None}))
+            chains[name] = None
+
+    def _snapshot_delta(self, checkin: CheckIn, base_name: str, chains: Dict[str, Optional[str]]) -> Optional[dict]:
+        """
+        Delta against the latest other check-in dated on or before this one, or None to
+        store a full keyframe. Check-ins whose chain goes through `base_name` are skipped.
+        """
+        if not checkin.snapshot:
+            return None
+        day = base_name[:10]
+        names = sorted((n for n in chains if n != base_name and n[:10] <= day), reverse=True)
+        base = next((n for n in names if not self._depends_on(chains, n, base_name)), None)
+        if base is None:
+            return None
+        data = self._read_json(base)
+        if data is None:
+            return None
+        last = self._last_saved
+        if last is not None and last[0] == base and last[1] == _file_signature(self.dir_path / f"{base}.json"):
+            previous = last[2]
+        else:
+            try:
+                previous = snapshots.resolve(base, self._read_json)
+            except snapshots.SnapshotChainError:
+                return None
+        depth = (data.get("snapshot_delta") or {}).get("depth", 0)
+        return snapshots.encode(checkin.snapshot, previous, base, depth)
+
     def list_all(self) -> List[Path]:
         if not self.dir_path.exists():
             return []
@@ -146,17 +601,92 @@ class CheckinRepository:
         return sorted(self.dir_path.glob("*.md"), reverse=True)
 
     def load_all_snapshots(self) -> List[CheckIn]:
-        """Loads all CheckIn objects from JSON files."""
+        """Loads all CheckIn objects from JSON files, with delta snapshots resolved."""
         if not self.dir_path.exists():
             return []
         
         json_files = sorted(self.dir_path.glob("*.json"), key=os.path.getmtime)
-        checkins = []
+        documents: Dict[str, dict] = {}
         for jf in json_files:
             try:
-                with open(jf, 'r') as f:
-                    data = json.load(f)
-                    checkins.append(CheckIn(**data))
+                with open(jf, 'rb') as f:
+                    documents[jf.stem] = serialization.loads(f.read())
             except Exception:
                 continue
+
+        resolved: Dict[str, List[dict]] = {}
+        checkins = []
+        with serialization.bulk():
+            for name, data in documents.items():
+                try:
+                    delta = data.get("snapshot_delta")
+                    if delta:
+                        try:
+                            data = {**data, "snapshot": snapshots.resolve(name, documents.get, resolved)}
+                        except snapshots.SnapshotChainError:
+                            # Base missing: progress/status/category are still in the delta rows
+                            data = {**data, "snapshot": snapshots.summary(delta)}
+                    checkins.append(serialization.validate_checkin(data))
+                except Exception:
+                    continue
         return checkins
+
+    def snapshot_at(self, when: datetime) -> Optional[List[dict]]:
+        """
+        Goals (as dicts) as recorded by the last check-in on or before `when`; None if
+        there is none or its snapshot chain is broken. Reads only the files of that chain.
+        """
+        entries = [e for e in self.load_history() if e.date <= when]
+        if not entries:
+            return None
+        try:
+            return snapshots.resolve(Path(entries[-1].file_path).stem, self._read_json)
+        except snapshots.SnapshotChainError:
+            return None
+
+    def load_history(self) -> List[HistoryEntry]:
+        """Loads the compact check-in history from the persistent index."""
+        return self.index.load(self.load_all_snapshots)
+
+    def history_version(self) -> Optional[str]:
+        return self.index.version_key()
+
+    def goal_history(self, goal_id: str) -> List[dict]:
+        """Returns [{'date', 'progress', 'status'}] for one goal, ordered by check-in date."""
+        return self.index.goal_timeseries(goal_id, self.load_all_snapshots)
+
+def storage_engine(config_path: Path = CONFIG_FILE) -> str:
+    """
+    Returns the active storage engine: 'sqlite' or 'json'.
+    HORIZONTE_STORAGE overrides; otherwise the engine recorded in config.json by
+    `horizonte migrate` (JSON if none was recorded).
+    """
+    engine = os.getenv("HORIZONTE_STORAGE", "").strip().lower()
+    if engine in ("json", "sqlite"):
+        return engine
+    config = ConfigRepository(config_path).load()
+    if config.storage is None and (config_path.parent / "horizonte.db").exists():
+        # Migrated before the engine was recorded: record it now
+        return record_storage_engine("sqlite", config_path)
+    return "sqlite" if config.storage == "sqlite" else "json"
+
+def record_storage_engine(engine: str, config_path: Path = CONFIG_FILE) -> str:
+    """Records the engine the data was migrated to in config.json."""
+    repo = ConfigRepository(config_path)
+    config = repo.load()
+    config.storage = engine
+    config_path.parent.mkdir(parents=True, exist_ok=True)
+    repo.save(config)
+    return engine
+
+def get_goals_repository():
+    if storage_engine() == "sqlite":
+        from .sqlite_storage import SqliteGoalsRepository
+        return SqliteGoalsRepository()
+    return GoalsRepository()
+
+def get_checkin_repository():
+    if storage_engine() == "sqlite":
+        from .sqlite_storage import SqliteCheckinRepository
+        return SqliteCheckinRepository()
+    return CheckinRepository()
@@ -0,0 +1,197 @@
+"""
+Structured (JSON) answers from the AI.
+
+Requests that expect JSON send a `response_format` built from a pydantic schema.
+Models that reject it are remembered and asked again without it. Answers are read
+with a tolerant parser: code fences and surrounding prose are ignored, and a
+truncated or malformed document is cut back to its last complete value (e.g. the
+complete items of an array), so a bad answer rarely costs another round-trip.
+"""
+import json
+import os
+from typing import Any, Awaitable, Callable, List, Optional, Set, Tuple, Type
+
+from pydantic import BaseModel, Field, ValidationError
+
+from .models import SmartCriteria
+
+_CLOSERS = {"{": "}", "[": "]"}
+
+# Models that answered 400 to a response_format (per process)
+_json_mode_unsupported: Set[str] = set()
+
+class CheckinUpdate(BaseModel):
+    """One raw check-in update as extracted by the model (see ai.apply_checkin_math)."""
+    goal_id: str
+    target_value: Optional[float] = None
+    current_value: Optional[float] = None
+    delta_value: Optional[float] = None
+    explicit_percent: Optional[float] = None
+    comment: str = ""
+    reasoning: str = ""
+
+class CheckinUpdates(BaseModel):
+    # response_format needs an object at the top level
+    updates: List[CheckinUpdate] = Field(default_factory=list)
+
+def json_mode_enabled() -> bool:
+    return os.getenv("HORIZONTE_AI_JSON_MODE", "1") != "0"
+
+def response_format(schema: Type[BaseModel], model: str) -> Optional[dict]:
+    """JSON-schema response_format for a request, or None if disabled/unsupported for the model."""
+    if not json_mode_enabled() or model in _json_mode_unsupported:
+        return None
+    return {
+        "type": "json_schema",
+        "json_schema": {"name": schema.__name__, "schema": schema.model_json_schema()},
+    }
+
+def mark_unsupported(model: str):
+    _json_mode_unsupported.add(model)
+
+def request_kwargs(schema: Optional[Type[BaseModel]], model: str) -> dict:
+    """Extra arguments for chat.completions.create: the response_format, when there is one to send."""
+    fmt = response_format(schema, model) if schema else None
+    return {"response_format": fmt} if fmt else {}
+
+def _format_rejected(error: Exception, kwargs: dict, model: str) -> bool:
+    """True (and the model is remembered) if a request failed only because of its response_format."""
+    # 400 Bad Request: this provider/model does not accept response_format
+    if "response_format" not in kwargs or getattr(error, "status_code", None) != 400:
+        return False
+    mark_unsupported(model)
+    return True
+
+def create_with_fallback(create: Callable[..., Any], schema: Optional[Type[BaseModel]], model: str) -> Any:
+    """Calls create(**kwargs) in JSON mode when possible; a model that rejects it is asked again without it."""
+    kwargs = request_kwargs(schema, model)
+    try:
+        return create(**kwargs)
+    except Exception as e:
+        if not _format_rejected(e, kwargs, model):
+            raise
+        return create()
+
+async def acreate_with_fallback(create: Callable[..., Awaitable[Any]], schema: Optional[Type[BaseModel]], model: str) -> Any:
+    """create_with_fallback() for coroutine functions."""
+    kwargs = request_kwargs(schema, model)
+    try:
+        return await create(**kwargs)
+    except Exception as e:
+        if not _format_rejected(e, kwargs, model):
+            raise
+        return await create()
+
+class PartialJSONParser:
+    """
+    Incremental JSON reader for (possibly streamed) model output. feed() text as it
+    arrives; value() returns the whole document once it is complete, otherwise the
+    longest prefix that can be closed into valid JSON.
+    """
+    def __init__(self):
+        self.text = ""
+        self._start: Optional[int] = None
+        self._pos = 0
+        self._stack: List[str] = []
+        self._in_string = False
+        self._escape = False
+        self._end: Optional[int] = None
+        # (end offset, closers) of the places where the prefix can be closed, latest last
+        self._checkpoints: List[Tuple[int, str]] = []
+
+    @property
+    def complete(self) -> bool:
+        return self._end is not None
+
+    def feed(self, chunk: str):
+        self.text += chunk
+        text = self.text
+        while self._pos < len(text) and self._end is None:
+            ch = text[self._pos]
+            if self._start is None:
+                if ch in _CLOSERS:
+                    self._start = self._pos
+                    self._stack.append(_CLOSERS[ch])
+            elif self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+            elif ch == '"':
+                self._in_string = True
+            elif ch in _CLOSERS:
+                self._stack.append(_CLOSERS[ch])
+            elif ch in "}]" and self._stack:
+                self._stack.pop()
+                if not self._stack:
+                    self._end = self._pos + 1
+                else:
+                    self._checkpoints.append((self._pos + 1, "".join(reversed(self._stack))))
+            elif ch == ",":
+                # Everything before a separator is a complete value
+                self._checkpoints.append((self._pos, "".join(reversed(self._stack))))
+            self._pos += 1
+
+    def value(self, whole_items: bool = False) -> Any:
+        """
+        The parsed document (or recovered prefix); raises ValueError if nothing is usable.
+        With whole_items, a prefix is only cut between array items, never inside an object.
+        """
+        if self._start is None:
+            raise ValueError("Nenhum JSON encontrado na resposta")
+        if self._end is not None:
+            try:
+                return json.loads(self.text[self._start:self._end])
+            except json.JSONDecodeError:
+                pass
+        for end, closers in reversed(self._checkpoints):
+            if whole_items and not closers.startswith("]"):
+                continue
+            try:
+                return json.loads(self.text[self._start:end] + closers)
+            except json.JSONDecodeError:
+                continue
+        raise ValueError("JSON inválido na resposta")
+
+    def items(self) -> list:
+        """Complete items of the top-level array (or of the first list inside an object)."""
+        try:
+            data = self.value(whole_items=True)
+        except ValueError:
+            return []
+        if isinstance(data, dict):
+            data = next((v for v in data.values() if isinstance(v, list)), [])
+        return data if isinstance(data, list) else []
+
+def loads(content: str, whole_items: bool = False) -> Any:
+    """Tolerant json.loads for model answers (see PartialJSONParser.value)."""
+    try:
+        return json.loads(content)
+    except (json.JSONDecodeError, TypeError):
+        pass
+    parser = PartialJSONParser()
+    parser.feed(content or "")
+    return parser.value(whole_items)
+
+def parse_smart_criteria(content: str) -> SmartCriteria:
+    data = loads(content)
+    if not isinstance(data, dict):
+        raise ValueError("Resposta da IA não é um objeto JSON")
+    return SmartCriteria(**{name: str(data.get(name) or "") for name in SmartCriteria.model_fields})
+
+def parse_checkin_updates(content: str) -> List[dict]:
+    """Raw updates from a JSON array or a {"updates": [...]} object; invalid items are skipped."""
+    data = loads(content, whole_items=True)
+    if isinstance(data, dict):
+        data = data.get("updates", [])
+    if not isinstance(data, list):
+        return []
+    updates = []
+    for item in data:
+        try:
+            updates.append(CheckinUpdate.model_validate(item).model_dump())
+        except ValidationError:
+            continue
+    return updates
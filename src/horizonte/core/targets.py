@@ -0,0 +1,128 @@
+"""
+Numeric targets and quantities in free text ("Juntar 100k", "Correr 1000km", "li 3 livros").
+
+All patterns are compiled once at import. Goal targets are inferred when a goal is
+created or adjusted (see apply_inferred_target) so check-ins only do a lookup per goal.
+"""
+import re
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
+
+# Number + optional magnitude suffix, as used for the LLM hints: 227k, 227.5k, 1.5m, 1000, 1,000.00
+_VALUE_PATTERN = re.compile(r'([\d\.,]+)\s*(k|m|mi|bi|t)?')
+# Number, then either a magnitude suffix (5k, 1.5mi, 10 mil) or a unit word (40km, 12 livros, 30%)
+_QUANTITY_PATTERN = re.compile(r"(?<![\w])(\d[\d\.,]*)\s*(?:(k|mil|mi|m|bi)(?![a-zà-ú])|(%|[a-zà-ú]+))?")
+
+UNIT_ALIASES = {
+    "km": "km", "quilometros": "km", "kms": "km",
+    "kg": "kg", "quilos": "kg", "kilos": "kg",
+    "livro": "livros", "livros": "livros",
+    "reais": "brl", "r": "brl",
+    "horas": "h", "hora": "h", "h": "h",
+}
+# Magnitude suffixes imply a money-like amount
+_MAGNITUDE = {"k", "mil", "mi", "m", "bi"}
+
+def extract_value(text: str) -> Optional[float]:
+    """
+    Extracts a financial/numeric value from text using Python regex.
+    Handles 'k', 'm', 'mi', 'bi' suffixes and pt-BR formatting.
+    """
+    if not text:
+        return None
+
+    clean_text = text.lower().replace("r$", "").replace("us$", "").strip()
+
+    match = _VALUE_PATTERN.search(clean_text)
+    if not match:
+        return None
+
+    num_str = match.group(1)
+    suffix = match.group(2)
+
+    # Normalize number string (handling pt-BR dots/commas)
+    if '.' in num_str and ',' in num_str:
+        num_str = num_str.replace('.', '').replace(',', '.')
+    elif ',' in num_str:
+        # If only comma, assume decimal
+        num_str = num_str.replace(',', '.')
+
+    try:
+        val = float(num_str)
+    except ValueError:
+        return None
+
+    if suffix:
+        if suffix == 'k':
+            val *= 1000
+        elif suffix in ['m', 'mi']:
+            val *= 1_000_000
+        elif suffix == 'bi':
+            val *= 1_000_000_000
+
+    return val
+
+@dataclass
+class Quantity:
+    value: float
+    unit: Optional[str] = None
+    percent: bool = False
+
+def _unit(word: Optional[str]) -> Optional[str]:
+    if not word:
+        return None
+    return UNIT_ALIASES.get(word.lower())
+
+def quantities(text: str) -> List[Quantity]:
+    """All quantities in a text, with their unit when it can be told apart."""
+    found = []
+    for number, magnitude, trailing in _QUANTITY_PATTERN.findall((text or "").lower()):
+        if trailing == "%":
+            try:
+                found.append(Quantity(float(number.replace(",", ".")), percent=True))
+            except ValueError:
+                pass
+            continue
+        suffix = {"mil": "k"}.get(magnitude, magnitude) if magnitude else ""
+        value = extract_value(number + suffix)
+        if value is None:
+            continue
+        unit = _unit(trailing) or ("brl" if magnitude in _MAGNITUDE else None)
+        if unit is None and value.is_integer() and 1900 <= value <= 2100:
+            continue  # a year ("maratona em 2026"), not a quantity
+        found.append(Quantity(value, unit=unit))
+    return found
+
+def infer_target(title: str, description: str = "", measurable: str = "") -> Tuple[Optional[float], Optional[str]]:
+    """
+    (target value, unit) of a goal: first quantity in the title, else in the description.
+    The unit may also come from the SMART 'measurable' text.
+    """
+    target = None
+    for text in (title, description):
+        amounts = [q for q in quantities(text) if not q.percent]
+        if amounts:
+            target = amounts[0]
+            break
+
+    unit = target.unit if target else None
+    if unit is None:
+        unit = next((q.unit for q in quantities(measurable) if q.unit), None)
+    return (target.value if target else None), unit
+
+def goal_target(goal) -> Tuple[Optional[float], Optional[str]]:
+    """(target value, unit) of a goal; goals saved before targets existed are inferred on the fly."""
+    if goal.target_value is not None:
+        return goal.target_value, goal.unit
+    return infer_target(goal.title, goal.description, goal.smart_criteria.measurable)
+
+def apply_inferred_target(goal, previous: Optional[Tuple[str, str, str]] = None):
+    """
+    Infers the target of a new or adjusted goal from its text.
+    `previous` is (title, description, measurable) before the edit: a target that does not
+    match what that text implied was set by the user and is kept.
+    """
+    if goal.target_value is not None:
+        if previous is None or (goal.target_value, goal.unit) != infer_target(*previous):
+            return
+    goal.target_value, goal.unit = infer_target(goal.title, goal.description, goal.smart_criteria.measurable)
@@ -0,0 +1,49 @@
+"""
+Read-only projections for listings and dashboards.
+
+Commands like `list` and `progress` only need a few fields of each goal, so the
+repositories' load_views() returns GoalView tuples built straight from the stored
+dicts instead of full Goal models (no SmartCriteria/Milestone validation, no target
+inference). That fast path is only taken for data the app wrote itself: the file must
+match its checksum (see serialization.read_verified); otherwise the goals go through
+the normal validated load and are projected afterwards.
+"""
+from datetime import datetime
+from typing import NamedTuple
+
+from .models import CheckInType, Goal, GoalCategory, GoalStatus, HistoryEntry, Horizon
+
+class GoalView(NamedTuple):
+    id: str
+    title: str
+    category: GoalCategory
+    horizon: Horizon
+    status: GoalStatus
+    progress_percentage: int
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "GoalView":
+        """From a stored goal dict (model_dump(mode='json')); KeyError/ValueError if it is not one."""
+        return cls(
+            data["id"],
+            data["title"],
+            GoalCategory(data.get("category", GoalCategory.LIFE)),
+            Horizon(data["horizon"]),
+            GoalStatus(data.get("status", GoalStatus.ACTIVE)),
+            data.get("progress_percentage", 0),
+        )
+
+    @classmethod
+    def from_goal(cls, goal: Goal) -> "GoalView":
+        return cls(goal.id, goal.title, goal.category, goal.horizon, goal.status, goal.progress_percentage)
+
+def history_entry(data: dict) -> HistoryEntry:
+    """HistoryEntry from a trusted index record, without validation."""
+    return HistoryEntry.model_construct(
+        id=data["id"],
+        date=datetime.fromisoformat(data["date"]),
+        type=CheckInType(data["type"]),
+        file_path=data["file_path"],
+        goals={goal_id: tuple(row) for goal_id, row in data.get("goals", {}).items()},
+        snapshot_base=data.get("snapshot_base"),
+    )
@@ -3,20 +3,18 @@ from rich import print
 from rich.console import Console
 from rich.prompt import Prompt, Confirm
 from rich.panel import Panel
-from rich.markdown import Markdown
 from datetime import datetime, timedelta
 from pathlib import Path
+from typing import Optional
 import calendar
-from rich.table import Table
 from rich import box
-from rich.text import Text
-from rich.layout import Layout
 
 from horizonte.locales.pt_br import Strings
 from horizonte.core.models import Goal, Horizon, SmartCriteria, Config, GoalCategory, GoalStatus, Milestone
-from horizonte.core.storage import GoalsRepository, ConfigRepository, CheckinRepository
-from horizonte.core.ai import suggest_smart_criteria, suggest_category, refine_smart_field, suggest_milestones
+from horizonte.core.storage import ConfigRepository, get_goals_repository, get_checkin_repository, storage_engine, batch, recover_journal, GOALS_FILE
 
+# Heavy modules (horizonte.core.ai -> openai/httpx, rich Table/Markdown) are imported
+# inside the commands that need them so that startup stays fast.
 app = typer.Typer(help=Strings.APP_TITLE)
 
 console = Console()
@@ -30,11 +28,8 @@ CATEGORY_COLORS = {
 }
 
 def check_due_checkins():
-    config_repo = ConfigRepository()
-    config = config_repo.load()
-    
     # Check if we have checkins
-    repo = CheckinRepository()
+    repo = get_checkin_repository()
     files = repo.list_all()
     
     now = datetime.now()
@@ -98,13 +93,27 @@ def try_system_notification(title: str, message: str):
 
 
 @app.callback(invoke_without_command=True)
-def main(ctx: typer.Context):
+def main(
+    ctx: typer.Context,
+    no_cache: bool = typer.Option(False, "--no-cache", help="Ignorar o cache de respostas da IA"),
+):
     """
     Road to 35: Acompanhe suas resoluções pessoais.
     """
+    # Before anything reads the environment (storage engine, serializer, backups, AI settings)
+    from dotenv import load_dotenv
+    load_dotenv()
+    
+    if no_cache:
+        from horizonte.core import ai_cache
+        ai_cache.set_enabled(False)
+    
+    # Finish any check-in commit interrupted by a crash before touching the data
+    recover_journal()
+    
     if ctx.invoked_subcommand is None:
         # Verify if init is needed
-        if not (Path.home() / ".road-to-35" / "goals.json").exists():
+        if storage_engine() == "json" and not GOALS_FILE.exists():
              console.print(f"[yellow]{Strings.ERR_NO_GOALS}[/yellow]")
         else:
             check_due_checkins()
@@ -130,7 +139,7 @@ def main(ctx: typer.Context):
                 elif choice == "2":
                     list_goals()
                 elif choice == "3":
-                    add()
+                    add(from_file=None, yes=False)
                 elif choice == "4":
                     try:
                         show()
@@ -158,6 +167,8 @@ def main(ctx: typer.Context):
         pass
 
 def edit_smart_criteria_interactive(current_smart: SmartCriteria, context: dict) -> SmartCriteria:
+    from horizonte.core.ai import refine_smart_field
+    
     field_map = {
          "1": ("Specific", "specific"),
          "2": ("Measurable", "measurable"),
@@ -194,7 +205,8 @@ def edit_smart_criteria_interactive(current_smart: SmartCriteria, context: dict)
                  if len(parts) > 1:
                      instruction = parts[1]
              
-             refined = refine_smart_field(label, current_val, context, user_instruction=instruction)
+             # Asking again is an explicit regenerate: don't hand back the cached suggestion
+             refined = refine_smart_field(label, current_val, context, user_instruction=instruction, refresh=True)
              if refined:
                  console.print(Panel(f"[bold]Sugestão IA:[/bold]\n\n{refined}", style="green"))
                  if Confirm.ask("Usar este texto?"):
@@ -221,32 +233,22 @@ def get_smart_criteria_interactive() -> SmartCriteria:
     )
 
 def create_goal_interactive(horizon: Horizon = None) -> Goal:
+    from horizonte.core import ai_async
+    from horizonte.core.targets import apply_inferred_target
+    
     # 1. Ask Title and Description First to enable AI context
     title = Prompt.ask(Strings.PROMPT_GOAL_TITLE)
     description = Prompt.ask(Strings.PROMPT_GOAL_DESC)
     
-    # 2. Category Selection (AI Assisted)
-    category_val = None
-    avail_cats = [c.value for c in GoalCategory]
-    
-    # Try AI Suggestion
-    suggested_cat = suggest_category(title, description, avail_cats)
-    
-    if suggested_cat and suggested_cat in avail_cats:
-        console.print(f"[dim]Categoria sugerida pela IA: {suggested_cat}[/dim]")
-        if Confirm.ask(f"Confirmar categoria '{suggested_cat}'?", default=True):
-             category_val = suggested_cat
+    # Category: local classifier first; only low-confidence cases go to the LLM,
+    # in the background while the remaining questions are asked
+    from horizonte.core.classifier import local_category
     
-    if not category_val:
-        console.print("[bold]Selecione a Categoria:[/bold]")
-        cat_menu = {str(i+1): c for i, c in enumerate(avail_cats)}
-        for k, v in cat_menu.items():
-            console.print(f"  [{k}] {v}")
-            
-        cat_choice = Prompt.ask("Opção", choices=list(cat_menu.keys()), default="1")
-        category_val = cat_menu[cat_choice]
-        
-    category = GoalCategory(category_val)
+    avail_cats = [c.value for c in GoalCategory]
+    local_cat = local_category(title, description, get_goals_repository().load())
+    category_future = None
+    if not local_cat:
+        category_future = ai_async.run_in_background(ai_async.suggest_category(title, description, avail_cats))
 
     if not horizon:
         # Prompt for horizon
@@ -269,12 +271,46 @@ def create_goal_interactive(horizon: Horizon = None) -> Goal:
         h_choice = Prompt.ask(Strings.PROMPT_SELECT_HORIZON, choices=list(horizon_menu.keys()), default="1")
         horizon = horizon_menu[h_choice]
 
-    
-    smart = None
     use_ai = Confirm.ask("Gostaria que a IA (OpenRouter) sugerisse os critérios SMART?", default=False)
-    
+    smart_future = None
     if use_ai:
-        smart_suggestion = suggest_smart_criteria(title, description, category.value, horizon.value)
+        # Independent of the category, so both requests are in flight at the same time
+        smart_future = ai_async.run_in_background(
+            ai_async.suggest_smart_criteria(title, description, None, horizon.value)
+        )
+
+    # 2. Category Selection (AI Assisted)
+    category_val = None
+    suggested_cat = local_cat
+    if category_future:
+        suggested_cat = ai_async.wait(
+            category_future, "[bold green]Sugerindo categoria...[/bold green]",
+            error_label="Erro ao sugerir categoria"
+        )
+    
+    if suggested_cat and suggested_cat in avail_cats:
+        source = "localmente" if local_cat else "pela IA"
+        console.print(f"[dim]Categoria sugerida {source}: {suggested_cat}[/dim]")
+        if Confirm.ask(f"Confirmar categoria '{suggested_cat}'?", default=True):
+             category_val = suggested_cat
+    
+    if not category_val:
+        console.print("[bold]Selecione a Categoria:[/bold]")
+        cat_menu = {str(i+1): c for i, c in enumerate(avail_cats)}
+        for k, v in cat_menu.items():
+            console.print(f"  [{k}] {v}")
+            
+        cat_choice = Prompt.ask("Opção", choices=list(cat_menu.keys()), default="1")
+        category_val = cat_menu[cat_choice]
+        
+    category = GoalCategory(category_val)
+    
+    smart = None
+    if smart_future:
+        smart_suggestion = ai_async.wait(
+            smart_future, "[bold green]Consultando a IA para refinar seu objetivo...[/bold green]",
+            error_label="Erro ao consultar IA"
+        )
         if smart_suggestion:
             console.print(Panel(
                 f"[bold]Sugestão da IA:[/bold]\n\n"
@@ -304,36 +340,114 @@ def create_goal_interactive(horizon: Horizon = None) -> Goal:
     if not smart:
         smart = get_smart_criteria_interactive()
     
-    return Goal(
+    goal = Goal(
         title=title,
         description=description,
         category=category,
         horizon=horizon,
         smart_criteria=smart
     )
+    apply_inferred_target(goal)
+    return goal
+
+def import_goals_from_file(path: Path, assume_yes: bool = False) -> int:
+    """
+    Bulk goal creation: category, SMART criteria and milestones for every goal come from
+    a few batched AI requests instead of three requests per goal. Returns the number saved.
+    """
+    from rich.table import Table
+    from horizonte.core import ai_async
+    from horizonte.core.ai import BULK_BATCH_SIZE
+    from horizonte.core.bulk import load_goal_specs, build_goal
+    from horizonte.core.classifier import CategoryClassifier
+    
+    try:
+        specs = load_goal_specs(path)
+    except ValueError as e:
+        print(f"[red]{e}[/red]")
+        raise typer.Exit(code=1)
+        
+    if not specs:
+        print("[yellow]Nenhum objetivo encontrado no arquivo.[/yellow]")
+        return 0
+    
+    pending = [i for i, spec in enumerate(specs) if spec.needs_ai]
+    suggestions = [None] * len(specs)
+    if pending:
+        payload = [
+            {"title": specs[i].title, "description": specs[i].description,
+             "horizon": (specs[i].horizon or Horizon.SHORT_TERM).value}
+            for i in pending
+        ]
+        requests = -(-len(payload) // BULK_BATCH_SIZE)
+        answers = ai_async.wait(
+            ai_async.run_in_background(ai_async.suggest_goals_bulk(payload, [c.value for c in GoalCategory])),
+            f"[bold green]Gerando categorias, critérios SMART e milestones para {len(payload)} objetivos ({requests} requisições)...[/bold green]",
+            default=[None] * len(payload),
+            error_label="Erro ao consultar IA"
+        )
+        for i, answer in zip(pending, answers):
+            suggestions[i] = answer
+    
+    # The category fallback learns from the user's goals, like create_goal_interactive
+    goals_repo = get_goals_repository()
+    classifier = CategoryClassifier.from_goals(goals_repo.load())
+    goals = [build_goal(spec, suggestion, Horizon.SHORT_TERM, classifier) for spec, suggestion in zip(specs, suggestions)]
+    
+    table = Table(title=f"Objetivos a importar ({len(goals)})", box=box.ROUNDED)
+    table.add_column("Título", style="bold")
+    table.add_column("Categoria")
+    table.add_column("Horizonte")
+    table.add_column("SMART", justify="center")
+    table.add_column("Milestones", justify="right")
+    for goal in goals:
+        has_smart = bool(goal.smart_criteria.measurable)
+        table.add_row(
+            goal.title,
+            f"[{CATEGORY_COLORS.get(goal.category, 'white')}]{goal.category.value}[/]",
+            goal.horizon.value,
+            "[green]✓[/green]" if has_smart else "[yellow]–[/yellow]",
+            str(len(goal.milestones))
+        )
+    console.print(table)
+    
+    missing = [i for i in pending if suggestions[i] is None and specs[i].smart_criteria is None]
+    if missing:
+        print(f"[yellow]{len(missing)} objetivo(s) ficaram sem sugestão da IA; complete-os depois com 'horizonte adjust'.[/yellow]")
+    
+    if not assume_yes and not Confirm.ask(f"Salvar {len(goals)} objetivos?", default=True):
+        return 0
+    
+    with batch(goals_repo):
+        for goal in goals:
+            goals_repo.add(goal)
+    print(f"[bold green]{len(goals)} objetivos adicionados.[/bold green]")
+    return len(goals)
 
 @app.command(help=Strings.CMD_INIT_DESC)
-def init(reset: bool = typer.Option(False, "--reset", help="Limpar objetivos existentes")):
+def init(
+    reset: bool = typer.Option(False, "--reset", help="Limpar objetivos existentes"),
+    from_file: Optional[Path] = typer.Option(None, "--from-file", help="Importar vários objetivos de um arquivo JSON/YAML"),
+):
     print(f"[bold green]{Strings.WELCOME_MESSAGE}[/bold green]")
     
     # Ensure directory exists
-    from horizonte.core.storage import ensure_app_dir, GOALS_FILE
+    from horizonte.core.storage import ensure_app_dir
     ensure_app_dir()
     
-    goals_repo = GoalsRepository()
-    if GOALS_FILE.exists():
-        existing_goals = goals_repo.load()
-        if existing_goals:
-            if reset or Confirm.ask("Já existem objetivos salvos. Deseja limpar e começar do zero?"):
-                 GOALS_FILE.unlink()
-                 print("[yellow]Objetivos anteriores removidos.[/yellow]")
-            else:
-                 print("[dim]Mantendo objetivos existentes e adicionando novos.[/dim]")
-                 # List existing goals simply
-                 console.print("\n[bold]Objetivos Atuais:[/bold]")
-                 for g in existing_goals:
-                     console.print(f" • [{g.category.value}] {g.title} ({g.horizon})")
-                 console.print("\n")
+    goals_repo = get_goals_repository()
+    existing_goals = goals_repo.load()
+    if existing_goals:
+        if reset or Confirm.ask("Já existem objetivos salvos. Deseja limpar e começar do zero?"):
+             goals_repo.save([])
+             print("[yellow]Objetivos anteriores removidos.[/yellow]")
+        else:
+             print("[dim]Mantendo objetivos existentes e adicionando novos.[/dim]")
+             # List existing goals simply
+             console.print("\n[bold]Objetivos Atuais:[/bold]")
+             for g in existing_goals:
+                 console.print(f" • [{g.category.value}] {g.title} ({g.horizon})")
+             console.print("\n")
 
     if not Confirm.ask(Strings.MSG_CONFIRM_INIT):
         raise typer.Abort()
@@ -346,8 +460,11 @@ def init(reset: bool = typer.Option(False, "--reset", help="Limpar objetivos exi
         config.user_name = name
         config_repo.save(config)
     
+    if from_file:
+        import_goals_from_file(from_file)
+        
     # User-driven Loop
-    while True:
+    while not from_file:
         console.print("\n[bold]Novo Objetivo[/bold]")
         
         display_map = {
@@ -386,14 +503,24 @@ def init(reset: bool = typer.Option(False, "--reset", help="Limpar objetivos exi
     print(f"[dim]Objetivos salvos em: {GOALS_FILE}[/dim]")
 
 @app.command(help=Strings.CMD_ADD_DESC)
-def add():
+def add(
+    from_file: Optional[Path] = typer.Option(None, "--from-file", help="Importar vários objetivos de um arquivo JSON/YAML"),
+    yes: bool = typer.Option(False, "--yes", "-y", help="Salvar sem pedir confirmação"),
+):
+    if from_file:
+        import_goals_from_file(from_file, assume_yes=yes)
+        return
+        
     goal = create_goal_interactive()
-    GoalsRepository().add(goal)
+    get_goals_repository().add(goal)
     print(f"[bold green]{Strings.MSG_GOAL_ADDED}[/bold green]")
 
 @app.command(name="list", help=Strings.CMD_LIST_DESC)
 def list_goals():
-    goals = GoalsRepository().load()
+    from rich.table import Table
+    
+    # Read-only projection: only the listed fields, no full model validation
+    goals = get_goals_repository().load_views()
     if not goals:
         print(f"[yellow]{Strings.ERR_NO_GOALS}[/yellow]")
         return
@@ -443,7 +570,7 @@ def list_goals():
     console.print(table)
 
 def select_goal_interactive() -> Goal:
-    repo = GoalsRepository()
+    repo = get_goals_repository()
     goals = repo.load()
     if not goals:
         print(f"[yellow]{Strings.ERR_NO_GOALS}[/yellow]")
@@ -468,6 +595,8 @@ def select_goal_interactive() -> Goal:
 
 @app.command(help="Mostra detalhes de um objetivo")
 def show():
+    from rich.table import Table
+    
     goal = select_goal_interactive()
     
     cat_color = CATEGORY_COLORS.get(goal.category, "white")
@@ -506,27 +635,11 @@ def show():
         reason_color = "green" if goal.status == "completed" else "red"
         console.print(Panel(f"[{reason_color}]{goal.status_reason}[/{reason_color}]", title="Motivo do Status", border_style=reason_color))
 
-    # History Visualization
-    repo = CheckinRepository()
-    checkins = repo.load_all_snapshots()
-    
-    history_data = []
-    for c in checkins:
-        if not c.snapshot: continue
-        # Find this goal in snapshot
-        # Snapshot is list of dicts
-        goal_snap = next((g for g in c.snapshot if g.get('id') == goal.id), None)
-        if goal_snap:
-            history_data.append({
-                "date": c.date,
-                "progress": goal_snap.get('progress_percentage', 0),
-                "status": goal_snap.get('status', 'active')
-            })
+    # History Visualization (sorted by date asc)
+    history_data = get_checkin_repository().goal_history(goal.id)
             
     if history_data:
         console.print("\n[bold]Evolução do Progresso:[/bold]")
-        # Sort by date asc
-        history_data.sort(key=lambda x: x['date'])
         
         # Simple visualization
         for h in history_data:
@@ -552,7 +665,7 @@ def complete():
         goal.status_reason = reason
         goal.updated_at = datetime.now()
         
-        GoalsRepository().update(goal)
+        get_goals_repository().update(goal)
         print(f"[bold green]{Strings.MSG_GOAL_COMPLETED}[/bold green]")
 
 @app.command(help="Marca um objetivo como abandonado")
@@ -566,12 +679,15 @@ def abandon():
         goal.status_reason = reason
         goal.updated_at = datetime.now()
         
-        GoalsRepository().update(goal)
+        get_goals_repository().update(goal)
         print(f"[bold yellow]{Strings.MSG_GOAL_ABANDONED}[/bold yellow]")
 
 @app.command(help="Edita um objetivo existente")
 def adjust():
+    from horizonte.core.targets import apply_inferred_target
+
     goal = select_goal_interactive()
+    previous_text = (goal.title, goal.description, goal.smart_criteria.measurable)
     
     console.print(f"[bold]Editando: {goal.title}[/bold]")
     
@@ -637,13 +753,16 @@ def adjust():
              context = {"title": goal.title, "description": goal.description}
              goal.smart_criteria = edit_smart_criteria_interactive(goal.smart_criteria, context)
                  
+    apply_inferred_target(goal, previous_text)
     goal.updated_at = datetime.now()
-    GoalsRepository().update(goal)
+    get_goals_repository().update(goal)
     print(f"[bold green]{Strings.MSG_GOAL_UPDATED}[/bold green]")
 
 
 @app.command(help="Quebra um objetivo em milestones (marcos)")
 def breakdown():
+    from horizonte.core.ai import suggest_milestones
+    
     goal = select_goal_interactive()
     
     console.print(f"[bold]Breakdown de Milestones: {goal.title}[/bold]")
@@ -668,7 +787,7 @@ def breakdown():
                     goal.milestones.append(Milestone(title=s))
                 
                 goal.updated_at = datetime.now()
-                GoalsRepository().update(goal)
+                get_goals_repository().update(goal)
                 console.print(f"[green]Milestones adicionados![/green]")
     
     # Manual add loop could be here too, but let's start with AI
@@ -676,9 +795,11 @@ def breakdown():
 
 @app.command(help=Strings.CMD_CHECKIN_DESC)
 def checkin(force: bool = typer.Option(False, "--force", "-f", help="Forçar check-in mesmo sem estar vencido")):
-    from horizonte.core.ai import generate_checkin_interaction
+    from horizonte.core import ai_async
+    from rich.markdown import Markdown
+    from rich.table import Table
     
-    goals_repo = GoalsRepository()
+    goals_repo = get_goals_repository()
     goals = goals_repo.load()
     active_goals = [g for g in goals if g.status == GoalStatus.ACTIVE]
     
@@ -686,27 +807,49 @@ def checkin(force: bool = typer.Option(False, "--force", "-f", help="Forçar che
         print("[yellow]Sem objetivos ativos para check-in.[/yellow]")
         return
 
+    now = datetime.now()
+    month_str = now.strftime("%B %Y")
+
     # Check date logic (simplified: force or confirm)
     if not force:
         print(f"[bold]{Strings.CHECKIN_INTRO}[/bold]")
         if not Confirm.ask(Strings.PROMPT_FORCE_CHECKIN, default=True):
              print(f"[yellow]{Strings.MSG_CHECKIN_SKIPPED}[/yellow]")
              return
+
+    # AI Intro is only requested once the check-in is confirmed; it is prefetched
+    # (or starts streaming) while the user picks the mode
+    intro_stream = intro_future = None
+    if ai_async.streaming_enabled():
+        intro_stream = ai_async.stream_checkin_interaction(active_goals, month_str)
+    else:
+        intro_future = ai_async.run_in_background(ai_async.generate_checkin_interaction(active_goals, month_str))
              
-    # AI Intro
-    now = datetime.now()
-    month_str = now.strftime("%B %Y")
-    intro_msg = generate_checkin_interaction(active_goals, month_str)
-    
-    console.print(Panel(Markdown(intro_msg), title=f"Check-in: {month_str}", style="bold magenta"))
-    
-    # ask mode
+    # ask mode (the intro keeps loading in the meantime)
     console.print("\n[bold]Modo de Check-in:[/bold]")
     console.print("  [1] Interativo (Passo a passo por objetivo)")
     console.print("  [2] Conversacional IA (Texto livre, a IA processa)")
     
     mode_choice = Prompt.ask("Opção", choices=["1", "2"], default="1")
     
+    intro_msg = None
+    if intro_stream:
+        intro_msg = intro_stream.render(
+            title=f"Check-in: {month_str}", status="[bold magenta]Preparando seu check-in...[/bold magenta]",
+            style="bold magenta"
+        )
+    if intro_msg is None:
+        if intro_future:
+            intro_msg = ai_async.wait(
+                intro_future, "[bold magenta]Preparando seu check-in...[/bold magenta]",
+                default=f"Bem-vindo ao seu check-in de {month_str}! Vamos ver como você está indo."
+            )
+        else:
+            # Streaming failed: same blocking call as before
+            from horizonte.core.ai import generate_checkin_interaction
+            intro_msg = generate_checkin_interaction(active_goals, month_str)
+        console.print(Panel(Markdown(intro_msg), title=f"Check-in: {month_str}", style="bold magenta"))
+    
     checkin_data = [] # To store (goal, comment, old_progress, new_progress)
     processed_goal_ids = set()
 
@@ -724,7 +867,7 @@ def checkin(force: bool = typer.Option(False, "--force", "-f", help="Forçar che
         updates = process_intelligent_checkin(user_text, active_goals)
         
         if updates:
-            console.print("\n[bold]A IA identificou as seguintes atualizações:[/bold]")
+            console.print("\n[bold]Atualizações identificadas:[/bold]")
             
             # Create a map for easy lookup
             updates_map = {u['goal_id']: u for u in updates}
@@ -737,6 +880,8 @@ def checkin(force: bool = typer.Option(False, "--force", "-f", help="Forçar che
                     console.print(f"\n[bold cyan]Objetivo: {g.title}[/bold cyan]")
                     console.print(f"  Progresso Sugerido: {g.progress_percentage}% -> [bold green]{upd['new_percent']}%[/bold green]")
                     console.print(f"  Comentário Sugerido: [italic]{upd['comment']}[/italic]")
+                    if upd.get('reasoning'):
+                        console.print(f"  [dim]{upd['reasoning']}[/dim]")
                     
                     if Confirm.ask("Confirmar e aplicar?", default=True):
                         checkin_data.append({
@@ -749,7 +894,6 @@ def checkin(force: bool = typer.Option(False, "--force", "-f", help="Forçar che
                         # Update object immediately for accurate snapshot
                         g.progress_percentage = upd['new_percent']
                         g.updated_at = now
-                        goals_repo.update(g)
                     else:
                         processed_goal_ids.remove(g.id) # Treat as not processed to fallback to manual
             
@@ -788,10 +932,9 @@ def checkin(force: bool = typer.Option(False, "--force", "-f", help="Forçar che
                 "comment": comment
             })
             
-            # Update Goal Object
+            # Update Goal Object (persisted together with the check-in below)
             g.progress_percentage = new_prog
             g.updated_at = now
-            goals_repo.update(g)
     
     # Save Check-in File
     md_content = f"# Check-in {month_str}\n\n"
@@ -820,11 +963,26 @@ def checkin(force: bool = typer.Option(False, "--force", "-f", help="Forçar che
     # AI Analysis & Summary
     from horizonte.core.ai import analyze_checkin_period
     
-    ai_summary = analyze_checkin_period(checkin_data, general_feeling, month_str)
+    def summarize(instruction: str = None, refresh: bool = False):
+        """
+        Returns (summary, already_rendered); streams when enabled, blocking call otherwise.
+        refresh=True (a /ia request) skips the response cache.
+        """
+        if ai_async.streaming_enabled():
+            streamed = ai_async.stream_checkin_analysis(
+                checkin_data, general_feeling, month_str, user_instruction=instruction, refresh=refresh
+            ).render(title="Resumo da IA", status="[bold magenta]Analisando seu progresso...[/bold magenta]", border_style="cyan")
+            if streamed is not None:
+                return streamed, True
+        return analyze_checkin_period(checkin_data, general_feeling, month_str, user_instruction=instruction, refresh=refresh), False
+    
+    ai_summary, rendered = summarize()
     
     if ai_summary:
         while True:
-            console.print(Panel(Markdown(ai_summary), title="Resumo da IA", border_style="cyan"))
+            if not rendered:
+                console.print(Panel(Markdown(ai_summary), title="Resumo da IA", border_style="cyan"))
+            rendered = False
             
             console.print("[dim]Deseja usar este resumo? [S]im, [E]ditar manualmente, ou use [bold]/ia [instrução][/bold] para pedir ajustes.[/dim]")
             choice = Prompt.ask("Ação", default="S")
@@ -840,9 +998,11 @@ def checkin(force: bool = typer.Option(False, "--force", "-f", help="Forçar che
                      if len(parts) > 1:
                          instruction = parts[1]
                 
-                new_summary = analyze_checkin_period(checkin_data, general_feeling, month_str, user_instruction=instruction)
+                new_summary, rendered = summarize(instruction, refresh=True)
                 if new_summary:
                     ai_summary = new_summary
+                else:
+                    rendered = False
             else:
                 # Treat as manual edit or ignore? Let's assume S check handles most, but let's be safe
                 pass
@@ -859,8 +1019,12 @@ def checkin(force: bool = typer.Option(False, "--force", "-f", help="Forçar che
         snapshot=[g.model_dump(mode='json') for g in active_goals] 
     )
     
-    repo = CheckinRepository()
-    saved_path = repo.save(checkin_obj, md_content)
+    # Goal updates and the check-in files are committed as one unit (single journal + backup)
+    repo = get_checkin_repository()
+    with batch(goals_repo, repo):
+        for item in checkin_data:
+            goals_repo.update(item['goal'])
+        saved_path = repo.save(checkin_obj, md_content)
     
     print(f"\n[bold green]Check-in concluído e salvo em:[/bold green] {saved_path}")
     
@@ -883,7 +1047,7 @@ def checkin(force: bool = typer.Option(False, "--force", "-f", help="Forçar che
 
 @app.command(help=Strings.CMD_HISTORY_DESC)
 def history():
-    repo = CheckinRepository()
+    repo = get_checkin_repository()
     files = repo.list_all()
     
     if not files:
@@ -903,10 +1067,11 @@ def history():
 
 @app.command(help=Strings.CMD_PROGRESS_DESC)
 def progress():
-    goals = GoalsRepository().load()
-    repo = CheckinRepository()
-    # Load full snapshots for analytics
-    checkins = repo.load_all_snapshots()
+    goals = get_goals_repository().load_views()
+    repo = get_checkin_repository()
+    # Materialized analytics, recomputed only when the check-in history changed
+    from horizonte.core.analytics_cache import load_analytics
+    summary = load_analytics(repo)
     
     total = len(goals)
     completed = sum(1 for g in goals if g.status == "completed")
@@ -922,18 +1087,171 @@ def progress():
     table.add_row(f"[green]{Strings.LABEL_COMPLETED}[/green]", str(completed))
     table.add_row(f"[blue]{Strings.LABEL_ACTIVE}[/blue]", str(active))
     table.add_row(f"[dim]{Strings.LABEL_ABANDONED}[/dim]", str(abandoned))
-    table.add_row(Strings.LABEL_CHECKINS, str(len(checkins)))
+    table.add_row(Strings.LABEL_CHECKINS, str(summary.checkin_count))
     
     console.print(table)
     
     # 2. Detailed Analytics Dashboard
     from horizonte.core.analytics import render_analytics_dashboard
     
-    if checkins:
+    if summary.checkin_count:
         console.print("\n")
-        render_analytics_dashboard(checkins)
+        render_analytics_dashboard(summary)
     else:
         console.print("\n[dim]Realize seu primeiro check-in para ver análises detalhadas de progresso ao longo do tempo.[/dim]")
 
+@app.command(help="Migra os dados JSON para o armazenamento SQLite indexado")
+def migrate(force: bool = typer.Option(False, "--force", help="Sobrescrever um banco SQLite existente")):
+    from horizonte.core.sqlite_storage import migrate_json_to_sqlite, DB_FILE
+    from horizonte.core.storage import record_storage_engine
+    
+    try:
+        counts = migrate_json_to_sqlite(force=force)
+    except (RuntimeError, ValueError) as e:
+        print(f"[red]{e}[/red]")
+        raise typer.Exit(code=1)
+    record_storage_engine("sqlite")
+        
+    print(f"[bold green]Migração concluída:[/bold green] {counts['goals']} objetivos e {counts['checkins']} check-ins.")
+    print(f"[dim]Banco de dados: {DB_FILE}. Os arquivos JSON originais foram mantidos, mas não são mais atualizados.[/dim]")
+
+@app.command(help="Exporta os objetivos (e check-ins) em JSON legível")
+def export(
+    output: Optional[Path] = typer.Option(None, "--output", "-o", help="Arquivo de saída (padrão: imprime na tela)"),
+    checkins: bool = typer.Option(False, "--checkins", help="Incluir os check-ins com seus snapshots"),
+):
+    import sys
+    from horizonte.core import serialization
+    
+    goals = [g.model_dump(mode='json') for g in get_goals_repository().load()]
+    document = {"goals": goals}
+    if checkins:
+        # Snapshots are exported resolved (full), not as the stored deltas
+        entries = sorted(get_checkin_repository().load_all_snapshots(), key=lambda c: c.date)
+        document["checkins"] = [c.model_dump(mode='json', exclude={'snapshot_delta'}) for c in entries]
+    content = serialization.pretty(document)
+    
+    if output is None:
+        sys.stdout.write(content + "\n")
+        return
+    output.write_text(content + "\n", encoding="utf-8")
+    print(f"[green]{len(goals)} objetivo(s) exportado(s) para {output}[/green]")
+
+@app.command(help="Mostra métricas de uso da IA")
+def stats():
+    from horizonte.core import metrics
+    
+    data = metrics.load()
+    local, llm = int(data.get("category.local", 0)), int(data.get("category.llm", 0))
+    total = local + llm
+    print("[bold]Classificação de categoria[/bold]")
+    if total:
+        print(f"  Local: [green]{local}[/green] ({100.0 * local / total:.1f}%)  IA: [yellow]{llm}[/yellow] ({100.0 * llm / total:.1f}%)")
+    else:
+        print("  [dim]Nenhuma classificação registrada.[/dim]")
+    print("[bold]Check-in conversacional[/bold]")
+    print(f"  Atualizações resolvidas localmente: [green]{int(data.get('checkin.local_updates', 0))}[/green]  Chamadas à IA: [yellow]{int(data.get('checkin.llm_calls', 0))}[/yellow]")
+    if data.get("checkin.shards"):
+        print(f"  Requisições em paralelo (shards): [cyan]{int(data['checkin.shards'])}[/cyan]")
+    requests = int(data.get("prompt.checkin.requests", 0))
+    if requests:
+        full = data.get("prompt.checkin.context_tokens_full", 0)
+        sent = data.get("prompt.checkin.context_tokens_sent", 0)
+        saved = 100.0 * (full - sent) / full if full else 0.0
+        print("[bold]Tamanho do prompt de check-in[/bold]")
+        print(f"  Requisições: {requests}  Objetivos enviados: {data.get('prompt.checkin.goals_sent', 0) / requests:.1f} de {data.get('prompt.checkin.goals_total', 0) / requests:.1f} em média")
+        print(f"  Tokens de contexto (estimados): {sent / requests:.0f} enviados vs {full / requests:.0f} sem filtro ([green]-{saved:.0f}%[/green])")
+        print(f"  Prompt completo: {data.get('prompt.checkin.prompt_tokens', 0) / requests:.0f} tokens em média")
+    print("[dim]Estatísticas do cache de respostas: horizonte cache[/dim]")
+
+@app.command(help="Mostra estatísticas do cache de respostas da IA")
+def cache(clear: bool = typer.Option(False, "--clear", help="Apagar todas as respostas em cache")):
+    from horizonte.core.ai_cache import ResponseCache, CACHE_FILE
+    
+    response_cache = ResponseCache()
+    if clear:
+        response_cache.clear()
+        print("[green]Cache da IA limpo.[/green]")
+        return
+        
+    stats = response_cache.stats()
+    print(f"[bold]Cache da IA[/bold] [dim]({CACHE_FILE})[/dim]")
+    print(f"  Respostas armazenadas: {stats['entries']}")
+    print(f"  Hits: [green]{stats['hits']}[/green]  Misses: [yellow]{stats['misses']}[/yellow]  Taxa de acerto: {stats['hit_rate']}%")
+    print(f"  Expiradas: {stats['expired']}  Removidas (LRU): {stats['evictions']}")
+
+@app.command(help="Restaura os arquivos de dados para o estado de uma data/hora")
+def restore(
+    at: Optional[str] = typer.Option(None, "--at", help="Data/hora, ex: 2025-03-01 ou '2025-03-01 14:30' (sem ela, lista os backups)"),
+    yes: bool = typer.Option(False, "--yes", "-y", help="Restaurar sem pedir confirmação"),
+):
+    import math
+    import time
+    from rich.table import Table
+    from horizonte.core.backups import get_backup_store
+    from horizonte.core.storage import APP_DIR, GoalsRepository
+    
+    if storage_engine() == "sqlite":
+        print("[red]O armazenamento ativo é o banco SQLite, que não faz parte dos backups: restore só funciona com os arquivos JSON.[/red]")
+        print("[dim]Para restaurar os arquivos JSON (sem efeito no banco), use HORIZONTE_STORAGE=json.[/dim]")
+        raise typer.Exit(code=1)
+    
+    store = get_backup_store()
+    
+    def display(path: str) -> str:
+        try:
+            return str(Path(path).relative_to(APP_DIR))
+        except ValueError:
+            return path
+    
+    if at is None:
+        versions = store.versions()
+        if not versions:
+            print("[yellow]Nenhum backup registrado ainda.[/yellow]")
+            return
+        table = Table(title="Backups recentes", box=box.ROUNDED)
+        table.add_column("Data", style="cyan")
+        table.add_column("Arquivo")
+        table.add_column("Versão", style="dim")
+        for v in reversed(versions[-20:]):
+            table.add_row(v.date.strftime("%Y-%m-%d %H:%M:%S"), display(v.path), v.hash[:10] if v.hash else "(removido)")
+        print(table)
+        print("[dim]Use horizonte restore --at <data/hora> para restaurar.[/dim]")
+        return
+    
+    try:
+        when = datetime.fromisoformat(at)
+    except ValueError:
+        print("[red]Data inválida. Use o formato AAAA-MM-DD ou 'AAAA-MM-DD HH:MM'.[/red]")
+        raise typer.Exit(code=1)
+    
+    goals_repo = GoalsRepository()
+    if goals_repo.log_path.exists():
+        # Logs written before they were versioned are folded into goals.json first
+        goals_repo.compact()
+    
+    plan = store.restore_plan(when)
+    if not plan:
+        print(f"[green]Nada a restaurar: os arquivos já estão como em {when:%Y-%m-%d %H:%M}.[/green]")
+        return
+    
+    table = Table(title=f"Restaurar para {when:%Y-%m-%d %H:%M}", box=box.ROUNDED)
+    table.add_column("Arquivo")
+    table.add_column("Ação")
+    for v in plan:
+        action = f"versão de {v.date:%Y-%m-%d %H:%M}" if v.hash else "[red]remover (não existia)[/red]"
+        table.add_row(display(v.path), action)
+    print(table)
+    
+    if not yes and not Confirm.ask(f"Restaurar {len(plan)} arquivo(s)?", default=False):
+        print("[yellow]Restauração cancelada.[/yellow]")
+        return
+    
+    # The current versions stay in the store: restoring to this second undoes the operation
+    undo_at = math.ceil(time.time())
+    store.restore(plan, now=max(time.time(), undo_at + 0.001))
+    print(f"[bold green]{len(plan)} arquivo(s) restaurado(s).[/bold green]")
+    print(f"[dim]Para desfazer: horizonte restore --at '{datetime.fromtimestamp(undo_at):%Y-%m-%d %H:%M:%S}'[/dim]")
+
 if __name__ == "__main__":
     app()
@@ -0,0 +1,21 @@
+from typing import Optional
+
+import pytest
+
+from horizonte.core import backups
+from horizonte.core.models import Goal, GoalCategory, Horizon, SmartCriteria
+
+def make_goal(title: str = "Test Goal", category: Optional[GoalCategory] = None, description: str = "",
+              horizon: Horizon = Horizon.SHORT_TERM, smart: Optional[dict] = None, **kwargs) -> Goal:
+    """A valid goal for tests; `smart` overrides some of the SMART criteria fields."""
+    criteria = {"specific": "s", "measurable": "m", "achievable": "a", "relevant": "r", "time_bound": "t", **(smart or {})}
+    if category is not None:
+        kwargs["category"] = category
+    return Goal(title=title, description=description, horizon=horizon, smart_criteria=SmartCriteria(**criteria), **kwargs)
+
+@pytest.fixture(autouse=True)
+def backup_store(tmp_path, monkeypatch):
+    """Every test records its versions in a store under tmp_path, never in ~/.horizonte."""
+    store = backups.BackupStore(tmp_path / "backups")
+    monkeypatch.setattr(backups, "_store", store)
+    return store
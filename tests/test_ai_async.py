@@ -0,0 +1,131 @@
+import asyncio
+import json
+import re
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from horizonte.core import ai_async, ai_client
+
+from conftest import make_goal
+
+@pytest.fixture(autouse=True)
+def no_response_cache(monkeypatch):
+    monkeypatch.setenv("HORIZONTE_AI_CACHE", "0")
+
+class FakeCompletions:
+    """Answers after a fixed delay, based on the prompt type."""
+    def __init__(self, delay):
+        self.delay = delay
+
+    async def create(self, model, messages, temperature, **kwargs):
+        await asyncio.sleep(self.delay)
+        prompt = messages[-1]["content"]
+        if "critérios SMART" in prompt:
+            content = '```json\n{"specific": "s", "measurable": "m", "achievable": "a", "relevant": "r", "time_bound": "t"}\n```'
+        else:
+            content = "Saude\n"
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))])
+
+def fake_client(delay):
+    return SimpleNamespace(chat=SimpleNamespace(completions=FakeCompletions(delay)))
+
+def test_category_and_smart_run_concurrently(monkeypatch):
+    monkeypatch.setattr(ai_client, "get_async_client", lambda: fake_client(0.2))
+
+    # As in `horizonte add`: both requests start right away, the results are awaited later
+    start = time.perf_counter()
+    category_future = ai_async.run_in_background(ai_async.suggest_category("Correr", "Maratona", ["saude", "vida"]))
+    smart_future = ai_async.run_in_background(ai_async.suggest_smart_criteria("Correr", "Maratona", None, "curto_prazo"))
+    category, smart = category_future.result(), smart_future.result()
+    elapsed = time.perf_counter() - start
+
+    assert category == "saude"
+    assert smart.measurable == "m"
+    assert elapsed < 0.35
+
+def test_wait_reports_errors_as_default(monkeypatch):
+    monkeypatch.setattr(ai_client, "get_async_client", lambda: None)
+    assert ai_async.run_sync(ai_async.suggest_milestones("t", "d", "s")) == []
+
+    async def boom():
+        raise RuntimeError("down")
+
+    assert ai_async.wait(ai_async.run_in_background(boom()), "...", default="fallback") == "fallback"
+
+class FakeStream:
+    def __init__(self, tokens, fail_after=None):
+        self.tokens = tokens
+        self.fail_after = fail_after
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def __aiter__(self):
+        for i, token in enumerate(self.tokens):
+            if i == self.fail_after:
+                raise RuntimeError("connection reset")
+            await asyncio.sleep(0.01)
+            yield SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=token))])
+
+def streaming_client(stream):
+    async def create(**kwargs):
+        assert kwargs["stream"] is True
+        return stream
+    return SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+
+def test_stream_renders_tokens(monkeypatch):
+    monkeypatch.setattr(ai_client, "get_async_client", lambda: streaming_client(FakeStream(["# Bora", " lá", "!\n"])))
+    stream = ai_async.stream_checkin_interaction([], "Janeiro")
+    assert stream.render(title="Check-in", status="...") == "# Bora lá!"
+
+def test_stream_falls_back_when_nothing_arrives(monkeypatch):
+    monkeypatch.setattr(ai_client, "get_async_client", lambda: streaming_client(FakeStream(["x"], fail_after=0)))
+    assert ai_async.stream_checkin_interaction([], "Janeiro").render(title="Check-in", status="...") is None
+
+    # A failure mid-stream keeps the partial text
+    monkeypatch.setattr(ai_client, "get_async_client", lambda: streaming_client(FakeStream(["Parcial", "x"], fail_after=1)))
+    assert ai_async.stream_checkin_interaction([], "Janeiro").render(title="Check-in", status="...") == "Parcial"
+
+class ShardCompletions:
+    """Reports every goal of the shard at 10%, plus a repeated id, and tracks concurrency."""
+    def __init__(self):
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.calls = 0
+
+    async def create(self, model, messages, temperature, **kwargs):
+        self.calls += 1
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        await asyncio.sleep(0.1)
+        self.in_flight -= 1
+        prompt = messages[-1]["content"]
+        ids = re.findall(r'"id": "([^"]+)"', prompt)
+        items = [{"goal_id": i, "explicit_percent": 10, "comment": "ok"} for i in ids + ids[:1]]
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=json.dumps(items)))])
+
+def test_sharded_checkin_merges_and_dedupes(monkeypatch, tmp_path):
+    from horizonte.core import metrics
+    from horizonte.core.models import GoalCategory
+
+    monkeypatch.setattr(metrics, "_store", metrics.MetricsStore(tmp_path / "metrics.json"))
+    completions = ShardCompletions()
+    monkeypatch.setattr(ai_client, "get_async_client", lambda: SimpleNamespace(chat=SimpleNamespace(completions=completions)))
+    categories = [GoalCategory.HEALTH, GoalCategory.LIFE, GoalCategory.OTHERS, GoalCategory.PROFESSIONAL]
+    goals = [make_goal(f"Projeto {i}", categories[i % 4]) for i in range(20)]
+
+    start = time.perf_counter()
+    updates = ai_async.run_sync(ai_async.parse_checkin_sharded("avancei em tudo", goals))
+    elapsed = time.perf_counter() - start
+
+    assert completions.calls == 4
+    assert 1 < completions.max_in_flight <= ai_async.SHARD_CONCURRENCY
+    assert elapsed < 0.3
+    assert sorted(u["goal_id"] for u in updates) == sorted(g.id for g in goals)
+    assert all(u["new_percent"] == 10 for u in updates)
+    assert metrics.load()["checkin.shards"] == 4
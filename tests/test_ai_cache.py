@@ -0,0 +1,72 @@
+import time
+from types import SimpleNamespace
+
+from horizonte.core import ai, ai_async, ai_cache, ai_client
+from horizonte.core.ai_cache import ResponseCache, cache_key
+
+def test_cache_key_is_content_addressed():
+    messages = [{"role": "user", "content": "Olá"}]
+    assert cache_key("m", messages, 0.3) == cache_key("m", [{"content": "Olá", "role": "user"}], 0.3)
+    assert cache_key("m", messages, 0.3) != cache_key("m", messages, 0.7)
+    assert cache_key("m", messages, 0.3) != cache_key("other", messages, 0.3)
+
+def test_ttl_and_lru_eviction(tmp_path):
+    cache = ResponseCache(db_path=tmp_path / "ai_cache.db", ttl=60, max_entries=2)
+    cache.put("a", "m", "A")
+    cache.put("b", "m", "B")
+    assert cache.get("a") == "A"  # "b" is now the least recently used
+    cache.put("c", "m", "C")
+
+    assert cache.get("b") is None
+    assert cache.get("c") == "C"
+
+    cache.ttl = 0
+    time.sleep(0.01)
+    assert cache.get("a") is None
+
+    stats = cache.stats()
+    assert stats["entries"] == 1
+    assert (stats["hits"], stats["misses"], stats["expired"], stats["evictions"]) == (2, 2, 1, 1)
+
+def test_repeated_call_is_served_from_cache(tmp_path, monkeypatch):
+    monkeypatch.delenv("HORIZONTE_AI_CACHE", raising=False)
+    monkeypatch.setattr(ai_cache, "_cache", ResponseCache(db_path=tmp_path / "ai_cache.db"))
+    calls = []
+
+    async def create(**kwargs):
+        calls.append(kwargs)
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=" saude "))])
+
+    client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+    monkeypatch.setattr(ai_client, "get_async_client", lambda: client)
+
+    def suggest():
+        return ai_async.run_sync(ai_async.suggest_category("Correr", "Maratona", ["saude"]))
+
+    assert suggest() == "saude"
+    assert suggest() == "saude"
+    assert len(calls) == 1
+
+    ai_cache.set_enabled(False)
+    try:
+        suggest()
+    finally:
+        ai_cache.set_enabled(True)
+    assert len(calls) == 2
+
+def test_regenerate_skips_the_cached_answer(tmp_path, monkeypatch):
+    monkeypatch.delenv("HORIZONTE_AI_CACHE", raising=False)
+    monkeypatch.setattr(ai_cache, "_cache", ResponseCache(db_path=tmp_path / "ai_cache.db"))
+    answers = iter(["primeira", "segunda"])
+
+    def create(**kwargs):
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=next(answers)))])
+
+    client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+    monkeypatch.setattr(ai, "get_ai_client", lambda: client)
+    context = {"title": "Correr", "description": "Maratona"}
+
+    assert ai.refine_smart_field("Specific", "correr", context) == "primeira"
+    assert ai.refine_smart_field("Specific", "correr", context, refresh=True) == "segunda"
+    # The regenerated answer replaces the cached one
+    assert ai.refine_smart_field("Specific", "correr", context) == "segunda"
@@ -0,0 +1,22 @@
+from horizonte.core import ai_client
+from horizonte.core.ai import get_ai_client
+
+def test_client_is_reused(monkeypatch):
+    monkeypatch.setenv("OPENROUTER_API_KEY", "test-key")
+    monkeypatch.setenv("HORIZONTE_AI_TIMEOUT", "12.5")
+
+    first = get_ai_client()
+    assert first is get_ai_client()
+    # The SDK does not retry on its own: horizonte.core.ai_executor does
+    assert first.max_retries == 0
+    assert first.timeout.read == 12.5
+
+    # A different key gets its own pooled client
+    monkeypatch.setenv("OPENROUTER_API_KEY", "other-key")
+    assert get_ai_client() is not first
+    ai_client.close_clients()
+
+def test_no_client_without_key(monkeypatch):
+    monkeypatch.setattr(ai_client, "load_env", lambda: None)
+    monkeypatch.delenv("OPENROUTER_API_KEY", raising=False)
+    assert get_ai_client() is None
@@ -0,0 +1,104 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from horizonte.core import ai, ai_executor
+from horizonte.core.ai_executor import CircuitBreaker, CircuitOpenError, RateLimitedError, RequestExecutor
+
+class APIError(Exception):
+    def __init__(self, status_code, headers=None):
+        super().__init__(f"HTTP {status_code}")
+        self.status_code = status_code
+        self.response = SimpleNamespace(headers=headers or {})
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+def make_executor(clock, **kwargs):
+    return RequestExecutor(clock=clock, sleep=clock.sleep, breaker=CircuitBreaker(cooldown=30, clock=clock), **kwargs)
+
+def failing(*errors, result="ok"):
+    errors = list(errors)
+
+    def fn():
+        if errors:
+            raise errors.pop(0)
+        return result
+    return fn
+
+def test_retries_transient_errors_honouring_retry_after():
+    clock = FakeClock()
+    executor = make_executor(clock)
+    assert executor.call("m", failing(APIError(429, {"retry-after": "3"}), APIError(503))) == "ok"
+    assert 3 <= clock.now <= 4
+    # The 429 blocked the model until its reset time
+    assert executor.rate_limits.wait_time("m") == 0
+
+def test_client_errors_are_not_retried():
+    clock = FakeClock()
+    executor = make_executor(clock)
+    with pytest.raises(APIError):
+        executor.call("m", failing(APIError(401)))
+    assert clock.now == 0
+    assert executor.breaker.failures == 0
+
+def test_rate_limit_longer_than_budget_fails_fast():
+    clock = FakeClock()
+    executor = make_executor(clock, retry_budget=10)
+    with pytest.raises(APIError):
+        executor.call("m", failing(APIError(429, {"retry-after": "60"})))
+    with pytest.raises(RateLimitedError):
+        executor.call("m", failing())
+    # Other models are not affected
+    assert executor.call("other", failing()) == "ok"
+    assert clock.now == 0
+
+def test_circuit_opens_and_probes_after_cooldown():
+    clock = FakeClock()
+    executor = make_executor(clock, max_retries=0)
+    for _ in range(3):
+        with pytest.raises(APIError):
+            executor.call("m", failing(APIError(502)))
+    assert executor.breaker.state == "open"
+    with pytest.raises(CircuitOpenError):
+        executor.call("m", failing())
+
+    clock.now += 30
+    with pytest.raises(APIError):
+        executor.call("m", failing(APIError(502)))
+    assert executor.breaker.state == "open"
+
+    clock.now += 30
+    assert executor.call("m", failing()) == "ok"
+    assert executor.breaker.state == "closed"
+
+def test_async_calls_share_the_executor():
+    clock = FakeClock()
+    executor = make_executor(clock, base_delay=0.001)
+    calls = []
+
+    async def create():
+        calls.append(1)
+        if len(calls) == 1:
+            raise APIError(500)
+        return "ok"
+
+    assert asyncio.run(executor.acall("m", create)) == "ok"
+    assert len(calls) == 2
+
+def test_open_circuit_switches_to_offline_fallbacks(monkeypatch):
+    monkeypatch.setenv("OPENROUTER_API_KEY", "test-key")
+    executor = RequestExecutor()
+    executor.breaker.opened_at = executor.clock()
+    monkeypatch.setattr(ai_executor, "_executor", executor)
+
+    assert ai.get_ai_client() is None
+    assert ai.generate_checkin_interaction([], "Janeiro") == ai.checkin_intro_fallback("Janeiro")
@@ -0,0 +1,67 @@
+from datetime import datetime
+
+import pytest
+
+from horizonte.core import analytics_engine
+from horizonte.core.analytics_engine import ColumnarHistory
+from horizonte.core.models import HistoryEntry, CheckInType
+
+def make_entry(year, month, goals):
+    return HistoryEntry(
+        id=f"{year}-{month}",
+        date=datetime(year, month, 28),
+        type=CheckInType.MONTHLY,
+        file_path="",
+        goals={gid: (p, "active", cat) for gid, (p, cat) in goals.items()},
+    )
+
+@pytest.fixture(params=["numpy", "python"])
+def backend(request, monkeypatch):
+    if request.param == "python":
+        monkeypatch.setattr(analytics_engine, "np", None)
+    elif analytics_engine.np is None:
+        pytest.skip("numpy not installed")
+    return request.param
+
+def sample_history():
+    return [
+        make_entry(2024, 1, {"a": (10, "financeira"), "b": (20, "saúde")}),
+        make_entry(2024, 2, {"a": (30, "financeira"), "b": (40, "saúde"), "c": (50, "saúde")}),
+        make_entry(2024, 4, {"a": (60, "financeira"), "b": (60, "saúde")}),
+        make_entry(2025, 1, {"a": (90, "financeira"), "b": (100, "saúde")}),
+    ]
+
+def test_period_stats(backend):
+    history = ColumnarHistory.from_entries(sample_history()).period_stats()
+    assert [h["avg_progress"] for h in history] == [15.0, 40.0, 60.0, 95.0]
+    assert history[1]["categories"] == {"financeira": 30.0, "saúde": 45.0}
+    assert history[1]["total_goals"] == 3
+    assert ColumnarHistory.from_entries([]).period_stats() == []
+
+def test_deltas_and_windows(backend):
+    from horizonte.core.analytics_engine import AnalyticsSummary
+
+    summary = AnalyticsSummary.from_entries(sample_history())
+    assert summary.delta(1) is None        # no check-in in Dec/2024
+    assert summary.delta(12) == 80.0       # Jan/2025 vs Jan/2024
+    assert summary.rolling_mean(2) == 77.5
+    assert summary.rolling_mean(3) == 65.0
+    engine = ColumnarHistory.from_entries(sample_history())
+    assert engine.percentiles((50,))[1] == {50: 40.0}
+    assert engine.percentiles((25, 75))[0] == {25: 12.5, 75: 17.5}
+
+def test_summary_extend_matches_full_recompute(backend):
+    from horizonte.core.analytics_engine import AnalyticsSummary
+    entries = sample_history()
+
+    incremental = AnalyticsSummary.from_entries(entries[:2])
+    for e in entries[2:]:
+        assert incremental.extend(e)
+    full = AnalyticsSummary.from_entries(entries)
+
+    assert incremental.data == full.data
+    assert incremental.streak(now=datetime(2025, 2, 1)) == 1
+    assert incremental.streak(now=datetime(2025, 5, 1)) == 0
+    assert incremental.rolling_mean(2) == 77.5
+    # Out-of-order check-ins need a full recompute
+    assert not incremental.extend(make_entry(2023, 1, {"a": (1, "vida")}))
@@ -0,0 +1,171 @@
+import hashlib
+import random
+import time
+from datetime import datetime
+
+from horizonte.core.backups import BackupStore
+
+from conftest import make_goal
+
+DAY = 86400
+
+def goals_doc(n):
+    """40 goal-like lines (not very compressible); only goal 3 changes with n."""
+    return "".join(
+        f'{{"id": "{hashlib.sha1(str(i).encode()).hexdigest()}", "progress": {n if i == 3 else 0}}}\n' for i in range(40)
+    )
+
+def test_versions_are_deduplicated_and_stored_as_deltas(tmp_path):
+    store = BackupStore(tmp_path / "backups")
+    f = tmp_path / "goals.json"
+    f.write_text(goals_doc(0))
+    store.record(f, goals_doc(10), goals_doc(0), now=1000)
+    store.record(f, goals_doc(20), goals_doc(10), now=1001)
+    # Same content again: nothing new
+    store.record(f, goals_doc(20), goals_doc(20), now=1002)
+
+    versions = store.versions(f)
+    assert [store.read(v.hash).decode() for v in versions] == [goals_doc(0), goals_doc(10), goals_doc(20)]
+    objects = sorted((tmp_path / "backups" / "objects").rglob("*"), key=lambda p: p.stat().st_mtime)
+    objects = [p for p in objects if p.is_file()]
+    assert len(objects) == 3
+    full, delta = objects[0].stat().st_size, objects[-1].stat().st_size
+    assert delta < full / 2
+
+    # Reopening reads the same manifest
+    reopened = BackupStore(tmp_path / "backups")
+    assert [v.hash for v in reopened.versions(f)] == [v.hash for v in versions]
+
+def test_retention_keeps_one_version_per_bucket_and_frees_objects(tmp_path):
+    store = BackupStore(tmp_path / "backups", hours=24, days=7, months=0)
+    f = tmp_path / "goals.json"
+    start = datetime(2025, 1, 1, 12).timestamp()
+    previous = None
+    # Ten versions a day for 10 days
+    for i in range(100):
+        content = goals_doc(i)
+        store.record(f, content, previous, now=start + i * DAY / 10)
+        previous = content
+    now = start + 99 * DAY / 10
+    versions = store.versions(f)
+    ages = [now - v.timestamp for v in versions]
+    assert ages[-1] == 0
+    assert all(age < 7 * DAY for age in ages)
+    days = [v.date.date() for v in versions if now - v.timestamp >= DAY]
+    assert len(days) == len(set(days))
+    # Every kept version is still readable and pruned objects were deleted
+    assert store.read(versions[0].hash).decode() == goals_doc(int(round((versions[0].timestamp - start) / (DAY / 10))))
+    stored = {p.name for p in (tmp_path / "backups" / "objects").rglob("*") if p.is_file()}
+    assert stored == set(store._load()["objects"])
+    assert len(stored) < 100
+
+def keep_all_tiers(entries, now, hours, days, months):
+    """Reference retention: a full pass over every version."""
+    tiers = ((3600 * hours, "%Y%m%d%H"), (DAY * days, "%Y%m%d"), (DAY * 31 * months, "%Y%m"))
+    kept, buckets = [], set()
+    for i in range(len(entries) - 1, -1, -1):
+        age = now - entries[i]
+        if i == len(entries) - 1 or age < 3600:
+            kept.append(entries[i])
+            continue
+        for max_age, bucket_format in tiers:
+            if age < max_age:
+                bucket = (bucket_format, datetime.fromtimestamp(entries[i]).strftime(bucket_format))
+                if bucket not in buckets:
+                    buckets.add(bucket)
+                    kept.append(entries[i])
+                break
+    return sorted(kept)
+
+def test_incremental_pruning_matches_a_full_pass(tmp_path):
+    random.seed(7)
+    store = BackupStore(tmp_path / "backups", hours=6, days=5, months=2)
+    f = tmp_path / "goals.json"
+    now = datetime(2025, 1, 1, 12).timestamp()
+    expected = []
+    for i in range(300):
+        now += random.choice((60, 1800, 3 * 3600, DAY, 4 * DAY))
+        store.record(f, goals_doc(i), now=now)
+        expected = keep_all_tiers(expected + [now], now, 6, 5, 2)
+        assert [v.timestamp for v in store.versions(f)] == expected
+
+def test_legacy_bak_copies_are_imported_once(tmp_path):
+    root = tmp_path / "backups"
+    root.mkdir()
+    (root / "goals.json.20250101120000.bak").write_text("v1")
+    (root / "goals.json.20250102120000.bak").write_text("v2")
+    (root / "2025-01-28-monthly.md.20250128120000.bak").write_text("# R")
+    store = BackupStore(root, days=60, months=24)
+    targets = {"goals.json": tmp_path / "goals.json", "2025-01-28-monthly.md": tmp_path / "checkins" / "r.md"}
+    now = datetime(2025, 1, 30).timestamp()
+
+    assert store.import_legacy(targets.get, now=now) == 3
+    assert list(root.glob("*.bak")) == []
+    assert [store.read(v.hash) for v in store.versions(tmp_path / "goals.json")] == [b"v1", b"v2"]
+    assert store.version_at(tmp_path / "checkins" / "r.md", datetime(2025, 1, 29)) is not None
+    (root / "goals.json.20250103120000.bak").write_text("v3")
+    assert BackupStore(root).import_legacy(targets.get, now=now) == 0
+
+def test_restore_at_timestamp(tmp_path):
+    store = BackupStore(tmp_path / "backups")
+    goals, notes = tmp_path / "goals.json", tmp_path / "notes.md"
+    goals.write_text("v1")
+    store.record(goals, "v2", "v1", now=datetime(2025, 3, 1, 10).timestamp())
+    goals.write_text("v2")
+    store.record(notes, "nota", None, now=datetime(2025, 3, 2, 10).timestamp())
+    notes.write_text("nota")
+    store.record(goals, "v3", "v2", now=datetime(2025, 3, 3, 10).timestamp())
+    goals.write_text("v3")
+
+    plan = store.restore_plan(datetime(2025, 3, 1, 12))
+    assert {p.path: p.hash is None for p in plan} == {str(goals.resolve()): False, str(notes.resolve()): True}
+    store.restore(plan, now=datetime(2025, 3, 4).timestamp())
+    assert goals.read_text() == "v2"
+    assert not notes.exists()
+
+    # The replaced state was recorded, so the restore can be undone
+    store.restore(store.restore_plan(datetime(2025, 3, 3, 12)), now=datetime(2025, 3, 5).timestamp())
+    assert goals.read_text() == "v3"
+    assert notes.read_text() == "nota"
+    assert store.restore_plan(datetime(2025, 3, 5)) == []
+
+def test_restore_is_limited_to_the_scope(tmp_path):
+    app_dir, elsewhere = tmp_path / "app", tmp_path / "elsewhere"
+    app_dir.mkdir()
+    elsewhere.mkdir()
+    store = BackupStore(tmp_path / "backups", scope=app_dir)
+    inside, outside = app_dir / "goals.json", elsewhere / "goals.json"
+    for f in (inside, outside):
+        f.write_text("v1")
+        store.record(f, "v2", "v1", now=datetime(2025, 3, 1).timestamp())
+        store.record(f, "v3", "v2", now=datetime(2025, 3, 3).timestamp())
+        f.write_text("v3")
+
+    plan = store.restore_plan(datetime(2025, 3, 2))
+    assert [p.path for p in plan] == [str(inside.resolve())]
+    assert {v.path for v in store.versions()} == {str(inside.resolve())}
+    store.restore(plan)
+    assert inside.read_text() == "v2"
+    assert outside.read_text() == "v3"
+
+def test_restore_brings_back_the_goals_log(tmp_path, backup_store):
+    from horizonte.core.storage import GoalsRepository
+
+    repo = GoalsRepository(file_path=tmp_path / "goals.json")
+    goal = make_goal("Correr")
+    repo.save([goal])
+    goal.progress_percentage = 30
+    repo.update(goal)
+    assert repo.log_path.exists()
+    time.sleep(0.01)
+    after_update = datetime.now()
+    time.sleep(0.01)
+
+    goal.progress_percentage = 60
+    repo.update(goal)
+    repo.compact()
+    assert not repo.log_path.exists()
+
+    backup_store.restore(backup_store.restore_plan(after_update))
+    assert repo.log_path.exists()
+    assert [g.progress_percentage for g in GoalsRepository(file_path=tmp_path / "goals.json").load()] == [30]
@@ -0,0 +1,79 @@
+import asyncio
+import json
+from types import SimpleNamespace
+
+import pytest
+
+from horizonte.core import ai, ai_async, ai_client
+from horizonte.core.bulk import load_goal_specs, build_goal
+from horizonte.core.classifier import CategoryClassifier
+from horizonte.core.models import GoalCategory, Horizon
+
+from conftest import make_goal
+
+@pytest.fixture(autouse=True)
+def no_response_cache(monkeypatch):
+    monkeypatch.setenv("HORIZONTE_AI_CACHE", "0")
+
+def test_load_goal_specs(tmp_path):
+    path = tmp_path / "goals.json"
+    path.write_text(json.dumps({"goals": [
+        "Ler 12 livros",
+        {"title": "Maratona", "description": "Correr 42km", "horizon": "mid_term", "category": "saúde"},
+    ]}))
+    specs = load_goal_specs(path)
+    assert [s.title for s in specs] == ["Ler 12 livros", "Maratona"]
+    assert specs[1].horizon == Horizon.MID_TERM
+    assert specs[0].needs_ai
+
+    path.write_text(json.dumps([{"description": "sem título"}]))
+    with pytest.raises(ValueError):
+        load_goal_specs(path)
+
+def test_bulk_goals_one_request_per_batch(monkeypatch):
+    monkeypatch.setenv("HORIZONTE_AI_STREAM", "0")
+    requests = []
+
+    async def create(model, messages, temperature, **kwargs):
+        goals = json.loads(messages[-1]["content"].split("de uma vez:")[1].split("Para CADA")[0])
+        requests.append(len(goals))
+        answer = [
+            {"index": g["index"], "category": "saúde",
+             "smart": {"specific": "s", "measurable": g["title"], "achievable": "a", "relevant": "r", "time_bound": "t"},
+             "milestones": ["m1", "m2"]}
+            for g in reversed(goals)
+        ]
+        await asyncio.sleep(0)
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=json.dumps(answer)))])
+
+    client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+    monkeypatch.setattr(ai_client, "get_async_client", lambda: client)
+
+    goals = [{"title": f"Goal {i}", "description": "", "horizon": "short_term"} for i in range(25)]
+    results = ai_async.run_sync(ai_async.suggest_goals_bulk(goals, ["saúde", "vida"]))
+
+    assert sorted(requests) == [5, 10, 10]
+    assert [r["smart"].measurable for r in results] == [g["title"] for g in goals]
+
+def test_parse_bulk_goals_tolerates_gaps():
+    content = '```json\n[{"index": 1, "category": "Vida", "smart": null, "milestones": ["x"]}, "junk"]\n```'
+    results = ai.parse_bulk_goals(content, 2)
+    assert results[0] is None
+    assert results[1]["category"] == "vida" and results[1]["smart"] is None
+
+def test_build_goal_prefers_file_values(tmp_path):
+    path = tmp_path / "goals.json"
+    path.write_text(json.dumps([{"title": "Investir", "category": "financeira", "milestones": ["Abrir conta"]}]))
+    spec = load_goal_specs(path)[0]
+    goal = build_goal(spec, {"category": "vida", "smart": None, "milestones": ["a", "b"]}, Horizon.LONG_TERM)
+    assert goal.category == GoalCategory.FINANCIAL
+    assert [m.title for m in goal.milestones] == ["Abrir conta"]
+    assert goal.horizon == Horizon.LONG_TERM
+
+def test_build_goal_falls_back_to_a_classifier_of_the_users_goals(tmp_path):
+    path = tmp_path / "goals.json"
+    path.write_text(json.dumps([{"title": "Lançar o Zorblax"}]))
+    spec = load_goal_specs(path)[0]
+    classifier = CategoryClassifier.from_goals([make_goal("Zorblax beta", GoalCategory.PROFESSIONAL)])
+    assert build_goal(spec, None, Horizon.SHORT_TERM).category != GoalCategory.PROFESSIONAL
+    assert build_goal(spec, None, Horizon.SHORT_TERM, classifier).category == GoalCategory.PROFESSIONAL
@@ -0,0 +1,132 @@
+from types import SimpleNamespace
+
+import pytest
+
+from horizonte.core import ai, ai_client, metrics
+from horizonte.core.checkin_parser import parse_checkin, split_clauses
+from horizonte.core.metrics import MetricsStore
+from horizonte.core.models import Goal, GoalCategory, Horizon
+
+from conftest import make_goal
+
+@pytest.fixture
+def goals():
+    return [
+        make_goal("Juntar 100k de reserva", GoalCategory.FINANCIAL, progress_percentage=10),
+        make_goal("Patrimônio de 1mi", GoalCategory.FINANCIAL, horizon=Horizon.LONG_TERM),
+        make_goal("Correr 1000km no ano", GoalCategory.HEALTH),
+        make_goal("Ler 12 livros", GoalCategory.LIFE),
+        make_goal("Aprender piano", GoalCategory.LIFE),
+    ]
+
+def percents(result, goals):
+    titles = {g.id: g.title for g in goals}
+    return {titles[u["goal_id"]]: u["new_percent"] for u in result.updates}
+
+def test_split_clauses_keeps_numbers():
+    assert split_clauses("Guardei 1.500 reais, corri 40km e li 1,5 livros.") == [
+        "Guardei 1.500 reais", "corri 40km", "li 1,5 livros"
+    ]
+
+def test_resolves_common_updates_locally(goals):
+    result = parse_checkin("guardei 5k na reserva, corri 40km e li 3 livros", goals)
+    assert percents(result, goals) == {
+        "Juntar 100k de reserva": 15,
+        "Correr 1000km no ano": 4,
+        "Ler 12 livros": 25,
+    }
+    assert result.ambiguous == []
+
+def test_absolute_values_and_percent(goals):
+    result = parse_checkin("tenho 50k de patrimônio agora; estou em 30% do piano", goals)
+    assert percents(result, goals) == {"Patrimônio de 1mi": 5, "Aprender piano": 30}
+
+def test_numbers_need_a_word_of_the_goal(goals):
+    # Verb and unit alone point to both savings goals: the LLM decides
+    result = parse_checkin("guardei 5k; melhorei 30%", goals)
+    assert result.updates == []
+    assert result.ambiguous == ["guardei 5k", "melhorei 30%"]
+
+def test_debt_payments_are_not_savings():
+    goals = [
+        make_goal("Quitar 20k do financiamento do carro", GoalCategory.FINANCIAL),
+        make_goal("Juntar 30k para trocar de carro", GoalCategory.FINANCIAL),
+    ]
+    assert percents(parse_checkin("paguei 2k do carro", goals), goals) == {"Quitar 20k do financiamento do carro": 10}
+    assert percents(parse_checkin("guardei 3k pro carro", goals), goals) == {"Juntar 30k para trocar de carro": 10}
+
+def test_ambiguous_clauses_go_to_llm(goals, tmp_path, monkeypatch):
+    monkeypatch.setattr(metrics, "_store", MetricsStore(tmp_path / "metrics.json"))
+    monkeypatch.setenv("HORIZONTE_AI_CACHE", "0")
+    sent = []
+
+    async def create(model, messages, temperature, **kwargs):
+        sent.append(messages[-1]["content"])
+        piano = next(g for g in goals if g.title == "Aprender piano")
+        content = f'{{"updates": [{{"goal_id": "{piano.id}", "explicit_percent": 40, "comment": "Evoluindo"}}]}}'
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))])
+
+    monkeypatch.setattr(ai_client, "get_async_client", lambda: SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create))))
+
+    updates = ai.process_intelligent_checkin("corri 40km e o piano evoluiu bastante", goals)
+    assert len(sent) == 1
+    assert "o piano evoluiu bastante" in sent[0] and "corri" not in sent[0]
+    assert "Correr 1000km" not in sent[0]
+    assert sorted(u["new_percent"] for u in updates) == [4, 40]
+    data = metrics.load()
+    assert (data["checkin.local_updates"], data["checkin.llm_calls"]) == (1, 1)
+    assert data["prompt.checkin.goals_sent"] == 4
+
+def test_clauses_without_numbers_reach_the_llm(goals, tmp_path, monkeypatch):
+    monkeypatch.setattr(metrics, "_store", MetricsStore(tmp_path / "metrics.json"))
+    monkeypatch.setenv("HORIZONTE_AI_CACHE", "0")
+    run = next(g for g in goals if g.title.startswith("Correr"))
+    sent = []
+
+    async def create(model, messages, temperature, **kwargs):
+        sent.append(messages[-1]["content"])
+        content = f'{{"updates": [{{"goal_id": "{run.id}", "explicit_percent": 20, "comment": "Bom ritmo"}}]}}'
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))])
+
+    monkeypatch.setattr(ai_client, "get_async_client", lambda: SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create))))
+
+    assert parse_checkin("Avancei bem na corrida", goals).ambiguous == ["Avancei bem na corrida"]
+    updates = ai.process_intelligent_checkin("Avancei bem na corrida", goals)
+    assert len(sent) == 1 and "Avancei bem na corrida" in sent[0]
+    # The prompt asks for the same {"updates": [...]} object as the response_format schema
+    assert '"updates": [' in sent[0] and "JSON array" not in sent[0]
+    assert [(u["goal_id"], u["new_percent"]) for u in updates] == [(run.id, 20)]
+
+def test_goal_target_inferred_on_creation_and_adjust(tmp_path):
+    from horizonte.core.storage import GoalsRepository
+    from horizonte.core.targets import apply_inferred_target
+
+    goal = make_goal("Correr 1000km no ano", GoalCategory.HEALTH)
+    apply_inferred_target(goal)
+    assert (goal.target_value, goal.unit) == (1000, "km")
+
+    previous = (goal.title, goal.description, goal.smart_criteria.measurable)
+    goal.title = "Juntar 50k"
+    apply_inferred_target(goal, previous)
+    assert (goal.target_value, goal.unit) == (50000, "brl")
+
+    # A target the user set is neither touched by the repository nor by a later adjust
+    goal.target_value, goal.unit = 80000, "brl"
+    repo = GoalsRepository(file_path=tmp_path / "goals.json")
+    repo.add(goal)
+    previous = (goal.title, goal.description, goal.smart_criteria.measurable)
+    goal.title = "Juntar 60k"
+    apply_inferred_target(goal, previous)
+    repo.update(goal)
+
+    reloaded = GoalsRepository(file_path=tmp_path / "goals.json").get(goal.id)
+    assert (reloaded.target_value, reloaded.unit) == (80000, "brl")
+
+def test_legacy_goal_without_target_fields():
+    data = make_goal("Ler 12 livros", GoalCategory.LIFE).model_dump(mode="json", exclude={"target_value", "unit"})
+    goal = Goal.model_validate(data)
+    assert goal.target_value is None
+    # Still parsed offline: the target is inferred for the check-in without being stored
+    result = parse_checkin("li 3 livros", [goal])
+    assert [(u["goal_id"], u["new_percent"]) for u in result.updates] == [(goal.id, 25)]
+    assert goal.target_value is None
@@ -0,0 +1,31 @@
+from horizonte.core import metrics
+from horizonte.core.classifier import CategoryClassifier, local_category, tokenize
+from horizonte.core.metrics import MetricsStore
+from horizonte.core.models import GoalCategory
+
+from conftest import make_goal
+
+def test_tokenize_normalizes_pt_br():
+    assert tokenize("Investimentos em Ações") == tokenize("investir acoes")
+
+def test_seed_vocabulary_predictions():
+    model = CategoryClassifier.from_goals()
+    assert model.predict("Correr uma maratona")[0] == GoalCategory.HEALTH
+    assert model.predict("Juntar uma reserva de emergência")[0] == GoalCategory.FINANCIAL
+    assert model.predict("Ler 12 livros")[0] == GoalCategory.LIFE
+    assert model.predict("xyz qwerty") == (None, 0.0)
+
+def test_learns_from_user_goals():
+    goals = [make_goal("Publicar posts no blog", GoalCategory.PROFESSIONAL)]
+    assert CategoryClassifier.from_goals().predict("Escrever no blog")[0] is None
+    assert CategoryClassifier.from_goals(goals).predict("Escrever no blog")[0] == GoalCategory.PROFESSIONAL
+
+def test_local_category_escalates_and_counts(tmp_path, monkeypatch):
+    monkeypatch.setattr(metrics, "_store", MetricsStore(tmp_path / "metrics.json"))
+
+    assert local_category("Correr uma maratona", "42km") == "saúde"
+    assert local_category("Escrever um romance", "") is None
+
+    data = metrics.load()
+    assert data["category.local"] == 1
+    assert data["category.llm"] == 1
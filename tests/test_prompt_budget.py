@@ -0,0 +1,28 @@
+import json
+
+from horizonte.core.models import GoalCategory
+from horizonte.core.prompt_budget import build_goal_context, estimate_tokens, rank_goals
+
+from conftest import make_goal
+
+LONG_SMART = {"measurable": "m" * 200}
+
+def make_goals(n):
+    goals = [make_goal(f"Projeto pessoal {i}", GoalCategory.OTHERS, "Descrição longa " * 40, smart=LONG_SMART) for i in range(n)]
+    goals.append(make_goal("Correr 1000km no ano", GoalCategory.HEALTH, smart=LONG_SMART))
+    return goals
+
+def test_rank_puts_relevant_goals_first():
+    goals = make_goals(5)
+    assert rank_goals("corri 40km", goals)[0].title == "Correr 1000km no ano"
+
+def test_context_respects_top_k_and_budget(monkeypatch):
+    goals = make_goals(30)
+    monkeypatch.setenv("HORIZONTE_CHECKIN_TOP_K", "5")
+    monkeypatch.setenv("HORIZONTE_PROMPT_BUDGET", "400")
+
+    context, size = build_goal_context("corri 40km", goals)
+    assert context[0]["title"] == "Correr 1000km no ano"
+    assert size.goals_total == 31 and size.goals_sent == len(context) <= 5
+    assert size.sent_tokens == estimate_tokens(json.dumps(context, ensure_ascii=False)) <= 400
+    assert size.full_tokens > 10 * size.sent_tokens
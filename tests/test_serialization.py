@@ -0,0 +1,34 @@
+import json
+
+import pytest
+
+from horizonte.core import serialization
+from horizonte.core.storage import GoalsRepository
+
+from conftest import make_goal
+
+@pytest.mark.parametrize("backend", ["auto", "json"])
+def test_goals_file_has_one_goal_per_line(tmp_path, monkeypatch, backend):
+    monkeypatch.setenv("HORIZONTE_SERIALIZER", backend)
+    goals_file = tmp_path / "goals.json"
+    goals = [make_goal(f"Goal {i}", description="Descrição com acentuação") for i in range(3)]
+    GoalsRepository(file_path=goals_file).save(goals)
+
+    lines = goals_file.read_text().splitlines()
+    assert lines[0] == "[" and lines[-1] == "]" and len(lines) == 5
+    assert "acentuação" in lines[1]
+    assert json.loads(goals_file.read_text()) == [g.model_dump(mode='json') for g in goals]
+    assert GoalsRepository(file_path=goals_file).load() == goals
+
+def test_indented_goals_file_still_loads(tmp_path):
+    goals_file = tmp_path / "goals.json"
+    goals = [make_goal("Goal", description="Descrição com acentuação")]
+    goals_file.write_text(serialization.pretty([g.model_dump(mode='json') for g in goals]))
+    assert GoalsRepository(file_path=goals_file).load() == goals
+
+def test_bulk_restores_gc_state():
+    import gc
+
+    with serialization.bulk():
+        assert not gc.isenabled()
+    assert gc.isenabled()
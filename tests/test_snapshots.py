@@ -0,0 +1,146 @@
+import json
+import sqlite3
+from datetime import datetime
+
+import pytest
+
+from horizonte.core import snapshots
+from horizonte.core.models import CheckIn, CheckInType, GoalStatus, Milestone
+from horizonte.core.sqlite_storage import SqliteCheckinRepository, connect
+from horizonte.core.storage import CheckinRepository
+
+from conftest import make_goal
+
+# Long text fields that stay the same between check-ins (what the deltas avoid repeating)
+LONG_TEXT = {"description": "Descrição longa " * 20, "smart": {"specific": "s" * 200}}
+
+def history_of_changes():
+    """Snapshots of 8 monthly check-ins: progress, milestone completion, a new and a removed goal."""
+    run = make_goal("Correr 1000km", milestones=[Milestone(title="100km"), Milestone(title="500km")], **LONG_TEXT)
+    save = make_goal("Juntar 50k", **LONG_TEXT)
+    read = make_goal("Ler 12 livros", **LONG_TEXT)
+    states = []
+    for month in range(1, 9):
+        run.progress_percentage = month * 10
+        if month == 3:
+            run.milestones[0].is_completed = True
+            run.milestones[0].completed_at = datetime(2025, 3, 20)
+        if month == 4:
+            read.status = GoalStatus.ABANDONED
+        goals = [run, save] + ([read] if month < 5 else [])
+        if month >= 6:
+            goals.append(make_goal("Aprender piano", id="piano", **LONG_TEXT))
+        states.append((datetime(2025, month, 28), [g.model_dump(mode='json') for g in goals]))
+    return states
+
+def json_repo(tmp_path):
+    return CheckinRepository(dir_path=tmp_path / "checkins")
+
+def sqlite_repo(tmp_path):
+    return SqliteCheckinRepository(db_path=tmp_path / "horizonte.db", dir_path=tmp_path / "checkins")
+
+@pytest.mark.parametrize("make_repo", [json_repo, sqlite_repo])
+def test_delta_snapshots_round_trip(tmp_path, make_repo):
+    repo = make_repo(tmp_path)
+    states = history_of_changes()
+    for date, snapshot in states:
+        repo.save(CheckIn(date=date, type=CheckInType.MONTHLY, goals_covered=[], file_path="", snapshot=snapshot), "# R")
+
+    loaded = sorted(repo.load_all_snapshots(), key=lambda c: c.date)
+    assert [c.snapshot for c in loaded] == [s for _, s in states]
+
+    # Point-in-time views
+    assert repo.snapshot_at(datetime(2025, 1, 1)) is None
+    assert repo.snapshot_at(datetime(2025, 4, 30)) == states[3][1]
+    assert repo.snapshot_at(datetime(2030, 1, 1)) == states[-1][1]
+
+def test_delta_files_are_small_and_keyframes_are_periodic(tmp_path):
+    repo = json_repo(tmp_path)
+    for date, snapshot in history_of_changes():
+        repo.save(CheckIn(date=date, type=CheckInType.MONTHLY, goals_covered=[], file_path="", snapshot=snapshot), "# R")
+
+    files = sorted((tmp_path / "checkins").glob("*.json"))
+    docs = [json.loads(f.read_text()) for f in files]
+    keyframes = [i for i, d in enumerate(docs) if d["snapshot"] is not None]
+    assert keyframes == [0, snapshots.KEYFRAME_INTERVAL]
+    assert files[1].stat().st_size < files[0].stat().st_size / 3
+
+    delta = docs[2]["snapshot_delta"]
+    run_id = delta["goals"][0][0]
+    assert list(delta["changes"][run_id]["milestones"].values())[0]["is_completed"] is True
+    assert "title" not in delta["changes"][run_id]
+
+def test_missing_base_keeps_history_rows(tmp_path):
+    repo = json_repo(tmp_path)
+    for date, snapshot in history_of_changes()[:3]:
+        repo.save(CheckIn(date=date, type=CheckInType.MONTHLY, goals_covered=[], file_path="", snapshot=snapshot), "# R")
+    next((tmp_path / "checkins").glob("2025-01-28*.json")).unlink()
+
+    fresh = json_repo(tmp_path)
+    latest = max(fresh.load_all_snapshots(), key=lambda c: c.date)
+    assert latest.snapshot[0]["progress_percentage"] == 30
+    assert "title" not in latest.snapshot[0]
+    assert fresh.snapshot_at(datetime(2025, 3, 31)) is None
+
+def test_sqlite_schema_is_migrated(tmp_path):
+    db_path = tmp_path / "old.db"
+    conn = sqlite3.connect(db_path)
+    conn.executescript(
+        "CREATE TABLE checkins (id TEXT PRIMARY KEY, date TEXT NOT NULL, type TEXT NOT NULL, "
+        "file_path TEXT NOT NULL, goals_covered TEXT NOT NULL); PRAGMA user_version = 1;"
+    )
+    conn.close()
+
+    columns = [r["name"] for r in connect(db_path).execute("PRAGMA table_info(checkins)")]
+    assert columns[-2:] == ["base_id", "depth"]
+
+def save_state(repo, date, check_type, snapshot):
+    repo.save(CheckIn(date=date, type=check_type, goals_covered=[], file_path="", snapshot=snapshot), "# R")
+
+@pytest.mark.parametrize("make_repo", [json_repo, sqlite_repo])
+def test_resaving_a_base_same_day_keeps_full_snapshots(tmp_path, make_repo):
+    repo = make_repo(tmp_path)
+    (_, first), (_, second), (_, third) = history_of_changes()[:3]
+    day = datetime(2025, 3, 31)
+    save_state(repo, day, CheckInType.MONTHLY, first)
+    save_state(repo, day, CheckInType.QUARTERLY, second)
+    save_state(repo, day, CheckInType.MONTHLY, third)
+
+    loaded = {c.type: c.snapshot for c in make_repo(tmp_path).load_all_snapshots()}
+    assert loaded == {CheckInType.MONTHLY: third, CheckInType.QUARTERLY: second}
+
+@pytest.mark.parametrize("make_repo", [json_repo, sqlite_repo])
+def test_replacing_a_base_keeps_its_dependents(tmp_path, make_repo):
+    repo = make_repo(tmp_path)
+    states = history_of_changes()
+    for date, snapshot in states[:3]:
+        save_state(repo, date, CheckInType.MONTHLY, snapshot)
+    # January is redone with other data; February and March were deltas on it
+    save_state(repo, states[0][0], CheckInType.MONTHLY, states[4][1])
+
+    loaded = sorted(make_repo(tmp_path).load_all_snapshots(), key=lambda c: c.date)
+    assert [c.snapshot for c in loaded] == [states[4][1], states[1][1], states[2][1]]
+    if make_repo is sqlite_repo:
+        ids = [r[0] for r in connect(tmp_path / "horizonte.db").execute("SELECT id FROM checkins ORDER BY date")]
+        assert ids == [c.id for c in loaded]
+
+def test_saves_use_the_index_instead_of_scanning_the_directory(tmp_path, monkeypatch):
+    states = history_of_changes()
+    for date, snapshot in states[:7]:
+        save_state(json_repo(tmp_path), date, CheckInType.MONTHLY, snapshot)
+
+    repo = json_repo(tmp_path)
+    read = []
+    original = repo._read_json
+    monkeypatch.setattr(repo, "_read_json", lambda name: read.append(name) or original(name))
+    monkeypatch.setattr(type(repo.dir_path), "glob", lambda *args: pytest.fail("checkins directory scanned"))
+    # A new check-in resolves its base chain; redoing March rebases only April (its dependent)
+    save_state(repo, states[7][0], CheckInType.MONTHLY, states[7][1])
+    assert len(set(read)) <= snapshots.KEYFRAME_INTERVAL
+    read.clear()
+    save_state(repo, states[2][0], CheckInType.MONTHLY, states[0][1])
+    assert "2025-05-28-monthly" not in read and "2025-06-28-monthly" not in read
+    monkeypatch.undo()
+
+    loaded = sorted(json_repo(tmp_path).load_all_snapshots(), key=lambda c: c.date)
+    assert [c.snapshot for c in loaded] == [states[0][1], states[1][1], states[0][1]] + [s for _, s in states[3:]]
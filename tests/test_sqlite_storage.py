@@ -0,0 +1,131 @@
+import pytest
+
+from horizonte.core.storage import GoalsRepository, CheckinRepository, batch
+from horizonte.core.sqlite_storage import (
+    SqliteGoalsRepository,
+    SqliteCheckinRepository,
+    migrate_json_to_sqlite,
+)
+from horizonte.core.models import Milestone, CheckIn, CheckInType, GoalStatus
+
+from conftest import make_goal
+
+def test_sqlite_goals_repository(tmp_path):
+    repo = SqliteGoalsRepository(db_path=tmp_path / "horizonte.db")
+    assert repo.load() == []
+
+    goal = make_goal(milestones=[Milestone(title="m1"), Milestone(title="m2")])
+    repo.add(goal)
+    repo.add(make_goal("Second"))
+
+    loaded = repo.load()
+    assert [g.title for g in loaded] == ["Test Goal", "Second"]
+    assert [m.title for m in loaded[0].milestones] == ["m1", "m2"]
+
+    goal.progress_percentage = 40
+    goal.status = GoalStatus.COMPLETED
+    repo.update(goal)
+
+    fetched = repo.get(goal.id)
+    assert fetched.progress_percentage == 40
+    assert fetched.status == GoalStatus.COMPLETED
+    assert [g.title for g in repo.find(status=GoalStatus.ACTIVE)] == ["Second"]
+    # Order is preserved after an update
+    assert repo.load()[0].id == goal.id
+
+def test_sqlite_checkin_repository(tmp_path):
+    repo = SqliteCheckinRepository(db_path=tmp_path / "horizonte.db", dir_path=tmp_path / "checkins")
+    goal = make_goal(progress_percentage=30)
+
+    checkin = CheckIn(
+        type=CheckInType.MONTHLY,
+        goals_covered=[goal.id],
+        file_path="",
+        snapshot=[goal.model_dump(mode='json')]
+    )
+    path = repo.save(checkin, "# Review")
+    assert path.read_text() == "# Review"
+    assert repo.list_all() == [path]
+
+    loaded = repo.load_all_snapshots()
+    assert len(loaded) == 1
+    assert loaded[0].snapshot[0]["progress_percentage"] == 30
+
+    history = repo.goal_history(goal.id)
+    assert [h["progress"] for h in history] == [30]
+    assert repo.load_history()[0].goals[goal.id] == (30, "active", "vida")
+
+def test_migrate_json_to_sqlite(tmp_path):
+    goals_file = tmp_path / "goals.json"
+    checkins_dir = tmp_path / "checkins"
+    goal = make_goal()
+    GoalsRepository(file_path=goals_file).save([goal])
+    CheckinRepository(dir_path=checkins_dir).save(
+        CheckIn(type=CheckInType.MONTHLY, goals_covered=[goal.id], file_path="",
+                snapshot=[goal.model_dump(mode='json')]),
+        "# Review"
+    )
+
+    db_path = tmp_path / "horizonte.db"
+    counts = migrate_json_to_sqlite(goals_file=goals_file, checkins_dir=checkins_dir, db_path=db_path)
+    assert counts == {"goals": 1, "checkins": 1}
+
+    assert SqliteGoalsRepository(db_path=db_path).get(goal.id).title == "Test Goal"
+    assert len(SqliteCheckinRepository(db_path=db_path, dir_path=checkins_dir).load_all_snapshots()) == 1
+
+def test_migrate_rejects_invalid_goals_without_creating_the_db(tmp_path):
+    goals_file = tmp_path / "goals.json"
+    goals_file.write_text('[{"title": "sem horizonte"}]')
+    db_path = tmp_path / "horizonte.db"
+
+    with pytest.raises(ValueError, match="goals.json"):
+        migrate_json_to_sqlite(goals_file=goals_file, checkins_dir=tmp_path / "checkins", db_path=db_path)
+    goals_file.write_text('[{"title": ')
+    with pytest.raises(ValueError):
+        migrate_json_to_sqlite(goals_file=goals_file, checkins_dir=tmp_path / "checkins", db_path=db_path)
+    assert list(tmp_path.glob("horizonte.db*")) == []
+
+def test_sqlite_batch_rolls_back(tmp_path):
+    db_path = tmp_path / "horizonte.db"
+    goals_repo = SqliteGoalsRepository(db_path=db_path)
+    checkin_repo = SqliteCheckinRepository(db_path=db_path, dir_path=tmp_path / "checkins")
+    goal = make_goal()
+    goals_repo.add(goal)
+
+    try:
+        with batch(goals_repo, checkin_repo, journal_path=tmp_path / "journal.json"):
+            goal.progress_percentage = 75
+            goals_repo.update(goal)
+            checkin_repo.save(CheckIn(type=CheckInType.MONTHLY, goals_covered=[], file_path=""), "# Review")
+            raise RuntimeError("crash")
+    except RuntimeError:
+        pass
+
+    assert goals_repo.get(goal.id).progress_percentage == 0
+    assert checkin_repo.load_all_snapshots() == []
+
+    with batch(goals_repo, checkin_repo, journal_path=tmp_path / "journal.json"):
+        goals_repo.update(goal)
+        path = checkin_repo.save(CheckIn(type=CheckInType.MONTHLY, goals_covered=[], file_path=""), "# Review")
+
+    assert goals_repo.get(goal.id).progress_percentage == 75
+    assert checkin_repo.list_all() == [path]
+
+def test_storage_engine_is_recorded_in_the_config(tmp_path, monkeypatch):
+    from horizonte.core.storage import ConfigRepository, record_storage_engine, storage_engine
+
+    monkeypatch.delenv("HORIZONTE_STORAGE", raising=False)
+    config_path = tmp_path / "config.json"
+    assert storage_engine(config_path) == "json"
+    record_storage_engine("sqlite", config_path)
+    assert storage_engine(config_path) == "sqlite"
+    monkeypatch.setenv("HORIZONTE_STORAGE", "json")
+    assert storage_engine(config_path) == "json"
+
+    # A database migrated before the engine was recorded gets the flag on first use
+    monkeypatch.delenv("HORIZONTE_STORAGE")
+    legacy = tmp_path / "legacy"
+    legacy.mkdir()
+    (legacy / "horizonte.db").touch()
+    assert storage_engine(legacy / "config.json") == "sqlite"
+    assert ConfigRepository(legacy / "config.json").load().storage == "sqlite"
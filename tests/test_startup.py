@@ -0,0 +1,32 @@
+import os
+import subprocess
+import sys
+
+def test_cli_import_does_not_load_ai_stack():
+    code = (
+        "import sys, horizonte.main; "
+        "print(','.join(m for m in ('openai', 'httpx', 'markdown_it') if m in sys.modules))"
+    )
+    proc = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    assert proc.stdout.strip() == ""
+
+def test_metrics_and_classifier_do_not_load_the_storage_layer():
+    code = "import sys, horizonte.core.classifier, horizonte.core.metrics; print('horizonte.core.storage' in sys.modules)"
+    proc = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    assert proc.stdout.strip() == "False"
+
+def test_dotenv_is_loaded_before_commands_run(tmp_path):
+    # HOME points at tmp_path too, so the app directory (and the SQLite database) stay there
+    (tmp_path / ".env").write_text("HORIZONTE_STORAGE=sqlite\n")
+    code = (
+        "import sys; from horizonte.main import app; "
+        "from horizonte.core.storage import storage_engine; "
+        "app(['history'], standalone_mode=False); "
+        "print(storage_engine(), 'openai' in sys.modules)"
+    )
+    env = {k: v for k, v in os.environ.items() if k != "HORIZONTE_STORAGE"}
+    env["HOME"] = str(tmp_path)
+    env["PYTHONPATH"] = os.pathsep.join(os.path.abspath(p) for p in sys.path if p)
+    proc = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True,
+                          cwd=tmp_path, env=env)
+    assert proc.stdout.strip().splitlines()[-1] == "sqlite False"
@@ -1,20 +1,22 @@
 import json
 import os
 from pathlib import Path
-from horizonte.core.storage import GoalsRepository, ConfigRepository, CheckinRepository, atomic_write
+from horizonte.core.storage import GoalsRepository, ConfigRepository, CheckinRepository, atomic_write, batch, recover_journal
 from horizonte.core.models import Goal, Horizon, SmartCriteria, Config
 
-def test_atomic_write(tmp_path):
+from conftest import make_goal
+
+def test_atomic_write(tmp_path, backup_store):
+    store = backup_store
     f = tmp_path / "test.txt"
     atomic_write(f, "content1", make_backup=False)
     assert f.read_text() == "content1"
     
     atomic_write(f, "content2", make_backup=True)
     assert f.read_text() == "content2"
-    # Check backup exists
-    backups = list(tmp_path.glob("test.*.bak"))
-    assert len(backups) == 1
-    assert backups[0].read_text() == "content1"
+    # Check backup exists: the previous content and the new version
+    versions = store.versions(f)
+    assert [store.read(v.hash) for v in versions] == [b"content1", b"content2"]
 
 def test_goals_repository(tmp_path):
     repo = GoalsRepository(file_path=tmp_path / "goals.json")
@@ -73,3 +75,240 @@ def test_checkin_repository(tmp_path):
     files = repo.list_all()
     assert len(files) == 1
     assert files[0] == path
+
+def test_goals_repository_update_uses_log(tmp_path):
+    goals_file = tmp_path / "goals.json"
+    repo = GoalsRepository(file_path=goals_file)
+    goals = [make_goal(f"Goal {i}") for i in range(3)]
+    repo.save(goals)
+    base_content = goals_file.read_text()
+
+    goals[1].progress_percentage = 55
+    repo.update(goals[1])
+
+    # goals.json is untouched; the change lives in the append-only log
+    assert goals_file.read_text() == base_content
+    assert len(repo.log_path.read_text().splitlines()) == 1
+
+    # A fresh repository replays the log on top of the base file, preserving order
+    reloaded = GoalsRepository(file_path=goals_file).load()
+    assert [g.title for g in reloaded] == ["Goal 0", "Goal 1", "Goal 2"]
+    assert reloaded[1].progress_percentage == 55
+
+def test_goals_repository_compaction(tmp_path):
+    repo = GoalsRepository(file_path=tmp_path / "goals.json")
+    goal = make_goal()
+    repo.add(goal)
+
+    for i in range(1, GoalsRepository.COMPACT_THRESHOLD + 1):
+        goal.progress_percentage = i
+        repo.update(goal)
+
+    assert not repo.log_path.exists()
+    data = json.loads((tmp_path / "goals.json").read_text())
+    assert data[0]["progress_percentage"] == GoalsRepository.COMPACT_THRESHOLD
+
+def test_goals_repository_ignores_torn_log_line(tmp_path):
+    repo = GoalsRepository(file_path=tmp_path / "goals.json")
+    goal = make_goal()
+    repo.save([goal])
+    goal.progress_percentage = 10
+    repo.update(goal)
+    with open(repo.log_path, 'a') as f:
+        f.write('{"op": "put", "goal": {"id"')
+
+    loaded = GoalsRepository(file_path=tmp_path / "goals.json").load()
+    assert loaded[0].progress_percentage == 10
+
+def test_batch_commits_goals_and_checkin_together(tmp_path):
+    from horizonte.core.models import CheckIn, CheckInType
+    goals_repo = GoalsRepository(file_path=tmp_path / "goals.json")
+    checkin_repo = CheckinRepository(dir_path=tmp_path / "checkins")
+    goals = [make_goal(f"Goal {i}") for i in range(3)]
+    goals_repo.save(goals)
+    journal = tmp_path / "journal.json"
+
+    with batch(goals_repo, checkin_repo, journal_path=journal):
+        for g in goals:
+            g.progress_percentage = 20
+            goals_repo.update(g)
+        path = checkin_repo.save(CheckIn(type=CheckInType.MONTHLY, goals_covered=[], file_path=""), "# Review")
+        # Nothing is written until the block exits
+        assert not path.exists()
+        assert not goals_repo.log_path.exists()
+
+    assert path.read_text() == "# Review"
+    assert not journal.exists()
+    assert not goals_repo.log_path.exists()
+    data = json.loads((tmp_path / "goals.json").read_text())
+    assert [g["progress_percentage"] for g in data] == [20, 20, 20]
+
+def test_batch_commit_is_one_backup(tmp_path, backup_store, monkeypatch):
+    from horizonte.core.models import CheckIn, CheckInType
+    goals_repo = GoalsRepository(file_path=tmp_path / "goals.json")
+    checkin_repo = CheckinRepository(dir_path=tmp_path / "checkins")
+    goal = make_goal()
+    goals_repo.save([goal])
+    goal.progress_percentage = 10
+    goals_repo.update(goal)
+    saves = []
+    monkeypatch.setattr(backup_store, "_save", lambda: saves.append(1))
+
+    with batch(goals_repo, checkin_repo, journal_path=tmp_path / "journal.json"):
+        goal.progress_percentage = 20
+        goals_repo.update(goal)
+        checkin_repo.save(CheckIn(type=CheckInType.MONTHLY, goals_covered=[], file_path=""), "# Review")
+
+    # goals.json, its log and the check-in files are recorded at one point in time, in one manifest write
+    assert len(saves) == 1
+    versions = backup_store.versions()
+    committed = {Path(v.path).name for v in versions if v.timestamp == versions[-1].timestamp}
+    assert {"goals.json", "goals.json.log"} <= committed
+    assert any(name.endswith(".md") for name in committed)
+
+def test_batch_discards_on_error(tmp_path):
+    goals_repo = GoalsRepository(file_path=tmp_path / "goals.json")
+    goal = make_goal()
+    goals_repo.save([goal])
+
+    try:
+        with batch(goals_repo, journal_path=tmp_path / "journal.json"):
+            goal.progress_percentage = 90
+            goals_repo.update(goal)
+            raise KeyboardInterrupt
+    except KeyboardInterrupt:
+        pass
+
+    assert GoalsRepository(file_path=tmp_path / "goals.json").load()[0].progress_percentage == 0
+
+def test_recover_journal(tmp_path):
+    target = tmp_path / "goals.json"
+    stale_log = tmp_path / "goals.json.log"
+    stale_log.write_text("{}")
+    journal = tmp_path / "journal.json"
+    journal.write_text(json.dumps({"writes": {str(target): "[]", str(stale_log): None}}))
+
+    assert recover_journal(journal) is True
+    assert target.read_text() == "[]"
+    assert not stale_log.exists()
+    assert not journal.exists()
+    assert recover_journal(journal) is False
+
+def test_checkin_history_index(tmp_path):
+    from horizonte.core.models import CheckIn, CheckInType
+    from datetime import datetime
+    repo = CheckinRepository(dir_path=tmp_path / "checkins")
+    goal = make_goal()
+
+    for month, progress in [(1, 10), (2, 30)]:
+        if month == 2:
+            # The index is fresh now: saving must update it incrementally, not rebuild it
+            repo.load_all_snapshots = lambda: (_ for _ in ()).throw(AssertionError("rebuilt"))
+        goal.progress_percentage = progress
+        repo.save(CheckIn(
+            date=datetime(2025, month, 28),
+            type=CheckInType.MONTHLY,
+            goals_covered=[goal.id],
+            file_path="",
+            snapshot=[goal.model_dump(mode='json')]
+        ), "# Review")
+
+    assert repo.index.index_path.exists()
+    history = repo.load_history()
+    assert [e.date.month for e in history] == [1, 2]
+    assert history[1].goals[goal.id] == (30, "active", "vida")
+    assert [h["progress"] for h in repo.goal_history(goal.id)] == [10, 30]
+    assert repo.goal_history("missing") == []
+
+    # Files changed behind our back: the index notices the directory mtime and rebuilds
+    next(p for p in (tmp_path / "checkins").glob("2025-01-28*.json")).unlink()
+    fresh_repo = CheckinRepository(dir_path=tmp_path / "checkins")
+    assert [e.date.month for e in fresh_repo.load_history()] == [2]
+    assert [h["progress"] for h in fresh_repo.goal_history(goal.id)] == [30]
+
+def test_history_index_appends_to_a_log_and_compacts(tmp_path, monkeypatch):
+    from horizonte.core.history import HistoryIndex
+    from horizonte.core.models import CheckIn, CheckInType
+    from datetime import datetime
+    monkeypatch.setattr(HistoryIndex, "COMPACT_THRESHOLD", 2)
+    repo = CheckinRepository(dir_path=tmp_path / "checkins")
+    goal = make_goal()
+
+    def save(month, progress):
+        goal.progress_percentage = progress
+        repo.save(CheckIn(date=datetime(2025, month, 28), type=CheckInType.MONTHLY, goals_covered=[goal.id],
+                          file_path="", snapshot=[goal.model_dump(mode='json')]), "# Review")
+
+    save(1, 10)
+    index_content = repo.index.index_path.read_bytes()
+    save(3, 30)
+    save(2, 20)
+    # Appended to the log, the index file itself was not rewritten
+    assert repo.index.index_path.read_bytes() == index_content
+    assert len(repo.index.log_path.read_text().splitlines()) == 2
+    fresh = CheckinRepository(dir_path=tmp_path / "checkins")
+    fresh.load_all_snapshots = lambda: (_ for _ in ()).throw(AssertionError("rebuilt"))
+    assert [e.date.month for e in fresh.load_history()] == [1, 2, 3]
+    assert [h["progress"] for h in fresh.goal_history(goal.id)] == [10, 20, 30]
+
+    # A full log (or a re-saved check-in) is folded into the index
+    save(4, 40)
+    assert not repo.index.log_path.exists()
+    save(4, 45)
+    assert [h["progress"] for h in CheckinRepository(dir_path=tmp_path / "checkins").goal_history(goal.id)] == [10, 20, 30, 45]
+
+    # Files changed behind our back while entries are only in the log: rebuilt
+    save(5, 50)
+    next(p for p in (tmp_path / "checkins").glob("2025-03-28*.json")).unlink()
+    assert [e.date.month for e in CheckinRepository(dir_path=tmp_path / "checkins").load_history()] == [1, 2, 4, 5]
+
+def test_analytics_cache_is_extended_on_save(tmp_path):
+    from horizonte.core.models import CheckIn, CheckInType
+    from horizonte.core.analytics_cache import load_analytics
+    from datetime import datetime
+    repo = CheckinRepository(dir_path=tmp_path / "checkins")
+    goal = make_goal()
+
+    def save(month, progress):
+        goal.progress_percentage = progress
+        repo.save(CheckIn(date=datetime(2025, month, 28), type=CheckInType.MONTHLY, goals_covered=[goal.id],
+                          file_path="", snapshot=[goal.model_dump(mode='json')]), "# Review")
+
+    save(1, 10)
+    assert load_analytics(repo).checkin_count == 1
+    save(2, 40)
+
+    # The cache was extended in place: no history reload needed
+    repo.load_history = lambda: (_ for _ in ()).throw(AssertionError("recomputed"))
+    summary = load_analytics(repo)
+    assert summary.checkin_count == 2
+    assert [h["avg_progress"] for h in summary.history] == [10.0, 40.0]
+
+def test_unchanged_saves_are_skipped(tmp_path, backup_store):
+    store = backup_store
+    goals_file = tmp_path / "goals.json"
+    repo = GoalsRepository(file_path=goals_file)
+    goals = [make_goal(f"Goal {i}") for i in range(3)]
+    repo.save(goals)
+    mtime = goals_file.stat().st_mtime_ns
+
+    # A fresh repository (e.g. the next command) saving the same goals
+    fresh = GoalsRepository(file_path=goals_file)
+    loaded = fresh.load()
+    fresh.save(loaded)
+    fresh.update(loaded[1])
+    assert goals_file.stat().st_mtime_ns == mtime
+    assert not fresh.log_path.exists()
+
+    # Only the goal that changed is written
+    loaded[2].progress_percentage = 40
+    for g in loaded:
+        fresh.update(g)
+    assert len(fresh.log_path.read_text().splitlines()) == 1
+
+    config_file = tmp_path / "config.json"
+    config_repo = ConfigRepository(file_path=config_file)
+    config_repo.save(config_repo.load())
+    config_repo.save(ConfigRepository(file_path=config_file).load())
+    assert len(store.versions(config_file)) == 1
+    assert len(store.versions(goals_file)) == 1
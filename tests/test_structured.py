@@ -0,0 +1,77 @@
+from types import SimpleNamespace
+
+import pytest
+
+from horizonte.core import ai, structured
+from horizonte.core.structured import PartialJSONParser
+
+@pytest.fixture(autouse=True)
+def no_response_cache(monkeypatch):
+    monkeypatch.setenv("HORIZONTE_AI_CACHE", "0")
+
+def test_loads_recovers_truncated_and_wrapped_json():
+    assert structured.loads('Claro! ```json\n{"a": [1, 2]}\n``` Espero ter ajudado.') == {"a": [1, 2]}
+    truncated = '[{"goal_id": "x", "comment": "ok"}, {"goal_id": "y", "comm'
+    assert structured.loads(truncated, whole_items=True) == [{"goal_id": "x", "comment": "ok"}]
+    assert structured.loads(truncated)[-1] == {"goal_id": "y"}
+    assert structured.loads('{"specific": "Correr", "measurable": "10km",}') == {"specific": "Correr", "measurable": "10km"}
+    with pytest.raises(ValueError):
+        structured.loads("Não consegui entender.")
+
+def test_incremental_parser_yields_complete_items():
+    parser = PartialJSONParser()
+    seen = []
+    for chunk in ['{"updates": [{"goal_id": "a", "comment": "x, ', 'y]"}', ', {"goal_id": "b"', '}, {"goal']:
+        parser.feed(chunk)
+        seen.append([item["goal_id"] for item in parser.items()])
+    assert seen == [[], ["a"], ["a"], ["a", "b"]]
+    assert not parser.complete
+
+def test_checkin_updates_accept_object_or_array():
+    array = '[{"goal_id": "a", "explicit_percent": 40}, {"comment": "sem id"}]'
+    wrapped = '{"updates": [{"goal_id": "a", "explicit_percent": 40}]}'
+    assert structured.parse_checkin_updates(array) == structured.parse_checkin_updates(wrapped)
+    assert structured.parse_checkin_updates(array)[0]["delta_value"] is None
+
+class BadRequest(Exception):
+    status_code = 400
+
+def test_json_mode_falls_back_when_rejected(monkeypatch):
+    monkeypatch.setattr(structured, "_json_mode_unsupported", set())
+    calls = []
+
+    def create(model, messages, temperature, **kwargs):
+        calls.append("response_format" in kwargs)
+        if "response_format" in kwargs:
+            raise BadRequest()
+        content = '{"specific": "s", "measurable": "m"}'
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))])
+
+    client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+    request = ai.build_smart_criteria_request("Correr", "Maratona", None, "curto_prazo")
+
+    smart = ai.parse_smart_criteria(ai._complete(client, *request))
+    assert (smart.measurable, smart.time_bound) == ("m", "")
+    # The model is remembered: no second rejected attempt
+    ai._complete(client, *request)
+    assert calls == [True, False, False]
+
+def test_async_json_mode_shares_the_fallback(monkeypatch):
+    from horizonte.core import ai_async, ai_client
+
+    monkeypatch.setattr(structured, "_json_mode_unsupported", set())
+    calls = []
+
+    async def create(model, messages, temperature, **kwargs):
+        calls.append("response_format" in kwargs)
+        if "response_format" in kwargs:
+            raise BadRequest()
+        content = '{"specific": "s", "measurable": "m"}'
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))])
+
+    monkeypatch.setattr(ai_client, "get_async_client", lambda: SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create))))
+    smart = ai_async.run_sync(ai_async.suggest_smart_criteria("Correr", "Maratona", None, "curto_prazo"))
+    assert smart.measurable == "m"
+    # Remembered by the sync path as well
+    assert structured.request_kwargs(structured.SmartCriteria, ai.get_model()) == {}
+    assert calls == [True, False]
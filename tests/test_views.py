@@ -0,0 +1,46 @@
+import pytest
+
+from horizonte.core import serialization
+from horizonte.core.models import GoalStatus, Horizon
+from horizonte.core.sqlite_storage import SqliteGoalsRepository
+from horizonte.core.storage import GoalsRepository
+from horizonte.core.views import GoalView
+
+from conftest import make_goal
+
+def json_repo(tmp_path):
+    return GoalsRepository(file_path=tmp_path / "goals.json")
+
+def sqlite_repo(tmp_path):
+    return SqliteGoalsRepository(db_path=tmp_path / "horizonte.db")
+
+@pytest.mark.parametrize("make_repo", [json_repo, sqlite_repo])
+def test_views_match_the_goals(tmp_path, make_repo):
+    goals = [
+        make_goal("Ler 12 livros", horizon=Horizon.MID_TERM, progress_percentage=25),
+        make_goal("Correr", horizon=Horizon.MID_TERM, status=GoalStatus.COMPLETED),
+    ]
+    make_repo(tmp_path).save(goals)
+    goals[0].progress_percentage = 50
+    make_repo(tmp_path).update(goals[0])
+
+    views = make_repo(tmp_path).load_views()
+    assert views == [GoalView.from_goal(g) for g in goals]
+    assert views[1].status == "completed" and views[1].horizon == Horizon.MID_TERM
+
+def test_trusted_file_skips_validation(tmp_path, monkeypatch):
+    json_repo(tmp_path).save([make_goal("Ler", horizon=Horizon.MID_TERM)])
+
+    def fail(data):
+        raise AssertionError("validated")
+
+    monkeypatch.setattr(serialization, "validate_goals", fail)
+    assert [v.title for v in json_repo(tmp_path).load_views()] == ["Ler"]
+
+    # Edited outside the app: the checksum no longer matches, so the file is validated
+    goals_file = tmp_path / "goals.json"
+    goals_file.write_text(goals_file.read_text().replace('"Ler"', '"Ler mais"'))
+    with pytest.raises(AssertionError, match="validated"):
+        json_repo(tmp_path).load_views()
+    monkeypatch.undo()
+    assert [v.title for v in json_repo(tmp_path).load_views()] == ["Ler mais"]